@@ -0,0 +1,157 @@
+"""Offline benchmark of the scrape hot loop
+
+Scrapes the synthetic timeline served by timeline_server and reports
+tweets/sec, per card parse latency and peak memory. The `parse` target
+only parses rendered timeline html in-process and does not need Chrome.
+
+    python benchmarks/bench_scrape.py --cards 500 --mode script element
+    python benchmarks/bench_scrape.py --target parse --cards 5000
+"""
+import os
+import sys
+import json
+import argparse
+import tracemalloc
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crate.utils import ScraperOptions, ExtractionMode, tweet_from_record
+
+from timeline_server import TimelineConfig, TimelineServer, render_page
+
+
+def bench_parse(config: TimelineConfig) -> dict:
+    """Parse rendered timeline pages with the snapshot parser"""
+    from crate.snapshot import parse_snapshot
+
+    pages = []
+    offset = 0
+    while offset < config.cards:
+        page = render_page(offset, config)
+        pages.append(page["html"])
+        offset = page["offset"]
+
+    base_url = "http://127.0.0.1/search"
+
+    def parse():
+        tweets = 0
+        for html in pages:
+            for record in parse_snapshot(html, base_url):
+                if tweet_from_record(record):
+                    tweets += 1
+        return tweets
+
+    # Time and memory are measured in separate passes, tracemalloc
+    # slows down allocation heavy code
+    started = perf_counter()
+    tweets = parse()
+    seconds = perf_counter() - started
+
+    tracemalloc.start()
+    parse()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "target": "parse",
+        "cards": config.cards,
+        "tweets": tweets,
+        "seconds": seconds,
+        "tweets_per_sec": tweets / seconds,
+        "card_parse_ms": seconds / config.cards * 1000,
+        "python_peak_bytes": peak
+    }
+
+
+def bench_scrape(config: TimelineConfig, mode: str,
+                 sleep_duration: float) -> dict:
+    """Scrape the synthetic timeline in headless Chrome"""
+    from crate.driver import Driver, DriverOptions, ResourceProfile
+    from crate.metrics import Metrics
+    from crate.scraper import Scraper
+
+    with TimelineServer(config) as server:
+        driver = Driver(DriverOptions(
+            headless=True,
+            resource_profile=ResourceProfile.MINIMAL,
+            capture_network=mode == ExtractionMode.NETWORK))
+
+        browser_peak = [0]
+
+        def sample_rss(scroll, y):
+            browser_peak[0] = max(browser_peak[0], driver.process_rss() or 0)
+
+        scraper = Scraper(
+            driver,
+            sleep_duration=sleep_duration,
+            extraction_mode=mode,
+            metrics=Metrics(on_scroll=sample_rss),
+            base_url=server.search_url)
+
+        try:
+            tracemalloc.start()
+            started = perf_counter()
+
+            tweets = scraper.scrape(ScraperOptions(words="benchmark"))
+
+            seconds = perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        finally:
+            driver.quit()
+
+    stats = scraper.stats
+    cards = stats.counters["cards"] or 1
+
+    return {
+        "target": "scrape",
+        "mode": mode,
+        "cards": config.cards,
+        "tweets": len(tweets),
+        "seconds": seconds,
+        "tweets_per_sec": len(tweets) / seconds,
+        "card_parse_ms": (stats.seconds["extract"] + \
+                          stats.seconds["parse"]) / cards * 1000,
+        "python_peak_bytes": peak,
+        "browser_peak_rss_bytes": browser_peak[0],
+        "stats": stats.to_dict()
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--target", choices=["scrape", "parse"],
+                        default="scrape")
+    parser.add_argument("--mode", nargs="+", default=[ExtractionMode.SCRIPT],
+                        choices=["script", "element", "snapshot",
+                                 "network"])
+    parser.add_argument("--cards", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--load-delay", type=float, default=0.3)
+    parser.add_argument("--promoted-ratio", type=float, default=0.05)
+    parser.add_argument("--emoji-ratio", type=float, default=0.3)
+    parser.add_argument("--image-ratio", type=float, default=0.3)
+    parser.add_argument("--sleep-duration", type=float, default=5)
+    args = parser.parse_args()
+
+    config = TimelineConfig(
+        cards=args.cards,
+        page_size=args.page_size,
+        load_delay=args.load_delay,
+        promoted_ratio=args.promoted_ratio,
+        emoji_ratio=args.emoji_ratio,
+        image_ratio=args.image_ratio)
+
+    if args.target == "parse":
+        results = [bench_parse(config)]
+    else:
+        results = [bench_scrape(config, mode, args.sleep_duration)
+                   for mode in args.mode]
+
+    for result in results:
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
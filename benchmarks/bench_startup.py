@@ -0,0 +1,124 @@
+"""Benchmark of import time and time to first page
+
+Import time of each target is measured in fresh interpreters. Time to
+first page starts Chrome and loads the synthetic timeline served by
+timeline_server until its first cards are rendered, once on a fresh
+profile and once on a profile prepared with build_profile.
+
+    python benchmarks/bench_startup.py --target import
+    python benchmarks/bench_startup.py --target first-page --runs 3
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+from timeline_server import TimelineServer
+
+IMPORTS = {
+    "crate": "import crate",
+    "options": "from crate import ScraperOptions",
+    "scraper": "from crate import Scraper"
+}
+
+IMPORT_CODE = """
+from time import perf_counter
+started = perf_counter()
+{}
+print(perf_counter() - started)
+"""
+
+
+def bench_import(name: str, runs: int) -> dict:
+    """Import statement timed in `runs` fresh interpreters"""
+    code = IMPORT_CODE.format(IMPORTS[name])
+    seconds = []
+
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, "-c", code],
+                                         cwd=ROOT)
+        seconds.append(float(output))
+
+    return {
+        "target": "import",
+        "import": name,
+        "runs": runs,
+        "min_seconds": min(seconds),
+        "mean_seconds": sum(seconds) / runs
+    }
+
+
+def first_page(search_url: str, profile_dir: str = None) -> dict:
+    from crate.driver import Driver, DriverOptions, ResourceProfile
+
+    started = perf_counter()
+    driver = Driver(DriverOptions(
+        headless=True,
+        resource_profile=ResourceProfile.MINIMAL,
+        profile_dir=profile_dir))
+    launched = perf_counter()
+
+    try:
+        driver.get(search_url)
+        driver.wait_for_load(10)
+        loaded = perf_counter()
+    finally:
+        driver.quit()
+
+    return {
+        "launch_seconds": launched - started,
+        "first_page_seconds": loaded - started
+    }
+
+
+def bench_first_page(runs: int) -> list:
+    from crate.driver import build_profile
+
+    results = []
+
+    with TimelineServer() as server, \
+            tempfile.TemporaryDirectory() as profile_dir:
+        # First run also resolves and caches chromedriver
+        for profile in ("fresh", "prebuilt"):
+            if profile == "prebuilt":
+                build_profile(profile_dir)
+
+            for run in range(runs):
+                result = first_page(
+                    server.search_url,
+                    profile_dir if profile == "prebuilt" else None)
+
+                results.append({"target": "first-page", "profile": profile,
+                                "run": run, **result})
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--target", choices=["import", "first-page"],
+                        nargs="+", default=["import"])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    results = []
+
+    if "import" in args.target:
+        results += [bench_import(name, args.runs) for name in IMPORTS]
+
+    if "first-page" in args.target:
+        results += bench_first_page(args.runs)
+
+    for result in results:
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
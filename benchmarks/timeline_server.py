@@ -0,0 +1,347 @@
+"""Local HTTP server serving a synthetic infinite scroll search timeline
+
+Card markup follows the structure the card XPath selectors in
+crate.const expect. Cards are loaded in pages when the window is
+scrolled to the bottom, after `load_delay` seconds, while a loading
+spinner is shown. Pages are fetched from the path of the search API and
+also carry the cards in its response format, for network extraction.
+
+With `max_rate`, page requests above that rate per second are answered
+with 429 and the page shows a retry button like twitter's error page."""
+import json
+import random
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+from time import sleep, monotonic
+from typing import Optional
+from urllib.parse import urlsplit, parse_qs
+
+
+CARD = """<article data-testid="tweet">
+  <div>
+    <div><img src="https://pbs.twimg.com/profile_images/{tweet_id}/a.jpg"></div>
+    <div>
+      <div></div>
+      <div>
+        <div>
+          <a href="/{username}"><span>{display_name}</span></a>
+          <span>@{username}</span>
+          <a href="/{username}/status/{tweet_id}">
+            <time datetime="{created_date}">{created_date}</time>
+          </a>
+        </div>
+        <div>
+          <div><span>{text}</span>{emojis}</div>
+          <div>{images}</div>
+        </div>
+        <div>
+          <div data-testid="reply">{reply_count}</div>
+          <div data-testid="retweet">{retweet_count}</div>
+          <div data-testid="like">{like_count}</div>
+        </div>{promoted}
+      </div>
+    </div>
+  </div>
+</article>"""
+
+PROMOTED = """
+        <div><span>Promoted</span></div>"""
+
+EMOJI = '<img src="https://abs-0.twimg.com/emoji/v2/svg/{:x}.svg">'
+
+IMAGE = '<img src="https://pbs.twimg.com/media/{}?format=jpg&amp;name=small">'
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head><title>Search</title></head>
+<body>
+<div aria-label="Timeline: Search timeline" id="timeline"></div>
+<div id="end" style="height: 1200px"></div>
+<script>
+const timeline = document.getElementById('timeline');
+let offset = 0;
+let loading = false;
+let done = false;
+
+function load() {
+    if (loading || done) {
+        return;
+    }
+
+    loading = true;
+    const spinner = document.createElement('div');
+    spinner.setAttribute('role', 'progressbar');
+    document.body.appendChild(spinner);
+
+    fetch('/i/api/2/search/adaptive.json?offset=' + offset + '&' + window.location.search.slice(1))
+        .then(function (response) {
+            if (!response.ok) {
+                done = true;
+                const retry = document.createElement('div');
+                retry.setAttribute('role', 'button');
+                retry.textContent = 'Retry';
+                document.body.appendChild(retry);
+                throw new Error(response.status);
+            }
+            return response.json();
+        })
+        .then(function (page) {
+            timeline.insertAdjacentHTML('beforeend', page.html);
+            offset = page.offset;
+            done = page.done;
+            if (done) {
+                document.getElementById('end').style.height = '0px';
+            }
+        })
+        .catch(function () {})
+        .finally(function () {
+            spinner.remove();
+            loading = false;
+        });
+}
+
+window.addEventListener('scroll', function () {
+    if (window.innerHeight + window.pageYOffset >=
+            document.body.scrollHeight - 10) {
+        load();
+    }
+});
+
+load();
+</script>
+</body>
+</html>"""
+
+
+class TimelineConfig:
+    """Shape of the synthetic timeline
+
+    `cards` in total, `page_size` cards per load after `load_delay`
+    seconds. Ratios set the share of promoted cards and cards with
+    emojis or images."""
+
+    def __init__(
+        self,
+        cards: int = 200,
+        page_size: int = 20,
+        load_delay: float = 0.3,
+        promoted_ratio: float = 0.05,
+        emoji_ratio: float = 0.3,
+        image_ratio: float = 0.3,
+        seed: int = 0,
+        max_rate: Optional[float] = None) -> None:
+        self.cards = cards
+        self.page_size = page_size
+        self.load_delay = load_delay
+        self.promoted_ratio = promoted_ratio
+        self.emoji_ratio = emoji_ratio
+        self.image_ratio = image_ratio
+        self.seed = seed
+        self.max_rate = max_rate
+
+
+def make_card(index: int, config: TimelineConfig) -> dict:
+    """Fields of card at index, same index always makes the same card"""
+    rng = random.Random(config.seed * 1000003 + index)
+
+    emojis = []
+    if rng.random() < config.emoji_ratio:
+        emojis = [rng.randint(0x1f600, 0x1f64f)
+                  for _ in range(rng.randint(1, 3))]
+
+    images = []
+    if rng.random() < config.image_ratio:
+        images = [f"M{index}x{i}" for i in range(rng.randint(1, 4))]
+
+    return {
+        "tweet_id": str(1478696530051678209 - index),
+        "user_id": str(1000 + index % 97),
+        "username": f"user{index % 97}",
+        "display_name": f"User {index % 97}",
+        "created_date": datetime(2022, 1, 7) - timedelta(minutes=7 * index),
+        "text": f"Synthetic tweet number {index}",
+        "emojis": emojis,
+        "images": images,
+        "reply_count": rng.randint(0, 999),
+        "retweet_count": rng.randint(1000, 99999),
+        "like_count": rng.randint(1000, 99999),
+        "promoted": rng.random() < config.promoted_ratio
+    }
+
+
+def render_card(index: int, config: TimelineConfig) -> str:
+    """Render card at index as timeline html"""
+    card = make_card(index, config)
+
+    return CARD.format(
+        tweet_id=card["tweet_id"],
+        username=card["username"],
+        display_name=card["display_name"],
+        created_date=card["created_date"]
+                        .strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        text=card["text"],
+        emojis="".join(EMOJI.format(e) for e in card["emojis"]),
+        images="".join(IMAGE.format(i) for i in card["images"]),
+        reply_count=card["reply_count"],
+        retweet_count=f"{card['retweet_count'] / 1000:.1f}K",
+        like_count=f"{card['like_count'] / 1000:.1f}K",
+        promoted=PROMOTED if card["promoted"] else "")
+
+
+def render_api(indexes: range, config: TimelineConfig) -> dict:
+    """Cards in the format of the search API response"""
+    tweets = {}
+    users = {}
+    entries = []
+
+    for index in indexes:
+        card = make_card(index, config)
+        text = card["text"] + "".join(chr(e) for e in card["emojis"])
+        media = [{
+            "type": "photo",
+            "url": f"https://t.co/{image}",
+            "media_url_https": f"https://pbs.twimg.com/media/{image}.jpg"
+        } for image in card["images"]]
+        links = "".join(f" {m['url']}" for m in media)
+
+        tweets[card["tweet_id"]] = {
+            "id_str": card["tweet_id"],
+            "user_id_str": card["user_id"],
+            "created_at": card["created_date"]
+                            .strftime("%a %b %d %H:%M:%S +0000 %Y"),
+            "full_text": text + links,
+            "display_text_range": [0, len(text)],
+            "entities": {"media": media[:1]} if media else {},
+            "extended_entities": {"media": media} if media else {},
+            "reply_count": card["reply_count"],
+            "retweet_count": card["retweet_count"],
+            "favorite_count": card["like_count"]
+        }
+        users[card["user_id"]] = {
+            "id_str": card["user_id"],
+            "name": card["display_name"],
+            "screen_name": card["username"]
+        }
+
+        item = {"id": card["tweet_id"], "displayType": "Tweet"}
+        if card["promoted"]:
+            item["promotedMetadata"] = {"advertiserId": "1"}
+
+        entries.append({
+            "entryId": f"sq-I-t-{card['tweet_id']}",
+            "content": {"item": {"content": {"tweet": item}}}
+        })
+
+    return {
+        "globalObjects": {"tweets": tweets, "users": users},
+        "timeline": {"instructions": [{"addEntries": {"entries": entries}}]}
+    }
+
+
+def render_page(offset: int, config: TimelineConfig) -> dict:
+    end = min(offset + config.page_size, config.cards)
+
+    return {
+        "html": "".join(render_card(i, config) for i in range(offset, end)),
+        "offset": end,
+        "done": end >= config.cards,
+        **render_api(range(offset, end), config)
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    config: TimelineConfig = TimelineConfig()
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+
+        if url.path == "/search":
+            self.__send(PAGE.encode("utf-8"), "text/html")
+        elif url.path == "/i/api/2/search/adaptive.json":
+            if self.limited():
+                self.send_error(429)
+                return
+
+            offset = int(parse_qs(url.query).get("offset", ["0"])[0])
+            sleep(self.config.load_delay)
+            self.__send(json.dumps(render_page(offset, self.config))
+                        .encode("utf-8"), "application/json")
+        else:
+            self.send_error(404)
+
+    def limited(self) -> bool:
+        """Returns True if the request exceeds max_rate"""
+        if self.config.max_rate is None:
+            return False
+
+        with self.lock:
+            now = monotonic()
+
+            while self.requests and self.requests[0] <= now - 1:
+                self.requests.popleft()
+
+            if len(self.requests) >= self.config.max_rate:
+                return True
+
+            self.requests.append(now)
+
+        return False
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def __send(self, body: bytes, content_type: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class TimelineServer:
+    """Serve the synthetic timeline on localhost in a background thread
+
+    `search_url` is passed as Scraper base_url"""
+
+    def __init__(
+        self,
+        config: Optional[TimelineConfig] = None,
+        port: int = 0) -> None:
+        handler = type("Handler", (_Handler,),
+                       {"config": config or TimelineConfig(),
+                        "lock": threading.Lock(),
+                        "requests": deque()})
+
+        self.server = _ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    @property
+    def search_url(self) -> str:
+        return f"{self.url}/search"
+
+    def start(self) -> "TimelineServer":
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "TimelineServer":
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
@@ -1,4 +1,44 @@
-from .scraper import Scraper
-from .utils import ScraperOptions, TweetDisplayType
+import sys
+from importlib import import_module
+
+from .utils import ScraperOptions, TweetDisplayType, ExtractionMode
 from . import const
-from . import driver
\ No newline at end of file
+
+# Submodules pulling in selenium, chromedriver_autoinstaller or pools are
+# imported on first attribute access, so workers only using the plain
+# data classes start fast
+_LAZY = {
+    "Scraper": "scraper",
+    "AsyncScraper": "async_scraper",
+    "DateWindowPlanner": "planner",
+    "scrape_parallel": "planner",
+    "ScrapeResult": "parallel",
+    "scrape_many": "parallel",
+    "TweetBatch": "batch",
+    "driver": None
+}
+
+__all__ = ["ScraperOptions", "TweetDisplayType", "ExtractionMode",
+           "const"] + list(_LAZY)
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module = import_module(f".{_LAZY[name] or name}", __name__)
+    value = module if _LAZY[name] is None else getattr(module, name)
+
+    globals()[name] = value
+
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+
+
+# Module __getattr__ is not supported before Python 3.7
+if sys.version_info < (3, 7):
+    for _name in _LAZY:
+        __getattr__(_name)
@@ -0,0 +1,108 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, List, Optional
+
+from .driver import DriverOptions
+from .scraper import Scraper
+from .utils import ScraperOptions, Tweet, ExtractionMode
+
+
+# Returned by next() when scrape generator is exhausted
+_DONE = object()
+
+
+class AsyncScraper:
+    """asyncio front end of Scraper
+
+    Blocking driver work runs in a managed thread pool so the event loop
+    is never blocked. At most `max_browsers` browsers are live at the
+    same time, each browser is reused across scrapes."""
+
+    def __init__(
+        self,
+        options: Optional[DriverOptions] = DriverOptions(),
+        max_browsers: int = 2,
+        sleep_duration: int = 5,
+        extraction_mode: Optional[str] = ExtractionMode.SCRIPT) -> None:
+        self.options = options
+        self.max_browsers = max_browsers
+        self.sleep_duration = sleep_duration
+        self.extraction_mode = extraction_mode
+
+        self.__executor = ThreadPoolExecutor(max_workers=max_browsers)
+        # Created on first use so it binds to the running event loop
+        self.__semaphore = None
+        self.__idle: List[Scraper] = []
+        self.__scrapers: List[Scraper] = []
+
+    async def scrape(self, options: ScraperOptions) -> List[Tweet]:
+        return [tweet async for tweet in self.iter_scrape(options)]
+
+    async def iter_scrape(
+        self,
+        options: ScraperOptions) -> AsyncIterator[Tweet]:
+        """Scrape tweets, yielding each new tweet as soon as it is parsed
+
+        Waits for a free browser when `max_browsers` scrapes are already
+        running."""
+        loop = asyncio.get_event_loop()
+
+        if self.__semaphore is None:
+            self.__semaphore = asyncio.Semaphore(self.max_browsers)
+
+        async with self.__semaphore:
+            scraper = await self.__acquire()
+            tweets = scraper.iter_scrape(options)
+
+            pending = None
+
+            try:
+                while True:
+                    pending = self.__executor.submit(next, tweets, _DONE)
+                    tweet = await asyncio.wrap_future(pending)
+
+                    if tweet is _DONE:
+                        break
+
+                    yield tweet
+            finally:
+                # A cancelled next() keeps running in its thread, the
+                # generator can only be closed once it returned
+                if pending is not None and not pending.done():
+                    await asyncio.wait([asyncio.wrap_future(pending)])
+
+                await loop.run_in_executor(self.__executor, tweets.close)
+                self.__idle.append(scraper)
+
+    async def close(self) -> None:
+        """Quit all browsers and shut down the executor"""
+        loop = asyncio.get_event_loop()
+
+        for scraper in self.__scrapers:
+            await loop.run_in_executor(self.__executor, scraper.close)
+
+        self.__idle = []
+        self.__scrapers = []
+        self.__executor.shutdown()
+
+    async def __acquire(self) -> Scraper:
+        if self.__idle:
+            return self.__idle.pop()
+
+        # Starting chrome is blocking, run it in the executor as well
+        scraper = await asyncio.get_event_loop().run_in_executor(
+            self.__executor,
+            lambda: Scraper(
+                options=self.options,
+                sleep_duration=self.sleep_duration,
+                extraction_mode=self.extraction_mode))
+
+        self.__scrapers.append(scraper)
+
+        return scraper
+
+    async def __aenter__(self) -> "AsyncScraper":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
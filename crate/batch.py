@@ -0,0 +1,227 @@
+import heapq
+import operator
+from array import array
+from itertools import compress, repeat
+from typing import Any, Callable, Dict, Iterable, Iterator, List, \
+                    Optional, Sequence, Union
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .utils import Tweet, parse_count, parse_timestamp
+
+
+# Displayed counts normalized to int columns
+COUNT_COLUMNS = ("reply_count", "retweet_count", "like_count")
+
+# Epoch seconds of created_date
+TIMESTAMP_COLUMN = "created_at"
+
+NUMERIC_COLUMNS = COUNT_COLUMNS + (TIMESTAMP_COLUMN,)
+
+# Tweet fields stored as they are
+OBJECT_COLUMNS = tuple(
+    name for name in Tweet.__slots__ if name not in COUNT_COLUMNS)
+
+OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge
+}
+
+Column = Union[array, List[Any]]
+
+Indices = Union[Sequence[int], "numpy.ndarray"]
+
+
+class TweetBatch:
+    """Column-wise container of scraped tweets
+
+    Counts are normalized to int and created_date to epoch seconds, both
+    stored in int64 arrays. Arrays support the buffer protocol so they
+    can be wrapped without copy, e.g. numpy.frombuffer(column, "int64").
+    Displayed counts are kept as well so conversion back to Tweet is
+    lossless.
+
+    When numpy is installed, comparisons, sorts and top k of numeric
+    columns run on such views instead of per row Python calls. Without
+    it the batch is a storage optimization and the same results are
+    computed row by row."""
+
+    def __init__(self, tweets: Optional[Iterable[Tweet]] = None) -> None:
+        self.__columns: Dict[str, Column] = {}
+        # Counts as displayed by twitter e.g. 15.1K
+        self.__display: Dict[str, List[Any]] = {}
+
+        for name in OBJECT_COLUMNS:
+            self.__columns[name] = []
+
+        for name in NUMERIC_COLUMNS:
+            self.__columns[name] = array("q")
+
+        for name in COUNT_COLUMNS:
+            self.__display[name] = []
+
+        if tweets:
+            self.extend(tweets)
+
+    @classmethod
+    def from_tweets(cls, tweets: Iterable[Tweet]) -> "TweetBatch":
+        return cls(tweets)
+
+    def to_tweets(self) -> List[Tweet]:
+        return list(self)
+
+    def append(self, tweet: Tweet) -> None:
+        for name in OBJECT_COLUMNS:
+            self.__columns[name].append(getattr(tweet, name))
+
+        for name in COUNT_COLUMNS:
+            count = getattr(tweet, name)
+            self.__display[name].append(count)
+            self.__columns[name].append(parse_count(count))
+
+        self.__columns[TIMESTAMP_COLUMN].append(
+            parse_timestamp(tweet.created_date))
+
+    def extend(self, tweets: Iterable[Tweet]) -> None:
+        for tweet in tweets:
+            self.append(tweet)
+
+    def column(self, name: str) -> Column:
+        """Returns column by Tweet field name or `created_at`"""
+        if name not in self.__columns:
+            raise KeyError(f"\'{name}\' is not a TweetBatch column")
+
+        return self.__columns[name]
+
+    def compare(
+        self,
+        name: str,
+        op: str,
+        value: Any) -> Union[List[bool], "numpy.ndarray"]:
+        """Returns mask of rows where `column <op> value` holds"""
+        values = self.__numeric(name)
+
+        if values is not None and isinstance(value, (int, float)):
+            return OPERATORS[op](values, value)
+
+        return list(map(OPERATORS[op], self.column(name), repeat(value)))
+
+    def filter(
+        self,
+        mask: Union[Iterable[bool], "numpy.ndarray"]) -> "TweetBatch":
+        """Returns rows where mask is truthy"""
+        if numpy is not None and isinstance(mask, numpy.ndarray):
+            return self.take(numpy.flatnonzero(mask))
+
+        return self.take(list(compress(range(len(self)), mask)))
+
+    def where(self, name: str, op: str, value: Any) -> "TweetBatch":
+        """Returns rows where `column <op> value` holds"""
+        return self.filter(self.compare(name, op, value))
+
+    def sort(self, name: str, reverse: bool = False) -> "TweetBatch":
+        """Returns rows ordered by column, rows of equal value keep their
+        order"""
+        values = self.__numeric(name)
+
+        if values is not None:
+            return self.take(_argsort(values, reverse))
+
+        column = self.column(name)
+
+        return self.take(sorted(range(len(self)), key=column.__getitem__,
+                                reverse=reverse))
+
+    def top_k(self, name: str, k: int) -> "TweetBatch":
+        """Returns k rows with the largest value of column, descending"""
+        values = self.__numeric(name)
+
+        if values is not None:
+            if k <= 0:
+                return self.take([])
+
+            if k < len(values):
+                # Rows tied with the k-th largest value are all kept as
+                # candidates, so ties are broken by row order as in sort
+                kth = numpy.partition(values, len(values) - k)[-k]
+                candidates = numpy.flatnonzero(values >= kth)
+
+                return self.take(candidates[
+                    _argsort(values[candidates], reverse=True)[:k]])
+
+            return self.take(_argsort(values, reverse=True))
+
+        column = self.column(name)
+
+        return self.take(heapq.nlargest(k, range(len(self)),
+                                        key=column.__getitem__))
+
+    def take(self, indices: Indices) -> "TweetBatch":
+        """Returns rows at indices, in the given order"""
+        batch = TweetBatch()
+        gathered = ()
+
+        if numpy is not None and isinstance(indices, numpy.ndarray):
+            gathered = NUMERIC_COLUMNS
+
+            for name in gathered:
+                values = self.__numeric(name)[indices]
+                batch.__columns[name] = array("q", values.tobytes())
+
+            indices = indices.tolist()
+
+        for name, column in self.__columns.items():
+            if name in gathered:
+                continue
+
+            values = map(column.__getitem__, indices)
+            batch.__columns[name] = array("q", values) \
+                if isinstance(column, array) else list(values)
+
+        for name, column in self.__display.items():
+            batch.__display[name] = list(map(column.__getitem__, indices))
+
+        return batch
+
+    def __numeric(self, name: str) -> Optional["numpy.ndarray"]:
+        """Read only int64 view of a numeric column, None without numpy"""
+        column = self.column(name)
+
+        if numpy is None or not isinstance(column, array):
+            return None
+
+        if not column:
+            return numpy.zeros(0, dtype=numpy.int64)
+
+        return numpy.frombuffer(column, dtype=numpy.int64)
+
+    def __len__(self) -> int:
+        return len(self.__columns["tweet_id"])
+
+    def __iter__(self) -> Iterator[Tweet]:
+        fields = [self.__display[name] if name in self.__display
+                  else self.__columns[name] for name in Tweet.__slots__]
+
+        for values in zip(*fields):
+            yield Tweet(*values)
+
+
+def _argsort(
+    values: "numpy.ndarray",
+    reverse: bool = False) -> "numpy.ndarray":
+    """Stable argsort, equal values keep their order when reversed too"""
+    if not reverse:
+        return numpy.argsort(values, kind="stable")
+
+    # Sorting the reversed values and reversing the result orders
+    # descending with equal values in row order
+    order = numpy.argsort(values[::-1], kind="stable")
+
+    return (len(values) - 1 - order)[::-1]
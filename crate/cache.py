@@ -0,0 +1,138 @@
+import os
+import json
+import sqlite3
+from time import time
+from datetime import datetime
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from .const import TWITTER_SEARCH_URL
+from .filters import TweetFilter
+from .utils import ScraperOptions, Tweet, construct_url
+
+
+CACHE_FILE = "results.sqlite3"
+
+
+def normalize_url(url: str) -> str:
+    """Sort query parameters so equivalent search urls compare equal"""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query)))
+
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(),
+                       parts.path, query, ""))
+
+
+class ResultCache:
+    """On-disk cache of scrape results in a SQLite database
+
+    Entries are keyed by the normalized search url and limit. Queries
+    whose `until` is in the past cannot get new tweets, they are kept for
+    `closed_ttl` seconds instead of `ttl`. At most `max_entries` are
+    kept, least recently used entries are evicted first."""
+
+    def __init__(
+        self,
+        directory: str,
+        ttl: float = 3600,
+        closed_ttl: float = 30 * 24 * 3600,
+        max_entries: int = 1000) -> None:
+        self.directory = directory
+        self.ttl = ttl
+        self.closed_ttl = closed_ttl
+        self.max_entries = max_entries
+
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, CACHE_FILE)
+
+        with self.__connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    tweets TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )""")
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS results_accessed_at
+                ON results (accessed_at)""")
+
+    def key(
+        self,
+        options: ScraperOptions,
+        base_url: str = TWITTER_SEARCH_URL) -> str:
+        key = "{} limit={}".format(
+            normalize_url(construct_url(options, base_url)), options.limit)
+
+        tweet_filter = TweetFilter.from_options(options)
+
+        if tweet_filter:
+            key += " " + tweet_filter.key()
+
+        return key
+
+    def ttl_for(self, options: ScraperOptions) -> float:
+        if options.until and options.until <= datetime.utcnow():
+            return self.closed_ttl
+
+        return self.ttl
+
+    def get(
+        self,
+        options: ScraperOptions,
+        base_url: str = TWITTER_SEARCH_URL) -> Optional[List[Tweet]]:
+        """Returns cached tweets, None if missing or expired"""
+        key = self.key(options, base_url)
+        now = time()
+
+        with self.__connect() as conn:
+            row = conn.execute(
+                "SELECT tweets FROM results WHERE key = ? AND expires_at > ?",
+                (key, now)).fetchone()
+
+            if row is None:
+                return None
+
+            conn.execute(
+                "UPDATE results SET accessed_at = ? WHERE key = ?",
+                (now, key))
+
+        return [Tweet.from_dict(tweet) for tweet in json.loads(row[0])]
+
+    def set(
+        self,
+        options: ScraperOptions,
+        tweets: List[Tweet],
+        base_url: str = TWITTER_SEARCH_URL) -> None:
+        now = time()
+
+        with self.__connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                (self.key(options, base_url),
+                 json.dumps([tweet.to_dict() for tweet in tweets]),
+                 now + self.ttl_for(options),
+                 now))
+
+            conn.execute("DELETE FROM results WHERE expires_at <= ?", (now,))
+            conn.execute("""
+                DELETE FROM results WHERE key IN (
+                    SELECT key FROM results
+                    ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )""", (self.max_entries,))
+
+    def clear(self) -> None:
+        with self.__connect() as conn:
+            conn.execute("DELETE FROM results")
+
+    @contextmanager
+    def __connect(self) -> Iterator[sqlite3.Connection]:
+        # Connection per operation, so cache can be shared across threads
+        conn = sqlite3.connect(self.path, timeout=30)
+
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
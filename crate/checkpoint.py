@@ -0,0 +1,151 @@
+import os
+import json
+from time import time
+from typing import List, Optional, Set
+
+from .utils import ScraperOptions, Tweet, TweetDisplayType, narrow_until, \
+    parse_timestamp
+
+
+class Checkpoint:
+    """Progress of a long running scrape saved to a local file
+
+    Holds the search url, ids of emitted tweets and the oldest
+    created_date reached. It is written every `interval` tweets and when
+    the scrape ends. Ids are appended to a `.ids` file next to `path`,
+    one JSON string per line, so a save only writes ids emitted since the
+    previous save. With `resume` set, a checkpoint of the same search
+    url is loaded and the scrape restarts from the oldest tweet reached,
+    skipping tweets already emitted.
+
+    Resume narrows `until` to the oldest tweet only for the date ordered
+    Latest display type, other display types restart from the top and
+    skip tweets already emitted."""
+
+    def __init__(
+        self,
+        path: str,
+        interval: int = 100,
+        resume: bool = False) -> None:
+        self.path = path
+        self.interval = interval
+        self.resume = resume
+
+        # Ids of emitted tweets, the first line holds the query
+        self.ids_path = path + ".ids"
+
+        self.query: Optional[str] = None
+        self.seen_ids: Set[str] = set()
+        self.oldest: Optional[str] = None
+
+        self.__pending = 0
+        # Ids not yet appended to ids_path
+        self.__new_ids: List[str] = []
+        # False until ids_path was started for the current query
+        self.__appending = False
+
+    def start(self, query: str) -> bool:
+        """Start tracking a scrape of search url `query`
+
+        Returns True if progress of a previous run was loaded"""
+        self.query = query
+        self.seen_ids = set()
+        self.oldest = None
+        self.__pending = 0
+        self.__new_ids = []
+        self.__appending = False
+
+        if not self.resume or not os.path.exists(self.path):
+            return False
+
+        with open(self.path, encoding="utf-8") as f:
+            state = json.load(f)
+
+        if state.get("query") != query:
+            return False
+
+        self.seen_ids = self.__load_ids(query)
+        self.oldest = state.get("oldest")
+
+        return True
+
+    def resume_options(self, options: ScraperOptions) -> ScraperOptions:
+        """Narrow options to continue from the oldest tweet reached"""
+        if options.limit != float("inf"):
+            options = options.replace(
+                limit=max(0, options.limit - len(self.seen_ids)))
+
+        if self.oldest and \
+                options.display_type == TweetDisplayType.LATEST:
+            options = narrow_until(options, self.oldest)
+
+        return options
+
+    def update(self, tweet: Tweet) -> bool:
+        """Track an emitted tweet
+
+        Returns True when a checkpoint is due"""
+        if tweet.tweet_id not in self.seen_ids:
+            self.seen_ids.add(tweet.tweet_id)
+            self.__new_ids.append(tweet.tweet_id)
+
+        if tweet.created_date and (self.oldest is None or \
+                parse_timestamp(tweet.created_date) < \
+                parse_timestamp(self.oldest)):
+            self.oldest = tweet.created_date
+
+        self.__pending += 1
+
+        return self.__pending >= self.interval
+
+    def save(self) -> None:
+        """Append new ids and atomically write checkpoint file"""
+        if not self.__appending or self.__new_ids:
+            mode = "a" if self.__appending else "w"
+
+            with open(self.ids_path, mode, encoding="utf-8") as f:
+                if not self.__appending:
+                    f.write(json.dumps({"query": self.query}) + "\n")
+
+                f.writelines(json.dumps(tweet_id) + "\n"
+                             for tweet_id in self.__new_ids)
+
+            self.__appending = True
+            self.__new_ids = []
+
+        tmp_path = self.path + ".tmp"
+
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "query": self.query,
+                "seen_count": len(self.seen_ids),
+                "oldest": self.oldest,
+                "updated": time()
+            }, f)
+
+        os.replace(tmp_path, self.path)
+        self.__pending = 0
+
+    def __load_ids(self, query: str) -> Set[str]:
+        """Ids saved for query, empty if ids_path belongs to another query
+
+        A line cut short by a crash is dropped from the file, so appends
+        start on a new line."""
+        if not os.path.exists(self.ids_path):
+            return set()
+
+        with open(self.ids_path, "rb") as f:
+            data = f.read()
+
+        complete = data.rfind(b"\n") + 1
+        lines = data[:complete].decode("utf-8").splitlines()
+
+        if not lines or json.loads(lines[0]).get("query") != query:
+            return set()
+
+        if complete < len(data):
+            os.truncate(self.ids_path, complete)
+
+        self.__appending = True
+
+        return {json.loads(line) for line in lines[1:]}
@@ -0,0 +1,79 @@
+import os
+import json
+import threading
+from typing import Dict, Optional, Tuple
+
+
+# Resolved chromedriver path of each Chrome version
+CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "crate",
+                          "chromedriver.json")
+
+# Paths resolved by this process by Chrome version and cache file
+_resolved: Dict[Tuple[Optional[str], Optional[str]], str] = {}
+_lock = threading.Lock()
+
+
+def resolve_chromedriver(cache_file: Optional[str] = CACHE_FILE) -> str:
+    """Returns path of chromedriver matching the installed Chrome
+
+    chromedriver_autoinstaller probes versions and checks the filesystem
+    on every install, so resolved paths are kept in `cache_file` keyed by
+    Chrome version, and in memory for the rest of the process. Chrome is
+    probed on every call, so an upgrade resolves a new path. A cached
+    path whose binary was removed is resolved again. Pass None as
+    cache_file to disable the on-disk cache."""
+    import chromedriver_autoinstaller
+
+    with _lock:
+        version = chromedriver_autoinstaller.get_chrome_version()
+        key = (version, cache_file)
+
+        if _resolved.get(key) and os.path.isfile(_resolved[key]):
+            return _resolved[key]
+
+        cache = _load(cache_file)
+        path = cache.get(version) if version else None
+
+        if not path or not os.path.isfile(path):
+            path = chromedriver_autoinstaller.install()
+
+            if version and path:
+                cache[version] = path
+                _save(cache_file, cache)
+
+        if path:
+            _resolved[key] = path
+
+        return path
+
+
+def _load(cache_file: Optional[str]) -> Dict[str, str]:
+    if not cache_file:
+        return {}
+
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    return cache if isinstance(cache, dict) else {}
+
+
+def _save(cache_file: Optional[str], cache: Dict[str, str]) -> None:
+    if not cache_file:
+        return
+
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+
+        # Write to a temporary file first, concurrent workers never
+        # read a partially written cache
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass
@@ -1 +1,68 @@
-TWITTER_SEARCH_URL = "https://twitter.com/search"
\ No newline at end of file
+TWITTER_SEARCH_URL = "https://twitter.com/search"
+
+# XPath selectors of tweet card fields, relative to the card element.
+# Shared by every extraction mode.
+# https://github.com/Altimis/Scweet/
+XPATH_CARD = '//article[@data-testid="tweet"]'
+XPATH_TWEET_URL = './/a[contains(@href, "/status/")]'
+XPATH_PROMOTED = './/div[2]/div[2]/*[last()]//span'
+XPATH_DISPLAY_NAME = './/span'
+XPATH_USERNAME = './/span[contains(text(), "@")]'
+XPATH_CREATED_DATE = './/time'
+XPATH_TEXT = './/div[2]/div[2]/div[2]/div[1]'
+XPATH_EMBEDDED = './/div[2]/div[2]/div[2]'
+XPATH_REPLY_COUNT = './/div[@data-testid="reply"]'
+XPATH_RETWEET_COUNT = './/div[@data-testid="retweet"]'
+XPATH_LIKE_COUNT = './/div[@data-testid="like"]'
+XPATH_EMOJIS = './/img[contains(@src, "emoji")]'
+XPATH_IMAGE_LINKS = './/div[2]/div[2]//img' + \
+                    '[contains(@src, "https://pbs.twimg.com/")]'
+
+# Paths of timeline API endpoints whose responses are parsed by network
+# extraction
+TIMELINE_API_PATHS = [
+    "/i/api/2/search/adaptive.json",
+    "/SearchTimeline"
+]
+
+# URL patterns blocked by driver resource profiles, matched by Chrome
+# DevTools Network.setBlockedURLs where * is a wildcard
+BLOCKED_MEDIA_URLS = [
+    "*video.twimg.com*",
+    "*.mp4*",
+    "*.m3u8*",
+    "*.m4s*"
+]
+BLOCKED_FONT_URLS = [
+    "*.woff*",
+    "*.ttf*",
+    "*.otf*"
+]
+BLOCKED_TRACKER_URLS = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*ads-twitter.com*",
+    "*analytics.twitter.com*",
+    "*scribe.twitter.com*",
+    "*/jot/*"
+]
+BLOCKED_IMAGE_URLS = [
+    "*pbs.twimg.com*",
+    "*abs.twimg.com/emoji*",
+    "*abs-0.twimg.com/emoji*",
+    "*.jpg*",
+    "*.png*",
+    "*.gif*",
+    "*.webp*"
+]
+
+# Stop css animations and transitions on every document
+DISABLE_ANIMATIONS_SCRIPT = """
+document.addEventListener('DOMContentLoaded', function () {
+    const style = document.createElement('style');
+    style.textContent = '*, *::before, *::after { ' +
+        'animation: none !important; transition: none !important; }';
+    document.head.appendChild(style);
+});
+"""
\ No newline at end of file
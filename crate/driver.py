@@ -1,27 +1,92 @@
-from typing import Any, Optional, Union
+import os
+import json
+import base64
+from queue import Queue
+from contextlib import contextmanager
+from time import sleep, monotonic
+from typing import Any, Callable, Iterator, List, Optional, Tuple, Union
 
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
+from selenium.common.exceptions import WebDriverException
 
-import chromedriver_autoinstaller
+from . import const, scripts
+from .chromedriver import resolve_chromedriver
+from .ratelimit import RateLimiter
+from .watchdog import process_tree_rss
+
+
+class ResourceProfile:
+    # Block images, video, fonts and trackers
+    MINIMAL = "minimal"
+    # Block video, fonts and trackers
+    TEXT = "text"
+    # Load everything
+    FULL = "full"
+
+    def validate(p: str) -> bool:
+        allowed_profile = ["minimal", "text", "full"]
+        return p in allowed_profile
 
 
 class DriverOptions:
+    __slots__ = (
+        "driver_path",
+        "headless",
+        "proxy",
+        "show_images",
+        "option",
+        "resource_profile",
+        "profile_dir",
+        "capture_network",
+        "rate_limiter"
+    )
+
     def __init__(
         self,
         driver_path: Optional[str]=None,
         headless: Optional[bool]=True,
         proxy: Optional[str]=None,
-        show_images: Optional[bool]=False,
-        option: Optional[str]=None):
-        self._options = locals()
-    
-    def __getattribute__(self, __name: str) -> Any:
-        if __name in object.__getattribute__(self, '_options'):
-            return object.__getattribute__(self, '_options').get(__name)
-        else:
-            return object.__getattribute__(self, __name)
+        show_images: Optional[bool]=None,
+        option: Optional[str]=None,
+        resource_profile: Optional[str]=ResourceProfile.FULL,
+        profile_dir: Optional[str]=None,
+        capture_network: Optional[bool]=False,
+        rate_limiter: Optional[RateLimiter]=None):
+
+        if not ResourceProfile.validate(resource_profile):
+            raise Exception(f"\'{resource_profile}\'" + \
+                " is not recognized as valid ResourceProfile")
+
+        self.driver_path = driver_path
+        self.headless = headless
+        self.proxy = proxy
+        # Images load unless disabled with show_images=False or by the
+        # minimal resource profile
+        self.show_images = show_images
+        self.option = option
+        self.resource_profile = resource_profile
+        # Chrome user data directory prepared with build_profile, one
+        # directory can only be used by one running browser
+        self.profile_dir = profile_dir
+        # Record network responses in Chrome performance log, required
+        # by network extraction
+        self.capture_network = capture_network
+        # Shared by every driver started with these options, page loads
+        # and scrolls wait for a token
+        self.rate_limiter = rate_limiter
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DriverOptions":
+        return cls(**data)
+
+    def replace(self, **kwargs) -> "DriverOptions":
+        """Returns a copy of these options with given fields replaced"""
+        return DriverOptions(**{**self.to_dict(), **kwargs})
 
 
 class Driver:
@@ -29,9 +94,14 @@ class Driver:
     def __init__(
         self,
         options: Optional[DriverOptions]) -> None:
+        self.options = options
+        self.__start()
+
+    def __start(self) -> None:
+        options = self.options
 
         if options and options.driver_path == None:
-            chromedriver_path = chromedriver_autoinstaller.install()
+            chromedriver_path = resolve_chromedriver()
         else:
             chromedriver_path = options.driver_path
 
@@ -47,30 +117,281 @@ class Driver:
         if options.proxy:
             driver_options.add_argument(f"--proxy-server={options.proxy}")
         
-        if options.show_images:
+        if options.show_images is False or \
+                options.resource_profile == ResourceProfile.MINIMAL:
             prefs = {"profile.managed_default_content_settings.images": 2}
             driver_options.add_experimental_option("prefs", prefs)
+
+        if options.resource_profile != ResourceProfile.FULL:
+            driver_options.add_argument(
+                "--autoplay-policy=user-gesture-required")
         
+        # Keep background tabs loading at full speed
+        driver_options.add_argument("--disable-background-timer-throttling")
+        driver_options.add_argument("--disable-renderer-backgrounding")
+        driver_options.add_argument(
+            "--disable-backgrounding-occluded-windows")
+        
+        # Skip first run setup of a fresh profile
+        driver_options.add_argument("--no-first-run")
+        driver_options.add_argument("--no-default-browser-check")
+
+        if options.profile_dir:
+            driver_options.add_argument(
+                f"--user-data-dir={os.path.abspath(options.profile_dir)}")
+
         if options.option:
             driver_options.add_argument(options.option)
 
+        capabilities = {}
+
+        if options.capture_network:
+            capabilities["goog:loggingPrefs"] = {"performance": "ALL"}
+
         self.driver = webdriver.Chrome(
                             executable_path=chromedriver_path,
-                            options=driver_options)
+                            options=driver_options,
+                            desired_capabilities=capabilities or None)
+
+        self.resource_profile = options.resource_profile
+        self.apply_resource_profile()
+
+        self.__tab = self.driver.current_window_handle
+        # Loading state before the last scroll of each tab
+        self.__scroll_state = {}
+        # Url of matching responses still loading, by request id
+        self.__pending_responses = {}
     
+    def apply_resource_profile(self):
+        """Block resources of the profile through Chrome DevTools
+
+        Blocking applies to the current window, it has to be applied
+        again for newly opened windows"""
+        if self.resource_profile == ResourceProfile.FULL:
+            return
+
+        blocked_urls = const.BLOCKED_MEDIA_URLS + \
+                        const.BLOCKED_FONT_URLS + \
+                        const.BLOCKED_TRACKER_URLS
+
+        if self.resource_profile == ResourceProfile.MINIMAL:
+            blocked_urls = blocked_urls + const.BLOCKED_IMAGE_URLS
+
+        self.driver.execute_cdp_cmd("Network.enable", {})
+        self.driver.execute_cdp_cmd(
+            "Network.setBlockedURLs", {"urls": blocked_urls})
+        self.driver.execute_cdp_cmd(
+            "Emulation.setEmulatedMedia",
+            {"features": [{"name": "prefers-reduced-motion",
+                           "value": "reduce"}]})
+        self.driver.execute_cdp_cmd(
+            "Page.addScriptToEvaluateOnNewDocument",
+            {"source": const.DISABLE_ANIMATIONS_SCRIPT})
+    
+    @property
+    def tab(self) -> str:
+        """Window handle of the current tab"""
+        return self.__tab
+
+    @property
+    def tabs(self) -> List[str]:
+        """Window handles of all open tabs"""
+        return self.driver.window_handles
+
+    def open_tab(self) -> str:
+        """Open a blank tab and switch to it, returns its handle"""
+        handles = set(self.driver.window_handles)
+        self.driver.execute_script("window.open('about:blank');")
+        handle = (set(self.driver.window_handles) - handles).pop()
+
+        self.switch_tab(handle)
+        self.apply_resource_profile()
+
+        return handle
+
+    def switch_tab(self, handle: str):
+        if handle != self.__tab:
+            self.driver.switch_to.window(handle)
+            self.__tab = handle
+
+    def close_tab(self, handle: str):
+        """Close tab and switch to the first remaining one"""
+        self.switch_tab(handle)
+        self.driver.close()
+        self.__scroll_state.pop(handle, None)
+
+        self.__tab = None
+        self.switch_tab(self.driver.window_handles[0])
+
     def get(self, url: str):
+        if self.options.rate_limiter:
+            self.options.rate_limiter.acquire()
+
+        self.__scroll_state.pop(self.__tab, None)
+
+        # Drop responses of the previous page
+        if self.options.capture_network:
+            self.driver.get_log("performance")
+            self.__pending_responses = {}
+
         self.driver.get(url)
 
+    def captured_responses(
+        self,
+        match: Callable[[str], bool]) -> List[Tuple[str, str]]:
+        """Returns (url, body) of responses finished since the last call
+
+        Only responses whose url satisfies `match` are returned, in the
+        order they finished. Requires DriverOptions.capture_network,
+        responses of all tabs are returned."""
+        responses = []
+
+        for entry in self.driver.get_log("performance"):
+            message = json.loads(entry["message"])["message"]
+            method = message.get("method")
+            params = message.get("params") or {}
+
+            if method == "Network.responseReceived":
+                url = params["response"]["url"]
+
+                if match(url):
+                    self.__pending_responses[params["requestId"]] = url
+            elif method == "Network.loadingFinished" and \
+                    params["requestId"] in self.__pending_responses:
+                url = self.__pending_responses.pop(params["requestId"])
+
+                try:
+                    body = self.driver.execute_cdp_cmd(
+                        "Network.getResponseBody",
+                        {"requestId": params["requestId"]})
+                except WebDriverException:
+                    # Body was already evicted from the browser
+                    continue
+
+                if body.get("base64Encoded"):
+                    body["body"] = base64.b64decode(body["body"]) \
+                                        .decode("utf-8", "replace")
+
+                responses.append((url, body["body"]))
+            elif method == "Network.loadingFailed":
+                self.__pending_responses.pop(params.get("requestId"), None)
+
+        return responses
+
+    def reset(self):
+        """Stop pending page loads and navigate to a blank page
+
+        Other tabs are closed"""
+        for handle in self.driver.window_handles[1:]:
+            self.close_tab(handle)
+
+        self.__scroll_state = {}
+        self.driver.execute_script("window.stop();")
+        self.driver.get("about:blank")
+
+    def quit(self):
+        self.driver.quit()
+
+    def restart(self):
+        """Quit the browser and start a new one with the same options"""
+        try:
+            self.driver.quit()
+        except WebDriverException:
+            pass
+
+        self.__start()
+
+    def js_heap_size(self) -> Optional[int]:
+        """Returns used JS heap of the current page in bytes"""
+        return self.driver.execute_script(
+            "return performance.memory ? " + \
+            "performance.memory.usedJSHeapSize : null;")
+
+    def process_rss(self) -> Optional[int]:
+        """Returns resident memory of chromedriver and Chrome in bytes"""
+        return process_tree_rss(self.driver.service.process.pid)
+
+    def is_alive(self) -> bool:
+        """Returns True if browser still responds to commands"""
+        try:
+            self.driver.execute_script("return 1;")
+        except WebDriverException:
+            return False
+
+        return True
+
     def scroll(self) -> int:
         """Scroll window using javascript
 
-        Returns current window Y position after scrolling"""
+        Returns current window Y position after scrolling. Loading state
+        before scrolling is kept so `wait_for_load` can tell whether the
+        page actually grew."""
+
+        if self.options.rate_limiter:
+            self.options.rate_limiter.acquire()
+
+        self.__scroll_state[self.__tab] = self.load_state()
 
         self.driver.execute_script(
             "window.scrollTo(0, document.body.scrollHeight);")
         
         return self.driver.execute_script("return window.pageYOffset;")
 
+    def load_state(self) -> dict:
+        """Returns page height, last rendered card and loading indicators"""
+        return self.driver.execute_script(scripts.LOAD_STATE)
+
+    def page_error(self) -> bool:
+        """Returns True if the page shows a rate limit or error message"""
+        return self.load_state()["error"]
+
+    def wait_for_load(
+        self,
+        timeout: float,
+        poll_frequency: float = 0.2) -> bool:
+        """Wait until new cards are rendered after the last scroll
+
+        Returns as soon as the page grew and loading spinner is gone, or
+        the timeline shows its empty state or an error. `timeout` is the
+        maximum time to wait in seconds.
+
+        Returns True if the page grew since the last scroll"""
+
+        deadline = monotonic() + timeout
+
+        while True:
+            ready, grown = self.poll_load()
+
+            if ready:
+                return grown
+
+            remaining = deadline - monotonic()
+
+            if remaining <= 0:
+                return grown
+
+            sleep(min(poll_frequency, remaining))
+
+    def poll_load(self) -> Tuple[bool, bool]:
+        """Check once whether the current tab loaded after last scroll
+
+        Returns (ready, grown): ready when the page grew and loading
+        spinner is gone or the timeline shows its empty state or an
+        error, grown when the page grew since the last scroll"""
+        before = self.__scroll_state.get(self.__tab) or {}
+        state = self.load_state()
+
+        grown = state["height"] > before.get("height", 0) or \
+                state["last_card"] != before.get("last_card")
+
+        ready = state["empty"] or state["error"] or \
+                (grown and not state["loading"])
+
+        return ready, grown
+
+    def execute_script(self, script: str, *args) -> Any:
+        return self.driver.execute_script(script, *args)
+
     def find_element(
         self,
         by: Union[By, str],
@@ -95,4 +416,100 @@ class Driver:
             "css selector": By.CSS_SELECTOR
         }
 
-        return pair[by]
\ No newline at end of file
+        return pair[by]
+
+
+def build_profile(
+    profile_dir: str,
+    options: Optional[DriverOptions] = None) -> str:
+    """Prepare a Chrome profile directory for faster browser launch
+
+    Starts the browser once on `profile_dir` and quits, so profile
+    creation and first run work is already done when a Driver is started
+    with DriverOptions(profile_dir=...). Returns the directory."""
+    options = options or DriverOptions()
+
+    driver = Driver(options.replace(profile_dir=profile_dir))
+    driver.get("about:blank")
+    driver.quit()
+
+    return profile_dir
+
+
+class DriverPool:
+    """Pool of warm Driver instances
+
+    Drivers are started once and lent out with `acquire` or `borrow`.
+    Returned drivers are reset to a blank page, drivers that crashed
+    are replaced with a new instance."""
+
+    def __init__(
+        self,
+        options: Optional[DriverOptions] = DriverOptions(),
+        size: int = 2) -> None:
+        self.options = options
+        self.size = size
+
+        self.__closed = False
+        self.__idle = Queue()
+
+        for _ in range(size):
+            self.__idle.put(Driver(options))
+
+    def acquire(self, timeout: Optional[float] = None) -> Driver:
+        """Borrow an idle driver, blocks until one is available"""
+        if self.__closed:
+            raise Exception("DriverPool is closed")
+
+        driver = self.__idle.get(timeout=timeout)
+
+        if not driver.is_alive():
+            driver = self.__replace(driver)
+
+        return driver
+
+    def release(self, driver: Driver) -> None:
+        """Return a borrowed driver to the pool"""
+        if self.__closed:
+            driver.quit()
+            return
+
+        try:
+            driver.reset()
+        except WebDriverException:
+            driver = self.__replace(driver)
+
+        self.__idle.put(driver)
+
+    @contextmanager
+    def borrow(self, timeout: Optional[float] = None) -> Iterator[Driver]:
+        driver = self.acquire(timeout)
+
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def close(self) -> None:
+        """Quit idle drivers, borrowed drivers quit when released"""
+        self.__closed = True
+
+        while not self.__idle.empty():
+            try:
+                self.__idle.get_nowait().quit()
+            except WebDriverException:
+                pass
+
+    def __replace(self, driver: Driver) -> Driver:
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+
+        return Driver(self.options)
+
+    def __enter__(self) -> "DriverPool":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
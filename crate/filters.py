@@ -0,0 +1,118 @@
+from typing import List, Optional, Set, Union
+
+from .utils import ScraperOptions, TweetDisplayType, parse_count, \
+                    parse_timestamp
+
+
+def normalize_username(username: str) -> str:
+    """Normalize username for comparison, e.g. @ElonMusk to elonmusk"""
+    return (username or "").strip().lstrip("@").lower()
+
+
+class TweetFilter:
+    """Card filters and stop condition of one scrape
+
+    Built from the filter fields of ScraperOptions. Each check takes one
+    cheaply extracted card field, so a card can be rejected before the
+    full parse. Ids of rejected cards are kept in `rejected`.
+
+    Latest timeline is ordered by creation date, once a card older than
+    `created_after` is seen every following card is older too and
+    `crossed` is set to stop scrolling."""
+
+    def __init__(
+        self,
+        created_after: Optional[int] = None,
+        created_before: Optional[int] = None,
+        min_like_count: Optional[int] = None,
+        require_media: bool = False,
+        exclude_usernames: Optional[Set[str]] = None,
+        monotone: bool = False) -> None:
+        self.created_after = created_after
+        self.created_before = created_before
+        self.min_like_count = min_like_count
+        self.require_media = require_media
+        self.exclude_usernames = exclude_usernames or set()
+        self.monotone = monotone
+
+        self.crossed = False
+        self.rejected: Set[str] = set()
+
+    @classmethod
+    def from_options(cls, options: ScraperOptions) -> Optional["TweetFilter"]:
+        """Returns filter of options, None when no filter is set"""
+        exclude = options.exclude_usernames
+
+        if isinstance(exclude, str):
+            exclude = [exclude]
+
+        tweet_filter = cls(
+            parse_timestamp(options.created_after) or None,
+            parse_timestamp(options.created_before) or None,
+            options.min_like_count,
+            bool(options.require_media),
+            {normalize_username(u) for u in exclude or []},
+            options.display_type == TweetDisplayType.LATEST)
+
+        return tweet_filter if tweet_filter.active else None
+
+    @property
+    def active(self) -> bool:
+        return self.created_after is not None or \
+            self.created_before is not None or \
+            bool(self.min_like_count) or \
+            self.require_media or \
+            bool(self.exclude_usernames)
+
+    @property
+    def filters_date(self) -> bool:
+        return self.created_after is not None or \
+            self.created_before is not None
+
+    def key(self) -> str:
+        """Stable description of the filter, part of result cache key"""
+        return "created_after={} created_before={} min_like_count={} " \
+            "require_media={} exclude_usernames={}".format(
+                self.created_after, self.created_before, self.min_like_count,
+                self.require_media, ",".join(sorted(self.exclude_usernames)))
+
+    def check_created_date(self, created_date: Optional[str]) -> bool:
+        if not self.filters_date:
+            return True
+
+        timestamp = parse_timestamp(created_date)
+
+        if not timestamp:
+            return True
+
+        if self.created_after is not None and timestamp < self.created_after:
+            if self.monotone:
+                self.crossed = True
+
+            return False
+
+        if self.created_before is not None and \
+                timestamp >= self.created_before:
+            return False
+
+        return True
+
+    def check_username(self, username: Optional[str]) -> bool:
+        return normalize_username(username) not in self.exclude_usernames
+
+    def check_like_count(self, like_count: Union[int, str, None]) -> bool:
+        return not self.min_like_count or \
+            parse_count(like_count) >= self.min_like_count
+
+    def check_media(self, image_links: Optional[List[str]]) -> bool:
+        return not self.require_media or bool(image_links)
+
+    def match_record(self, record: dict) -> bool:
+        """Returns True if card record passes every filter
+
+        The creation date is checked first, so the stop condition is
+        updated even for cards rejected by another filter."""
+        return self.check_created_date(record.get('created_date')) and \
+            self.check_username(record.get('username')) and \
+            self.check_like_count(record.get('like_count')) and \
+            self.check_media(record.get('image_links'))
@@ -0,0 +1,257 @@
+import os
+import json
+import hashlib
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import urllib3
+
+from .utils import Tweet
+
+
+INDEX_FILE = "index.jsonl"
+
+# Largest image variant served by pbs.twimg.com
+LARGEST_VARIANT = "orig"
+
+CHUNK_SIZE = 64 * 1024
+
+
+def media_variant(url: str, name: str = LARGEST_VARIANT) -> str:
+    """Returns media url with its `name=` size variant replaced
+
+    e.g. ...?format=jpg&name=small to ...?format=jpg&name=orig"""
+    parts = urlsplit(url)
+    query = [(key, value) for key, value in parse_qsl(parts.query)
+             if key != "name"]
+    query.append(("name", name))
+
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def media_extension(url: str) -> str:
+    """File extension of media url, from its `format=` or its path"""
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+
+    if query.get("format"):
+        return "." + query["format"]
+
+    return os.path.splitext(parts.path)[1] or ".bin"
+
+
+def _path(future: Future) -> Optional[str]:
+    """Local path of a finished download, None when it failed"""
+    return None if future.exception() else future.result()
+
+
+class MediaDownloader:
+    """Download image_links of tweets concurrently to a directory
+
+    Files are stored by the sha256 of their content, so identical images
+    are stored once. Downloaded urls are kept in an index and never
+    fetched again, also across runs. At most `workers` downloads run at
+    the same time over one keep-alive connection pool.
+
+    With `variant` e.g. "orig", urls are rewritten to that size variant
+    before download. Local paths are set on `Tweet.media_paths` in the
+    order of image_links, None for failed downloads."""
+
+    def __init__(
+        self,
+        directory: str,
+        workers: int = 8,
+        variant: Optional[str] = None,
+        timeout: float = 30.0,
+        retries: int = 2) -> None:
+        self.directory = directory
+        self.workers = workers
+        self.variant = variant
+
+        os.makedirs(directory, exist_ok=True)
+
+        self.__http = urllib3.PoolManager(
+            num_pools=4,
+            maxsize=workers,
+            block=True,
+            timeout=urllib3.Timeout(total=timeout),
+            retries=urllib3.Retry(
+                total=retries,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504)))
+        self.__executor = ThreadPoolExecutor(max_workers=workers)
+        self.__lock = threading.Lock()
+        # Downloads by url, finished or in flight
+        self.__downloads: Dict[str, Future] = {}
+        self.__index: Dict[str, str] = self.__load_index()
+
+    def download(self, url: str) -> Future:
+        """Schedule download of url, returns Future of the local path
+
+        The future result is None when the download failed"""
+        if self.variant:
+            url = media_variant(url, self.variant)
+
+        with self.__lock:
+            future = self.__downloads.get(url)
+
+            if future is not None:
+                return future
+
+            path = self.__index.get(url)
+
+            if path and os.path.isfile(path):
+                future = Future()
+                future.set_result(path)
+            else:
+                future = self.__executor.submit(self.__fetch, url)
+
+            self.__downloads[url] = future
+
+        # Failed downloads are tried again by later tweets
+        future.add_done_callback(
+            lambda f: _path(f) is None and self.__forget(url, f))
+
+        return future
+
+    def submit(self, tweet: Tweet) -> Future:
+        """Schedule downloads of tweet image_links
+
+        Returns Future of the tweet, with media_paths set once every
+        download finished"""
+        futures = [self.download(url) for url in tweet.image_links or []]
+        result = Future()
+
+        if not futures:
+            tweet.media_paths = []
+            result.set_result(tweet)
+            return result
+
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def done(_):
+            with lock:
+                remaining[0] -= 1
+
+                if remaining[0]:
+                    return
+
+            tweet.media_paths = [_path(f) for f in futures]
+            result.set_result(tweet)
+
+        for future in futures:
+            future.add_done_callback(done)
+
+        return result
+
+    def iter_download(
+        self,
+        tweets: Iterable[Tweet],
+        max_pending: int = 64) -> Iterator[Tweet]:
+        """Download media of tweets while they are produced
+
+        Yields tweets in their original order once their media is
+        downloaded. At most `max_pending` tweets wait for downloads, the
+        source is not consumed further until the oldest one is done.
+        Closing this generator closes `tweets` if it is a generator."""
+        pending = deque()
+
+        try:
+            for tweet in tweets:
+                pending.append(self.submit(tweet))
+
+                while pending and (pending[0].done() or
+                                   len(pending) >= max_pending):
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            if hasattr(tweets, "close"):
+                tweets.close()
+
+    def close(self) -> None:
+        """Wait for running downloads and release connections"""
+        self.__executor.shutdown()
+        self.__http.clear()
+
+    def __forget(self, url: str, future: Future) -> None:
+        with self.__lock:
+            if self.__downloads.get(url) is future:
+                del self.__downloads[url]
+
+    def __fetch(self, url: str) -> Optional[str]:
+        digest = hashlib.sha256()
+        tmp_path = os.path.join(
+            self.directory, f".{threading.get_ident()}.download")
+
+        try:
+            response = self.__http.request("GET", url,
+                                           preload_content=False)
+        except urllib3.exceptions.HTTPError:
+            return None
+
+        try:
+            if response.status != 200:
+                return None
+
+            with open(tmp_path, "wb") as f:
+                for chunk in response.stream(CHUNK_SIZE):
+                    digest.update(chunk)
+                    f.write(chunk)
+        except (urllib3.exceptions.HTTPError, OSError):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+            return None
+        finally:
+            response.release_conn()
+
+        name = digest.hexdigest()
+        path = os.path.join(self.directory, name[:2],
+                            name + media_extension(url))
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Identical content is already stored
+        if os.path.isfile(path):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+
+        with self.__lock:
+            self.__index[url] = path
+
+            with open(os.path.join(self.directory, INDEX_FILE), "a",
+                      encoding="utf-8") as f:
+                f.write(json.dumps({"url": url, "path": path}) + "\n")
+
+        return path
+
+    def __load_index(self) -> Dict[str, str]:
+        index = {}
+
+        try:
+            with open(os.path.join(self.directory, INDEX_FILE),
+                      encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+
+                    index[entry["url"]] = entry["path"]
+        except OSError:
+            pass
+
+        return index
+
+    def __enter__(self) -> "MediaDownloader":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
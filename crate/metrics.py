@@ -0,0 +1,161 @@
+import logging
+from time import perf_counter
+from typing import Any, Callable, Dict, Optional
+
+from .utils import Tweet
+
+
+PHASES = ("get", "scroll", "wait", "extract", "parse")
+
+COUNTERS = ("scrolls", "cards", "tweets", "duplicate", "known",
+            "promoted", "filtered", "invalid")
+
+
+class ScrapeStats:
+    """Timers and counters of one scrape
+
+    `seconds` and `calls` hold the total time and number of calls of
+    each phase: get, scroll, wait, extract (finding cards or running the
+    extraction script) and parse. `counters` hold the number of scrolls
+    and cards, and how cards ended up: tweets, duplicate, known (seen by
+    a previous scrape), promoted, filtered or invalid."""
+
+    def __init__(self) -> None:
+        self.seconds: Dict[str, float] = {phase: 0.0 for phase in PHASES}
+        self.calls: Dict[str, int] = {phase: 0 for phase in PHASES}
+        self.counters: Dict[str, int] = {name: 0 for name in COUNTERS}
+
+    def to_dict(self) -> dict:
+        return {
+            "seconds": dict(self.seconds),
+            "calls": dict(self.calls),
+            "counters": dict(self.counters)
+        }
+
+    def log(
+        self,
+        logger: Optional[logging.Logger] = None,
+        level: int = logging.INFO) -> None:
+        logger = logger or logging.getLogger("crate")
+
+        phases = ", ".join(
+            f"{phase}={self.seconds[phase]:.3f}s/{self.calls[phase]}"
+            for phase in self.seconds)
+        counters = ", ".join(
+            f"{name}={value}" for name, value in self.counters.items())
+
+        logger.log(level, "scrape phases: %s; counters: %s",
+                   phases, counters)
+
+    def to_prometheus(self, prefix: str = "crate") -> str:
+        """Export in Prometheus text exposition format"""
+        lines = [f"# TYPE {prefix}_phase_seconds_total counter"]
+        lines += [f'{prefix}_phase_seconds_total{{phase="{phase}"}} {value}'
+                  for phase, value in self.seconds.items()]
+
+        lines += [f"# TYPE {prefix}_phase_calls_total counter"]
+        lines += [f'{prefix}_phase_calls_total{{phase="{phase}"}} {value}'
+                  for phase, value in self.calls.items()]
+
+        for name, value in self.counters.items():
+            lines += [f"# TYPE {prefix}_{name}_total counter",
+                      f"{prefix}_{name}_total {value}"]
+
+        return "\n".join(lines) + "\n"
+
+
+class _Phase:
+    __slots__ = ("metrics", "name", "started")
+
+    def __init__(self, metrics: "Metrics", name: str) -> None:
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.started = perf_counter()
+
+    def __exit__(self, *args) -> None:
+        self.metrics.end_phase(self.name, perf_counter() - self.started)
+
+
+class Metrics:
+    """Instrumentation of the scrape loop
+
+    A fresh ScrapeStats is started for every scrape and kept in `stats`.
+    Optional hooks are called on every scroll with (scroll number, Y
+    position), on every emitted tweet, and at the end of every phase with
+    (phase, seconds)."""
+
+    def __init__(
+        self,
+        on_scroll: Optional[Callable[[int, Any], None]] = None,
+        on_tweet: Optional[Callable[[Tweet], None]] = None,
+        on_phase_end: Optional[Callable[[str, float], None]] = None) -> None:
+        self.on_scroll = on_scroll
+        self.on_tweet = on_tweet
+        self.on_phase_end = on_phase_end
+
+        self.stats = ScrapeStats()
+
+    def start(self) -> ScrapeStats:
+        self.stats = ScrapeStats()
+        return self.stats
+
+    def phase(self, name: str) -> _Phase:
+        return _Phase(self, name)
+
+    def end_phase(self, name: str, seconds: float) -> None:
+        self.stats.seconds[name] += seconds
+        self.stats.calls[name] += 1
+
+        if self.on_phase_end:
+            self.on_phase_end(name, seconds)
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.stats.counters[name] += value
+
+    def scrolled(self, y: Any) -> None:
+        self.stats.counters["scrolls"] += 1
+
+        if self.on_scroll:
+            self.on_scroll(self.stats.counters["scrolls"], y)
+
+    def emitted(self, tweet: Tweet) -> None:
+        self.stats.counters["tweets"] += 1
+
+        if self.on_tweet:
+            self.on_tweet(tweet)
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *args) -> None:
+        pass
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class NullMetrics:
+    """Metrics doing nothing, used when instrumentation is disabled"""
+
+    stats = None
+
+    def start(self) -> None:
+        return None
+
+    def phase(self, name: str) -> _NullPhase:
+        return _NULL_PHASE
+
+    def count(self, name: str, value: int = 1) -> None:
+        pass
+
+    def scrolled(self, y: Any) -> None:
+        pass
+
+    def emitted(self, tweet: Tweet) -> None:
+        pass
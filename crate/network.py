@@ -0,0 +1,234 @@
+import json
+from html import unescape
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, Tuple, Union
+from urllib.parse import urljoin, urlsplit
+
+from . import const
+
+
+# Code point ranges rendered as twemoji images by twitter web
+EMOJI_RANGES = [
+    (0x2300, 0x23ff),
+    (0x2600, 0x27bf),
+    (0x2b00, 0x2bff),
+    (0x1f000, 0x1f1e5),
+    (0x1f200, 0x1f3fa),
+    (0x1f400, 0x1faff)
+]
+
+EMOJI_SRC = "https://abs-0.twimg.com/emoji/v2/svg/{:x}.svg"
+
+
+def is_timeline_response(url: str) -> bool:
+    """Returns True if url is a timeline API endpoint"""
+    path = urlsplit(url).path
+    return any(path.endswith(p) for p in const.TIMELINE_API_PATHS)
+
+
+def format_created_at(created_at: Optional[str]) -> Optional[str]:
+    """Convert API date e.g. Wed Jan 05 11:55:00 +0000 2022 to the ISO
+    8601 format of the rendered time element"""
+    if not created_at:
+        return None
+
+    try:
+        dt = datetime.strptime(created_at, "%a %b %d %H:%M:%S %z %Y")
+    except ValueError:
+        return None
+
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def emoji_srcs(text: str) -> List[str]:
+    """Twemoji image src of each emoji in text, as extracted from cards"""
+    return [EMOJI_SRC.format(ord(c)) for c in text
+            if any(low <= ord(c) <= high for low, high in EMOJI_RANGES)]
+
+
+def display_text(legacy: dict) -> str:
+    """Tweet text as displayed on the card
+
+    Leading reply mentions and trailing media links are cut by the display
+    range, links are shown by their display url"""
+    # Indices of display range count unescaped code points
+    text = unescape(legacy.get("full_text") or legacy.get("text") or "")
+    text_range = legacy.get("display_text_range")
+
+    if text_range:
+        text = text[text_range[0]:text_range[1]]
+
+    entities = legacy.get("entities") or {}
+
+    for url in entities.get("urls") or []:
+        if url.get("url"):
+            text = text.replace(url["url"], url.get("display_url") or "")
+
+    for media in entities.get("media") or []:
+        if media.get("url"):
+            text = text.replace(media["url"], "")
+
+    return text.strip()
+
+
+def image_links(legacy: dict) -> List[str]:
+    """Photo urls in the form rendered on the card"""
+    entities = legacy.get("extended_entities") or \
+                legacy.get("entities") or {}
+    links = []
+
+    for media in entities.get("media") or []:
+        url = media.get("media_url_https")
+
+        if media.get("type") != "photo" or not url:
+            continue
+
+        base, _, extension = url.rpartition(".")
+        links.append(f"{base}?format={extension}&name=small")
+
+    return links
+
+
+def tweet_record(
+    legacy: dict,
+    user: dict,
+    base_url: str,
+    promoted: bool = False,
+    quoted: Optional[dict] = None) -> dict:
+    """Card record, with the same fields as script extraction, of an API
+    tweet object and its author"""
+    tweet_id = legacy.get("id_str")
+    username = user.get("screen_name")
+    text = display_text(legacy)
+
+    return {
+        "tweet_url": urljoin(base_url, f"/{username}/status/{tweet_id}") \
+                        if tweet_id and username else None,
+        "promoted": promoted,
+        "display_name": user.get("name"),
+        "username": f"@{username}" if username else None,
+        "created_date": format_created_at(legacy.get("created_at")),
+        "text": text,
+        "embedded": display_text(quoted) if quoted else "",
+        "reply_count": legacy.get("reply_count", 0),
+        "retweet_count": legacy.get("retweet_count", 0),
+        "like_count": legacy.get("favorite_count", 0),
+        "emojis": emoji_srcs(text),
+        "image_links": image_links(legacy)
+    }
+
+
+def _instructions(response: dict) -> List[dict]:
+    # Legacy search API
+    timeline = response.get("timeline")
+
+    if timeline:
+        return timeline.get("instructions") or []
+
+    # GraphQL SearchTimeline
+    search = ((response.get("data") or {}).get("search_by_raw_query") or {})
+    timeline = (search.get("search_timeline") or {}).get("timeline") or {}
+
+    return timeline.get("instructions") or []
+
+
+def _entries(instruction: dict) -> List[dict]:
+    if "addEntries" in instruction:
+        return instruction["addEntries"].get("entries") or []
+
+    if "replaceEntry" in instruction:
+        return [instruction["replaceEntry"].get("entry") or {}]
+
+    if instruction.get("type") == "TimelineReplaceEntry":
+        return [instruction.get("entry") or {}]
+
+    return instruction.get("entries") or []
+
+
+def _items(entry: dict) -> Iterator[dict]:
+    content = entry.get("content") or {}
+
+    # Legacy search API
+    if "item" in content:
+        yield content["item"].get("content") or {}
+
+    # GraphQL SearchTimeline, modules group several items
+    if "itemContent" in content:
+        yield content["itemContent"]
+
+    for item in content.get("items") or []:
+        yield (item.get("item") or {}).get("itemContent") or {}
+
+
+def _graphql_tweet(result: dict) -> Optional[dict]:
+    if result.get("__typename") == "TweetWithVisibilityResults":
+        result = result.get("tweet") or {}
+
+    return result if result.get("legacy") else None
+
+
+def _graphql_user(result: dict) -> dict:
+    user = ((result.get("core") or {}).get("user_results") or {}) \
+            .get("result") or {}
+
+    return user.get("legacy") or {}
+
+
+def _timeline_tweets(
+    response: dict) -> Iterator[Tuple[dict, dict, bool, Optional[dict]]]:
+    """(tweet, user, promoted, quoted tweet) of every timeline item"""
+    global_objects = response.get("globalObjects") or {}
+    tweets = global_objects.get("tweets") or {}
+    users = global_objects.get("users") or {}
+
+    for instruction in _instructions(response):
+        for entry in _entries(instruction):
+            for item in _items(entry):
+                if "tweet" in item:
+                    tweet = tweets.get(item["tweet"].get("id"))
+
+                    if not tweet:
+                        continue
+
+                    yield (tweet,
+                           users.get(tweet.get("user_id_str")) or {},
+                           "promotedMetadata" in item["tweet"],
+                           tweets.get(tweet.get("quoted_status_id_str")))
+
+                if "tweet_results" in item:
+                    result = _graphql_tweet(
+                        item["tweet_results"].get("result") or {})
+
+                    if not result:
+                        continue
+
+                    quoted = _graphql_tweet(
+                        (result.get("quoted_status_result") or {})
+                            .get("result") or {})
+
+                    yield (result["legacy"],
+                           _graphql_user(result),
+                           "promotedMetadata" in item,
+                           quoted["legacy"] if quoted else None)
+
+
+def parse_timeline_response(
+    body: Union[str, bytes, dict],
+    base_url: str) -> List[dict]:
+    """Parse card records from a captured timeline API response
+
+    Supports the legacy search API (adaptive.json) and GraphQL
+    SearchTimeline responses. Records have the same fields as script
+    extraction, in timeline order, with exact integer counts. Tweet urls
+    are resolved against `base_url`."""
+    if isinstance(body, (str, bytes)):
+        try:
+            body = json.loads(body)
+        except ValueError:
+            return []
+
+    if not isinstance(body, dict):
+        return []
+
+    return [tweet_record(tweet, user, base_url, promoted, quoted)
+            for tweet, user, promoted, quoted in _timeline_tweets(body)]
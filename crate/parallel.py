@@ -0,0 +1,147 @@
+import sys
+import signal
+from multiprocessing import Pool
+from multiprocessing.util import Finalize
+from typing import Iterable, Iterator, List, Optional
+
+from .driver import Driver, DriverOptions
+from .scraper import Scraper
+from .utils import ScraperOptions, Tweet, ExtractionMode
+
+
+class ScrapeResult:
+    """Result of one query of scrape_many
+
+    `index` is the position of `options` in the submitted list. `error`
+    describes the last failure when all attempts failed, tweets is empty
+    then."""
+
+    __slots__ = ("index", "options", "tweets", "error", "attempts")
+
+    def __init__(
+        self,
+        index: int,
+        options: ScraperOptions,
+        tweets: List[Tweet],
+        error: Optional[str],
+        attempts: int) -> None:
+        self.index = index
+        self.options = options
+        self.tweets = tweets
+        self.error = error
+        self.attempts = attempts
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+# Long lived driver and scraper of a worker process, started by the
+# first task so a browser failing to start fails that task instead of
+# respawning the worker forever
+_driver: Optional[Driver] = None
+_scraper: Optional[Scraper] = None
+_finalizer: Optional[Finalize] = None
+_worker_args: tuple = ()
+
+
+def _init_worker(
+    driver_options: DriverOptions,
+    sleep_duration: int,
+    extraction_mode: str) -> None:
+    global _worker_args
+
+    if extraction_mode == ExtractionMode.NETWORK:
+        driver_options = driver_options.replace(capture_network=True)
+
+    _worker_args = (driver_options, sleep_duration, extraction_mode)
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+
+def _worker_scraper() -> Scraper:
+    """Scraper of this worker, starts the browser when there is none"""
+    global _driver, _scraper, _finalizer
+
+    if _driver is None:
+        driver_options, sleep_duration, extraction_mode = _worker_args
+
+        _driver = Driver(driver_options)
+        _scraper = Scraper(_driver,
+                           sleep_duration=sleep_duration,
+                           extraction_mode=extraction_mode)
+
+        # Quit the browser when the worker exits, also when the pool is
+        # terminated early
+        _finalizer = Finalize(_driver, _driver.quit, exitpriority=10)
+
+    return _scraper
+
+
+def _discard_driver() -> None:
+    """Quit a crashed browser, the next attempt starts a new one"""
+    global _driver, _scraper, _finalizer
+
+    _finalizer.cancel()
+
+    try:
+        _driver.quit()
+    except Exception:
+        pass
+
+    _driver = _scraper = _finalizer = None
+
+
+def _scrape_task(task) -> ScrapeResult:
+    index, options, retries = task
+    error = None
+
+    for attempt in range(1, retries + 2):
+        try:
+            return ScrapeResult(index, options,
+                                _worker_scraper().scrape(options),
+                                None, attempt)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+
+            if _driver is not None and not _driver.is_alive():
+                _discard_driver()
+
+    return ScrapeResult(index, options, [], error, retries + 1)
+
+
+def scrape_many(
+    options_list: Iterable[ScraperOptions],
+    workers: int = 4,
+    driver_options: Optional[DriverOptions] = DriverOptions(),
+    sleep_duration: int = 5,
+    extraction_mode: Optional[str] = ExtractionMode.SCRIPT,
+    retries: int = 1) -> Iterator[ScrapeResult]:
+    """Scrape many queries over a pool of worker processes
+
+    Each worker owns one Driver reused across its queries, started by
+    its first query. Results are yielded as soon as a query completes,
+    in completion order, tagged with the originating options. A failing
+    query is retried `retries` times, restarting the browser if it
+    crashed or failed to start, then reported with its error without
+    aborting the batch."""
+    pool = Pool(processes=workers,
+                initializer=_init_worker,
+                initargs=(driver_options, sleep_duration, extraction_mode))
+
+    tasks = ((index, options, retries)
+             for index, options in enumerate(options_list))
+    completed = False
+
+    try:
+        for result in pool.imap_unordered(_scrape_task, tasks):
+            yield result
+
+        completed = True
+    finally:
+        if completed:
+            pool.close()
+        else:
+            pool.terminate()
+
+        pool.join()
@@ -0,0 +1,206 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_EXCEPTION, wait
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from .driver import DriverOptions
+from .scraper import Scraper
+from .utils import ScraperOptions, Tweet
+
+
+Window = Tuple[datetime, datetime]
+
+
+class DateWindowPlanner:
+    """Split since/until range into date windows
+
+    Windows are handed out from `until` backwards. Their size adapts to
+    the tweet density observed in completed windows, so that each window
+    yields about `target_per_window` tweets: dense periods get smaller
+    windows and sparse periods get merged into larger ones. A window that
+    reaches `window_limit` tweets is considered stalled and is split in
+    halves to be scraped again."""
+
+    def __init__(
+        self,
+        since: datetime,
+        until: datetime,
+        target_per_window: int = 500,
+        window_limit: int = 1000,
+        initial_window: timedelta = timedelta(days=1),
+        min_window: timedelta = timedelta(hours=1),
+        max_window: timedelta = timedelta(days=30)) -> None:
+
+        if since >= until:
+            raise Exception("since must be earlier than until")
+
+        self.since = since
+        self.until = until
+        self.target_per_window = target_per_window
+        self.window_limit = window_limit
+        self.initial_window = initial_window
+        self.min_window = min_window
+        self.max_window = max_window
+
+        self.__cursor = until
+        self.__pending: List[Window] = []
+        # Observed tweets per second
+        self.__density: Optional[float] = None
+        # Acquired windows not reported yet
+        self.__in_flight: Set[Window] = set()
+        self.__condition = threading.Condition()
+
+    def acquire(self) -> Optional[Window]:
+        """Returns the next window to scrape
+
+        Blocks while no window is available but other windows are still
+        being scraped, as they may be split. Returns None when the whole
+        range has been scraped."""
+        with self.__condition:
+            while True:
+                window = self.__next_window()
+
+                if window:
+                    self.__in_flight.add(window)
+                    return window
+
+                if not self.__in_flight:
+                    return None
+
+                self.__condition.wait()
+
+    def report(self, window: Window, count: int) -> None:
+        """Report number of tweets scraped from an acquired window
+
+        Every acquired window has to be reported exactly once"""
+        start, end = window
+        duration = end - start
+
+        with self.__condition:
+            if window not in self.__in_flight:
+                raise Exception(f"Window {start} - {end} was not " + \
+                    "acquired or was already reported")
+
+            self.__in_flight.remove(window)
+
+            if count >= self.window_limit and duration > self.min_window:
+                middle = start + duration / 2
+                self.__pending.extend([(start, middle), (middle, end)])
+
+            self.__update_density(count / duration.total_seconds())
+            self.__condition.notify_all()
+
+    def __next_window(self) -> Optional[Window]:
+        if self.__pending:
+            return self.__pending.pop()
+
+        if self.__cursor <= self.since:
+            return None
+
+        start = max(self.since, self.__cursor - self.__window_size())
+        window = (start, self.__cursor)
+        self.__cursor = start
+
+        return window
+
+    def __window_size(self) -> timedelta:
+        if self.__density is None:
+            return self.initial_window
+
+        if self.__density == 0:
+            return self.max_window
+
+        size = timedelta(seconds=self.target_per_window / self.__density)
+
+        return max(self.min_window, min(self.max_window, size))
+
+    def __update_density(self, density: float) -> None:
+        if self.__density is None:
+            self.__density = density
+        else:
+            # Exponential moving average, recent windows weigh more
+            self.__density = (self.__density + density) / 2
+
+
+def scrape_parallel(
+    options: ScraperOptions,
+    driver_options: Optional[DriverOptions] = DriverOptions(),
+    workers: int = 4,
+    sleep_duration: int = 5,
+    planner: Optional[DateWindowPlanner] = None) -> List[Tweet]:
+    """Scrape since/until range of `options` split in date windows
+
+    Windows are scraped in parallel by `workers`, each with its own
+    Driver. Results are merged and deduplicated by tweet id. When a
+    window fails, the other workers stop and the error is raised."""
+
+    if not options.since or not options.until:
+        raise Exception("scrape_parallel requires since and until")
+
+    planner = planner or DateWindowPlanner(options.since, options.until)
+
+    tweets: Dict[str, Tweet] = {}
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def work():
+        scraper = Scraper(options=driver_options,
+                          sleep_duration=sleep_duration)
+
+        try:
+            while not stop.is_set():
+                window = planner.acquire()
+
+                if window is None:
+                    break
+
+                count = 0
+                window_options = options.replace(
+                    since=window[0],
+                    until=window[1],
+                    limit=planner.window_limit)
+
+                try:
+                    for tweet in scraper.iter_scrape(window_options):
+                        count += 1
+
+                        with lock:
+                            tweets.setdefault(tweet.tweet_id, tweet)
+
+                            if len(tweets) >= options.limit:
+                                stop.set()
+
+                        if stop.is_set():
+                            break
+                finally:
+                    planner.report(window, count)
+        except BaseException:
+            # Other workers stop after their next tweet
+            stop.set()
+            raise
+        finally:
+            scraper.close()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(work) for _ in range(workers)]
+        done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+        failed = [f for f in futures if f in done and f.exception()]
+
+        if failed:
+            # Also covers a worker whose browser failed to start
+            stop.set()
+
+            for future in futures:
+                future.cancel()
+
+            failed[0].result()
+
+        for future in futures:
+            future.result()
+
+    result = list(tweets.values())
+
+    if len(result) > options.limit:
+        result = result[:options.limit]
+
+    return result
@@ -0,0 +1,157 @@
+import os
+import json
+import threading
+from contextlib import contextmanager
+from time import time, sleep
+from typing import Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class RateLimiter:
+    """Token bucket shared by drivers, with coordinated backoff
+
+    Every page load and scroll takes one token. Tokens refill at `rate`
+    per second up to `burst`, so the sustained request rate of all
+    drivers sharing the limiter never exceeds `rate`.
+
+    When a driver hits a rate limit or error page, `penalize` pauses all
+    drivers for `backoff_base` seconds, doubling on each consecutive
+    failure up to `backoff_max`. `succeeded` resets the failure count.
+
+    Drivers of one process share the limiter through DriverOptions. With
+    `state_file` the bucket is kept in a locked file, shared by every
+    process using the same path."""
+
+    def __init__(
+        self,
+        rate: float = 1.0,
+        burst: int = 5,
+        state_file: Optional[str] = None,
+        backoff_base: float = 5.0,
+        backoff_max: float = 300.0) -> None:
+        if state_file and fcntl is None:
+            raise Exception("Rate limiting across processes " + \
+                "is not supported on this platform")
+
+        self.rate = rate
+        self.burst = burst
+        self.state_file = state_file
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.__lock = threading.Lock()
+        self.__state = self.__initial_state()
+
+    def acquire(self) -> float:
+        """Take one token, blocks while paused or the bucket is empty
+
+        Returns the time waited in seconds"""
+        waited = 0.0
+
+        while True:
+            with self.__locked() as state:
+                now = time()
+                self.__refill(state, now)
+
+                if now < state["paused_until"]:
+                    wait = state["paused_until"] - now
+                elif state["tokens"] >= 1:
+                    state["tokens"] -= 1
+                    return waited
+                else:
+                    wait = (1 - state["tokens"]) / self.rate
+
+            sleep(wait)
+            waited += wait
+
+    def penalize(self) -> float:
+        """Pause every driver after a rate limit or error page
+
+        Returns the pause in seconds"""
+        with self.__locked() as state:
+            now = time()
+            self.__refill(state, now)
+
+            # Drivers hitting the limit together back off once
+            if now < state["paused_until"]:
+                return state["paused_until"] - now
+
+            delay = min(self.backoff_base * 2 ** state["failures"],
+                        self.backoff_max)
+
+            state["failures"] += 1
+            state["tokens"] = 0.0
+            state["paused_until"] = max(state["paused_until"], now + delay)
+
+        return delay
+
+    def succeeded(self) -> None:
+        """Reset backoff after a request went through"""
+        with self.__locked() as state:
+            if state["failures"]:
+                state["failures"] = 0
+
+    @property
+    def failures(self) -> int:
+        """Number of consecutive failures"""
+        with self.__locked() as state:
+            return state["failures"]
+
+    def __initial_state(self) -> dict:
+        return {
+            "tokens": float(self.burst),
+            "updated": time(),
+            "paused_until": 0.0,
+            "failures": 0
+        }
+
+    def __refill(self, state: dict, now: float) -> None:
+        elapsed = max(now - state["updated"], 0.0)
+
+        state["tokens"] = min(float(self.burst),
+                              state["tokens"] + elapsed * self.rate)
+        state["updated"] = now
+
+    @contextmanager
+    def __locked(self) -> Iterator[dict]:
+        with self.__lock:
+            if not self.state_file:
+                yield self.__state
+                return
+
+            fd = os.open(self.state_file, os.O_RDWR | os.O_CREAT, 0o644)
+
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+
+                with os.fdopen(os.dup(fd), "r+", encoding="utf-8") as f:
+                    try:
+                        state = {**self.__initial_state(), **json.load(f)}
+                    except ValueError:
+                        state = self.__initial_state()
+
+                    yield state
+
+                    f.seek(0)
+                    f.truncate()
+                    json.dump(state, f)
+            finally:
+                os.close(fd)
+
+    def __getstate__(self) -> dict:
+        # Locks can not be pickled, e.g. for worker processes, which
+        # share the bucket through state_file
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "state_file": self.state_file,
+            "backoff_base": self.backoff_base,
+            "backoff_max": self.backoff_max
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(**state)
@@ -1,153 +1,870 @@
-import re
-from time import sleep
-from typing import Optional, List
-from urllib.parse import urlsplit
+from time import monotonic, sleep
+from typing import TYPE_CHECKING, Optional, List, Set, Iterator, Tuple, \
+                   Union
 
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webelement import WebElement
-from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import NoSuchElementException, \
+                                    WebDriverException
 
-from .driver import Driver, DriverOptions
-from .utils import ScraperOptions, Tweet, construct_url, \
-                    try_except_default
+from . import const, scripts
+from .metrics import Metrics, NullMetrics, ScrapeStats
+from .seen import KnownRun, SeenIdSet, SeenBloomFilter
+from .filters import TweetFilter
+from .network import is_timeline_response, parse_timeline_response
+from .driver import Driver, DriverOptions, DriverPool
+from .utils import ScraperOptions, Tweet, ExtractionMode, \
+                    TweetDisplayType, construct_url, \
+                    try_except_default, tweet_id_from_url, emoji_from_src, \
+                    tweet_from_record, narrow_until, parse_timestamp
+
+# Only used in annotations, importing them pulls in sqlite3, urllib3, lxml
+# and pyarrow users of Scraper may never need
+if TYPE_CHECKING:
+    from .cache import ResultCache
+    from .checkpoint import Checkpoint
+    from .media import MediaDownloader
+    from .sinks import Sink
+    from .snapshot import SnapshotRecorder
+    from .watchdog import Watchdog
+
+
+# Maximum pause in seconds after an error page without rate limiter
+MAX_BACKOFF = 300
 
 
 class Scraper:
     def __init__(
         self,
-        options: Optional[DriverOptions] = DriverOptions(),
-        sleep_duration: int = 5) -> None:
-        self.__driver = Driver(options)
+        options: Optional[Union[DriverOptions, Driver, DriverPool]] = \
+            DriverOptions(),
+        sleep_duration: int = 5,
+        extraction_mode: Optional[str] = ExtractionMode.SCRIPT,
+        recorder: Optional["SnapshotRecorder"] = None,
+        cache: Optional["ResultCache"] = None,
+        watchdog: Optional["Watchdog"] = None,
+        metrics: Optional[Metrics] = None,
+        base_url: str = const.TWITTER_SEARCH_URL,
+        max_retries: int = 3,
+        media: Optional["MediaDownloader"] = None,
+        seen_store: Optional[Union[SeenIdSet, SeenBloomFilter]] = None,
+        stop_after_known: Optional[int] = 20) -> None:
+
+        if not ExtractionMode.validate(extraction_mode):
+            raise Exception(f"\'{extraction_mode}\'" + \
+                " is not recognized as valid ExtractionMode")
+
+        # Fail before starting a browser, not on the first scroll
+        if extraction_mode == ExtractionMode.SNAPSHOT:
+            from .snapshot import require_lxml
+            require_lxml()
+
+        # Scraper accepts a ready Driver or a DriverPool to borrow
+        # drivers from, otherwise it starts its own Driver
+        self.__pool = None
+        self.__owns_driver = False
+
+        if isinstance(options, DriverPool):
+            self.__pool = options
+            self.__driver = None
+        elif isinstance(options, Driver):
+            self.__driver = options
+        else:
+            if extraction_mode == ExtractionMode.NETWORK:
+                options = options.replace(capture_network=True)
+
+            self.__driver = Driver(options)
+            self.__owns_driver = True
+
+        # Maximum time to wait for new tweets to load after each scroll
         self.sleep_duration = sleep_duration
+        self.extraction_mode = extraction_mode
+        # Records page snapshots to disk in snapshot extraction mode
+        self.recorder = recorder
+        # Returns results of repeated queries without a browser session
+        self.cache = cache
+        # Restarts the browser when it grows too large or slow
+        self.watchdog = watchdog
+        # Phase timers, counters and hooks, stats of the last scrape are
+        # kept in `stats`
+        self.metrics = metrics
+        self.__metrics = metrics or NullMetrics()
+        # Search page url, replaced to scrape e.g. a local test server
+        self.base_url = base_url
+        # Reloads after a rate limit or error page before giving up
+        self.max_retries = max_retries
+        # Downloads image_links of scraped tweets while scrolling
+        self.media = media
+        # Ids of tweets emitted by previous scrapes, known tweets are
+        # skipped. In Latest mode the scrape stops after
+        # `stop_after_known` known tweets in a row
+        self.seen_store = seen_store
+        self.stop_after_known = stop_after_known
+
+    @property
+    def stats(self) -> Optional[ScrapeStats]:
+        """Stats of the last scrape, None when metrics are disabled"""
+        return self.__metrics.stats
+
+    def scrape(
+        self,
+        options: ScraperOptions,
+        sink: Optional["Sink"] = None,
+        checkpoint: Optional["Checkpoint"] = None) -> List[Tweet]:
+        return list(self.iter_scrape(options, sink, checkpoint))
+
+    def iter_scrape(
+        self,
+        options: ScraperOptions,
+        sink: Optional["Sink"] = None,
+        checkpoint: Optional["Checkpoint"] = None) -> Iterator[Tweet]:
+        """Scrape tweets, yielding each new tweet as soon as it is parsed
+
+        Stops after `options.limit` tweets or when the page stops growing.
+        Cards rejected by the filter fields of options are skipped before
+        the full parse, in Latest mode scraping stops once a card older
+        than `options.created_after` is reached.
+        Closing the generator early resets the driver to a blank page.
+
+        When Scraper was created with a DriverPool, a driver is borrowed
+        for the duration of the scrape, so threads can share the Scraper.
+        Its stats then mix concurrent scrapes. A Scraper on a single
+        driver scrapes one query at a time.
+
+        Tweets are also written to `sink` if given, the sink is flushed
+        but left open when scrape ends.
+
+        Progress is saved to `checkpoint` if given. A resumable checkpoint
+        of the same query continues from the oldest tweet reached and
+        skips tweets it already emitted.
+
+        With a ResultCache, cached results of the same query are returned
+        without scraping, through the same sink, checkpoint, seen store
+        and media handling. Results are cached when the timeline ended or
+        the limit was reached, not after retries on error pages ran out.
+
+        With a seen store, tweets emitted by previous scrapes are skipped
+        and ids of emitted tweets are added to the store.
+
+        With a MediaDownloader, tweets are emitted once their images are
+        downloaded, with `media_paths` set. Downloads overlap scrolling."""
+        self.__metrics.start()
+
+        cache_options = options
+        seen_ids = set()
+
+        if checkpoint and checkpoint.start(
+                construct_url(options, self.base_url)):
+            options = checkpoint.resume_options(options)
+            seen_ids = set(checkpoint.seen_ids)
+
+        cached = self.cache.get(cache_options, self.base_url) \
+                    if self.cache else None
+
+        # Partial results of a resumed scrape, and results depending on
+        # the seen store, are not cached
+        collected = [] if self.cache and cached is None and \
+                        not seen_ids and self.seen_store is None else None
+
+        progress = _Progress()
+        driver = None
+
+        if cached is not None:
+            tweets = self.__iter_cached(cached, seen_ids)
+        else:
+            # Borrowed driver is only kept for this call, so a Scraper on
+            # a DriverPool can be shared by threads
+            driver = self.__pool.acquire() if self.__pool else self.__driver
+            tweets = self.__scrape(driver, options, seen_ids, progress)
+
+        if self.media:
+            tweets = self.media.iter_download(tweets)
+
+        try:
+            for tweet in tweets:
+                if sink:
+                    sink.write(tweet)
+
+                if checkpoint and checkpoint.update(tweet):
+                    # Never checkpoint tweets still buffered in sink
+                    if sink:
+                        sink.flush()
+
+                    checkpoint.save()
+
+                if collected is not None:
+                    collected.append(tweet)
+
+                if self.seen_store is not None:
+                    self.seen_store.add(tweet.tweet_id)
+
+                self.__metrics.emitted(tweet)
+                yield tweet
+
+            # Results cut short by error pages would be served as
+            # complete for the lifetime of the entry
+            if collected is not None and not progress.truncated:
+                self.cache.set(cache_options, collected, self.base_url)
+        finally:
+            tweets.close()
+
+            if sink:
+                sink.flush()
+
+            if checkpoint:
+                checkpoint.save()
+
+            # Never mark tweets still buffered in sink as seen
+            if self.seen_store is not None:
+                self.seen_store.flush()
+
+            if self.__pool and driver is not None:
+                self.__pool.release(driver)
+
+    def __iter_cached(
+        self,
+        cached: List[Tweet],
+        seen_ids: Set[str]) -> Iterator[Tweet]:
+        """Cached tweets not emitted by a checkpointed or previous scrape"""
+        for tweet in cached:
+            if tweet.tweet_id in seen_ids:
+                continue
+
+            if self.seen_store is not None and \
+                    tweet.tweet_id in self.seen_store:
+                continue
+
+            yield tweet
+
+    def __scrape(
+        self,
+        driver: Driver,
+        options: ScraperOptions,
+        seen_ids: Set[str],
+        progress: "_Progress") -> Iterator[Tweet]:
+        count = 0
+        retries = 0
+        oldest = None
+        oldest_timestamp = None
+        recycled_at = None
+        # Promoted and unparseable cards, not parsed again on each scroll
+        skipped_ids = set()
+        tweet_filter = TweetFilter.from_options(options)
+        known = self.__known_run(options)
+
+        try:
+            while True:
+                reload = False
+
+                with self.__metrics.phase("get"):
+                    driver.get(construct_url(options, self.base_url))
+
+                last_y = None
+                current_y = None
+
+                while count < options.limit:
+                    started = monotonic()
+
+                    with self.__metrics.phase("scroll"):
+                        current_y = driver.scroll()
+
+                    self.__metrics.scrolled(current_y)
+                    
+                    if last_y == current_y:
+                        # Rate limit or error page is not the end of
+                        # results, reload from the oldest tweet reached
+                        if driver.page_error():
+                            if retries < self.max_retries:
+                                retries += 1
+                                self.__backoff(driver, retries)
+                                options = self.__resume_options(options,
+                                                                oldest)
+                                reload = True
+                            else:
+                                progress.truncated = True
+
+                        break
+                    
+                    last_y = current_y
+
+                    # Wait for twitter to finish loading tweet
+                    with self.__metrics.phase("wait"):
+                        driver.wait_for_load(self.sleep_duration)
+
+                    latency = monotonic() - started
+                    previous_count = count
+
+                    for tweet in self.__get_tweets(driver, seen_ids,
+                                                   skipped_ids, tweet_filter,
+                                                   known):
+                        timestamp = parse_timestamp(tweet.created_date)
+
+                        if oldest is None or timestamp < oldest_timestamp:
+                            oldest = tweet.created_date
+                            oldest_timestamp = timestamp
+
+                        yield tweet
+                        count += 1
+
+                        if count >= options.limit:
+                            break
+
+                    if count > previous_count:
+                        retries = 0
+                        self.__reset_backoff(driver)
+
+                    # Every card below is older than created_after
+                    if tweet_filter and tweet_filter.crossed:
+                        return
+
+                    # Cards below were emitted by a previous scrape
+                    if known and known.stop:
+                        return
+
+                    # Timelines not ordered by date are reloaded from the
+                    # start, recycle again only after getting past the
+                    # tweets reached before
+                    if self.watchdog and oldest and count < options.limit \
+                            and count != recycled_at \
+                            and self.watchdog.check(driver, latency):
+                        # Continue from the oldest tweet reached in a new
+                        # browser, seen ids prevent duplicates
+                        driver.restart()
+                        options = self.__resume_options(options, oldest)
+                        recycled_at = count
+                        reload = True
+                        break
+
+                if not reload:
+                    return
+        except GeneratorExit:
+            # Stop loading the timeline when consumer stopped early
+            driver.reset()
+            raise
+
+    def scrape_tabs(
+        self,
+        options_list: List[ScraperOptions],
+        tabs: int = 4) -> List[List[Tweet]]:
+        """Scrape several queries in tabs of one browser
+
+        Returns tweets of each query in the order of `options_list`"""
+        results = [[] for _ in options_list]
+
+        for index, tweet in self.iter_scrape_tabs(options_list, tabs):
+            results[index].append(tweet)
+
+        return results
+
+    def iter_scrape_tabs(
+        self,
+        options_list: List[ScraperOptions],
+        tabs: int = 4) -> Iterator[Tuple[int, Tweet]]:
+        """Scrape several queries in tabs of one browser
+
+        Up to `tabs` queries are open at the same time, each in its own
+        tab. Tabs are visited round robin: a tab whose timeline finished
+        loading is harvested and scrolled again, so the loading waits of
+        all tabs overlap. Yields (index in options_list, tweet).
+
+        Sinks, checkpoints, cache and watchdog are not used by tab
+        scraping. Network extraction is not supported, captured responses
+        can not be told apart by tab."""
+        if self.extraction_mode == ExtractionMode.NETWORK:
+            raise Exception("Network extraction is not supported " + \
+                "by tab scraping")
+
+        driver = self.__pool.acquire() if self.__pool else self.__driver
+
+        self.__metrics.start()
+
+        pending = list(enumerate(options_list))
+        pending.reverse()
+        active: List[_Tab] = []
+
+        try:
+            while pending or active:
+                # Fill free tabs with pending queries
+                while pending and len(active) < tabs:
+                    index, options = pending.pop()
+                    handle = driver.tab if not active \
+                                else driver.open_tab()
+                    tab = _Tab(handle, index, options)
+                    tab.known = self.__known_run(options)
+
+                    driver.switch_tab(handle)
+
+                    with self.__metrics.phase("get"):
+                        driver.get(
+                            construct_url(options, self.base_url))
+
+                    self.__scroll_tab(driver, tab)
+                    active.append(tab)
+
+                harvested = False
+
+                for tab in list(active):
+                    driver.switch_tab(tab.handle)
+
+                    ready, _ = driver.poll_load()
+
+                    if not ready and \
+                            monotonic() - tab.scrolled_at < self.sleep_duration:
+                        continue
+
+                    harvested = True
+                    previous_count = tab.count
+
+                    for tweet in self.__get_tweets(driver, tab.seen_ids,
+                                                   tab.skipped_ids,
+                                                   tab.tweet_filter,
+                                                   tab.known):
+                        if self.seen_store is not None:
+                            self.seen_store.add(tweet.tweet_id)
+
+                        self.__metrics.emitted(tweet)
+                        yield tab.index, tweet
+                        tab.count += 1
+
+                        if tab.count >= tab.options.limit:
+                            break
+
+                    if tab.count > previous_count:
+                        tab.retries = 0
+                        self.__reset_backoff(driver)
+
+                    if tab.count >= tab.options.limit or \
+                            (tab.tweet_filter and tab.tweet_filter.crossed) or \
+                            (tab.known and tab.known.stop):
+                        active.remove(tab)
+                        self.__release_tab(driver, tab)
+                    elif not self.__scroll_tab(driver, tab):
+                        if tab.retries < self.max_retries and \
+                                driver.page_error():
+                            tab.retries += 1
+                            self.__backoff(driver, tab.retries)
+                            driver.get(
+                                construct_url(tab.options, self.base_url))
+                            tab.last_y = None
+                            self.__scroll_tab(driver, tab)
+                        else:
+                            active.remove(tab)
+                            self.__release_tab(driver, tab)
+
+                if not harvested:
+                    sleep(0.1)
+        finally:
+            driver.reset()
+
+            if self.seen_store is not None:
+                self.seen_store.flush()
+
+            if self.__pool:
+                self.__pool.release(driver)
+
+    def __scroll_tab(self, driver: Driver, tab: "_Tab") -> bool:
+        """Scroll tab, returns False if the page did not move"""
+        with self.__metrics.phase("scroll"):
+            current_y = driver.scroll()
+
+        self.__metrics.scrolled(current_y)
+        tab.scrolled_at = monotonic()
+
+        if tab.last_y == current_y:
+            return False
+
+        tab.last_y = current_y
+
+        return True
+
+    def __resume_options(
+        self,
+        options: ScraperOptions,
+        oldest: Optional[str]) -> ScraperOptions:
+        """Options reloading the timeline after the oldest tweet reached
+
+        Only Latest timeline is ordered by date, other timelines are
+        reloaded from the start and seen ids skip tweets already emitted"""
+        if oldest and options.display_type == TweetDisplayType.LATEST:
+            return narrow_until(options, oldest)
+
+        return options
+
+    def __known_run(self, options: ScraperOptions) -> Optional[KnownRun]:
+        if self.seen_store is None:
+            return None
 
-    def scrape(self, options: ScraperOptions):
-        url = construct_url(options)
+        return KnownRun(self.seen_store, self.stop_after_known,
+                        options.display_type == TweetDisplayType.LATEST)
 
-        self.__driver.get(url)
+    def __backoff(self, driver: Driver, retries: int):
+        """Back off after a rate limit or error page
 
+        With a rate limiter the pause is shared by all its drivers and
+        waited out by the next page load"""
+        rate_limiter = driver.options.rate_limiter
+
+        if rate_limiter:
+            rate_limiter.penalize()
+        else:
+            sleep(min(self.sleep_duration * 2 ** (retries - 1),
+                      MAX_BACKOFF))
+
+    def __reset_backoff(self, driver: Driver):
+        rate_limiter = driver.options.rate_limiter
+
+        if rate_limiter:
+            rate_limiter.succeeded()
+
+    def __release_tab(self, driver: Driver, tab: "_Tab"):
+        # Keep the last tab open for the next query
+        if len(driver.tabs) > 1:
+            driver.close_tab(tab.handle)
+
+    def close(self):
+        """Quit the driver started by this Scraper"""
+        if self.__owns_driver:
+            self.__driver.quit()
+    
+    def __get_tweets(
+        self,
+        driver: Driver,
+        seen_ids: Set[str],
+        skipped_ids: Set[str],
+        tweet_filter: Optional[TweetFilter] = None,
+        known: Optional[KnownRun] = None) -> List[Tweet]:
+        """Parse tweets from cards currently rendered on the page
+
+        Cards whose tweet id is already in `seen_ids` or `skipped_ids`,
+        known from a previous scrape, or rejected by `tweet_filter`, are
+        skipped before the full card parse. Ids of newly parsed and known
+        tweets are added to `seen_ids`, ids of promoted and unparseable
+        cards to `skipped_ids`."""
+
+        with self.__metrics.phase("extract"):
+            if self.extraction_mode == ExtractionMode.SCRIPT:
+                records = self.__extract_records(driver)
+            elif self.extraction_mode == ExtractionMode.SNAPSHOT:
+                records = self.__extract_snapshot_records(driver)
+            elif self.extraction_mode == ExtractionMode.NETWORK:
+                records = self.__extract_network_records(driver)
+            else:
+                records = None
+
+            # Fallback to per element parsing when script failed
+            if records is None:
+                cards = driver.find_elements(By.XPATH, const.XPATH_CARD)
+
+        with self.__metrics.phase("parse"):
+            if records is not None:
+                return self.__get_tweets_from_records(records, seen_ids,
+                                                      skipped_ids,
+                                                      tweet_filter, known)
+
+            return self.__get_tweets_from_cards(cards, seen_ids, skipped_ids,
+                                                tweet_filter, known)
+
+    def __get_tweets_from_records(
+        self,
+        records: List[dict],
+        seen_ids: Set[str],
+        skipped_ids: Set[str],
+        tweet_filter: Optional[TweetFilter] = None,
+        known: Optional[KnownRun] = None) -> List[Tweet]:
         tweets = []
-        last_y = None
-        current_y = None
 
-        while len(tweets) < options.limit:
-            current_y = self.__driver.scroll()
-            
-            if last_y == current_y:
-                break
-            
-            last_y = current_y
+        self.__metrics.count("cards", len(records))
 
-            _tweets = self.__get_tweets()
+        for record in records:
+            tweet_url = record.get('tweet_url')
+
+            if not tweet_url:
+                self.__metrics.count("invalid")
+                continue
+
+            tweet_id = tweet_id_from_url(tweet_url)
+
+            if tweet_id in seen_ids or tweet_id in skipped_ids or \
+                    (tweet_filter and tweet_id in tweet_filter.rejected):
+                self.__metrics.count("duplicate")
+                continue
+
+            if record.get('promoted'):
+                skipped_ids.add(tweet_id)
+                self.__metrics.count("promoted")
+                continue
+
+            if known and known.check(tweet_id):
+                seen_ids.add(tweet_id)
+                self.__metrics.count("known")
+                continue
+
+            if tweet_filter and not tweet_filter.match_record(record):
+                tweet_filter.rejected.add(tweet_id)
+                self.__metrics.count("filtered")
+                continue
 
-            for _tweet in _tweets:
-                if _tweet not in tweets:
-                    tweets.append(_tweet)
+            tweet = tweet_from_record(record)
+
+            if tweet:
+                seen_ids.add(tweet_id)
+                tweets.append(tweet)
+            else:
+                skipped_ids.add(tweet_id)
+                self.__metrics.count("invalid")
 
         return tweets
-    
-    def __get_tweets(self) -> List[Tweet]:
+
+    def __get_tweets_from_cards(
+        self,
+        cards: List[WebElement],
+        seen_ids: Set[str],
+        skipped_ids: Set[str],
+        tweet_filter: Optional[TweetFilter] = None,
+        known: Optional[KnownRun] = None) -> List[Tweet]:
         tweets = []
-        
-        # Wait for twitter to finish loading tweet
-        sleep(self.sleep_duration)
 
-        cards = self.__driver.find_elements(By.XPATH,
-                                            '//article[@data-testid="tweet"]')
+        self.__metrics.count("cards", len(cards))
         
         for card in cards:
-            tweets.append(self.__parse_tweet_from_card(card))
+            tweet_url = self.__get_tweet_url(card)
+
+            if not tweet_url:
+                self.__metrics.count("invalid")
+                continue
+
+            tweet_id = tweet_id_from_url(tweet_url)
+
+            if tweet_id in seen_ids or tweet_id in skipped_ids or \
+                    (tweet_filter and tweet_id in tweet_filter.rejected):
+                self.__metrics.count("duplicate")
+                continue
+
+            if known and known.check(tweet_id):
+                seen_ids.add(tweet_id)
+                self.__metrics.count("known")
+                continue
+
+            if tweet_filter and not self.__filter_card(card, tweet_filter):
+                tweet_filter.rejected.add(tweet_id)
+                continue
+
+            tweet = self.__parse_tweet_from_card(card, tweet_url)
+
+            if tweet:
+                seen_ids.add(tweet_id)
+                tweets.append(tweet)
+            else:
+                # Promoted or unparseable card
+                skipped_ids.add(tweet_id)
         
         return tweets
-    
-    def __parse_tweet_from_card(
+
+    def __extract_records(self, driver: Driver) -> Optional[List[dict]]:
+        """Extract all rendered cards as plain records in one round trip
+
+        Returns None if the script could not be executed"""
+        try:
+            records = driver.execute_script(scripts.EXTRACT_CARDS)
+        except WebDriverException:
+            return None
+
+        if not isinstance(records, list):
+            return None
+
+        return records
+
+    def __extract_snapshot_records(
         self,
-        card: WebElement) -> Optional[dict]:
-        # https://github.com/Altimis/Scweet/
+        driver: Driver) -> Optional[List[dict]]:
+        """Grab timeline html in one round trip and parse it in-process
 
-        tweet_url_el = try_except_default(
+        Returns None if the snapshot could not be taken"""
+        try:
+            snapshot = driver.execute_script(scripts.PAGE_SNAPSHOT)
+        except WebDriverException:
+            return None
+
+        if not isinstance(snapshot, dict):
+            return None
+
+        if self.recorder:
+            self.recorder.record(snapshot["source"], snapshot["url"])
+
+        from .snapshot import parse_snapshot
+
+        return parse_snapshot(snapshot["source"], snapshot["url"])
+
+    def __filter_card(
+        self,
+        card: WebElement,
+        tweet_filter: TweetFilter) -> bool:
+        """Returns True if card passes tweet_filter
+
+        Only the fields used by the filter are queried, cheapest first."""
+        if tweet_filter.filters_date:
+            created_date = try_except_default(
+                lambda: card.find_element(By.XPATH,
+                            const.XPATH_CREATED_DATE).get_attribute('datetime'),
+                NoSuchElementException, None
+            )
+
+            crossed = tweet_filter.crossed
+
+            if not tweet_filter.check_created_date(created_date):
+                # Promoted cards are not in date order
+                if not crossed and tweet_filter.crossed and \
+                        self.__is_promoted(card):
+                    tweet_filter.crossed = False
+                    self.__metrics.count("promoted")
+                    return False
+
+                self.__metrics.count("filtered")
+                return False
+
+        if tweet_filter.exclude_usernames:
+            username = try_except_default(
+                lambda: card.find_element(By.XPATH,
+                            const.XPATH_USERNAME).text,
+                NoSuchElementException, None
+            )
+
+            if not tweet_filter.check_username(username):
+                self.__metrics.count("filtered")
+                return False
+
+        if tweet_filter.min_like_count:
+            like_count = try_except_default(
+                lambda: card.find_element(By.XPATH,
+                            const.XPATH_LIKE_COUNT).text,
+                NoSuchElementException, 0
+            )
+
+            if not tweet_filter.check_like_count(like_count):
+                self.__metrics.count("filtered")
+                return False
+
+        if tweet_filter.require_media:
+            images = card.find_elements(By.XPATH, const.XPATH_IMAGE_LINKS)
+
+            if not tweet_filter.check_media(images):
+                self.__metrics.count("filtered")
+                return False
+
+        return True
+
+    def __is_promoted(self, card: WebElement) -> bool:
+        return try_except_default(
             lambda: card.find_element(By.XPATH,
-                './/a[contains(@href, "/status/")]'),
+                        const.XPATH_PROMOTED).text == "Promoted",
+            NoSuchElementException, False
+        )
+
+    def __extract_network_records(
+        self,
+        driver: Driver) -> Optional[List[dict]]:
+        """Parse timeline API responses captured since the last call
+
+        Only tweets of responses finished since the previous scroll are
+        returned. Returns None if the driver does not capture network
+        responses"""
+        if not driver.options.capture_network:
+            return None
+
+        try:
+            responses = driver.captured_responses(
+                is_timeline_response)
+        except WebDriverException:
+            return None
+
+        records = []
+
+        for url, body in responses:
+            records.extend(parse_timeline_response(body, url))
+
+        return records
+
+    def __get_tweet_url(self, card: WebElement) -> Optional[str]:
+        tweet_url_el = try_except_default(
+            lambda: card.find_element(By.XPATH, const.XPATH_TWEET_URL),
             NoSuchElementException, None
         )
-        
+
         if not tweet_url_el:
             return
 
-        tweet_url = tweet_url_el.get_attribute('href')
-        tweet_id = urlsplit(tweet_url).path.split('/')[-1]
+        return tweet_url_el.get_attribute('href')
+    
+    def __parse_tweet_from_card(
+        self,
+        card: WebElement,
+        tweet_url: str) -> Optional[Tweet]:
+        # https://github.com/Altimis/Scweet/
 
-        promoted = try_except_default(
-            lambda: card.find_element(By.XPATH,
-                        './/div[2]/div[2]/[last()]//span').text == "Promoted",
-            NoSuchElementException, False
-        )
+        tweet_id = tweet_id_from_url(tweet_url)
 
-        if promoted:
+        if self.__is_promoted(card):
+            self.__metrics.count("promoted")
             return
 
         display_name = try_except_default(
-            lambda: card.find_element(By.XPATH, './/span').text,
+            lambda: card.find_element(By.XPATH,
+                        const.XPATH_DISPLAY_NAME).text,
             NoSuchElementException, None
         )
 
         username = try_except_default(
             lambda: card.find_element(By.XPATH,
-                        './/span[contains(text(), "@")]').text,
+                        const.XPATH_USERNAME).text,
             NoSuchElementException, None
         )
 
         created_date = try_except_default(
-            lambda: card.find_element(By.XPATH, './/time') \
+            lambda: card.find_element(By.XPATH, const.XPATH_CREATED_DATE) \
                         .get_attribute('datetime'),
             NoSuchElementException, None
         )
 
         if not display_name or not username or not created_date:
+            self.__metrics.count("invalid")
             return
         
         text = try_except_default(
-            lambda: card.find_element(By.XPATH, './/div[2]/div[2]/div[2]/div[1]') \
-                        .text,
+            lambda: card.find_element(By.XPATH, const.XPATH_TEXT).text,
             NoSuchElementException, ""
         )
 
         embedded = try_except_default(
-            lambda: card.find_element(By.XPATH, './/div[2]/div[2]/div[2]').text,
+            lambda: card.find_element(By.XPATH, const.XPATH_EMBEDDED).text,
             NoSuchElementException, ""
         )
 
         reply_count = try_except_default(
             lambda: card.find_element(By.XPATH,
-                            './/div[@data-testid="reply"]').text,
+                            const.XPATH_REPLY_COUNT).text,
             NoSuchElementException, 0
         )
 
         retweet_count = try_except_default(
             lambda: card.find_element(By.XPATH,
-                            './/div[@data-testid="retweet"]').text,
+                            const.XPATH_RETWEET_COUNT).text,
             NoSuchElementException, 0
         )
 
         like_count = try_except_default(
             lambda: card.find_element(By.XPATH,
-                            './/div[@data-testid="like"]').text,
+                            const.XPATH_LIKE_COUNT).text,
             NoSuchElementException, 0
         )
 
         emoji_tags = try_except_default(
-            lambda: card.find_elements(By.XPATH,
-                            './/img[contains(@src, "emoji")]'),
+            lambda: card.find_elements(By.XPATH, const.XPATH_EMOJIS),
             NoSuchElementException, []
         )
 
         emojis = []
         for tag in emoji_tags:
-            try:
-                filename = tag.get_attribute('src')
-                emoji = chr(int(re.search(r'svg\/([a-z0-9]+)\.svg', filename) \
-                                .group(1), base=16))
-            except AttributeError:
-                continue
+            emoji = emoji_from_src(tag.get_attribute('src'))
             
             if emoji:
                 emojis.append(emoji)
@@ -155,9 +872,7 @@ class Scraper:
         image_links = []
 
         try:
-            elements = card.find_elements(By.XPATH,
-                            './/div[2]/div[2]//img' + \
-                            '[contains(@src, "https://pbs.twimg.com/")]')
+            elements = card.find_elements(By.XPATH, const.XPATH_IMAGE_LINKS)
             for element in elements:
                 image_links.append(element.get_attribute('src'))
         except:
@@ -176,4 +891,39 @@ class Scraper:
             like_count,
             emojis,
             image_links
-        )
\ No newline at end of file
+        )
+
+
+class _Progress:
+    """How a scrape of Scraper.iter_scrape ended"""
+
+    __slots__ = ("truncated",)
+
+    def __init__(self) -> None:
+        # Gave up on an error page before the end of the timeline
+        self.truncated = False
+
+
+class _Tab:
+    """Progress of a query scraped in a browser tab"""
+
+    __slots__ = ("handle", "index", "options", "seen_ids", "skipped_ids",
+                 "tweet_filter", "known", "count", "retries", "last_y",
+                 "scrolled_at")
+
+    def __init__(
+        self,
+        handle: str,
+        index: int,
+        options: ScraperOptions) -> None:
+        self.handle = handle
+        self.index = index
+        self.options = options
+        self.seen_ids: Set[str] = set()
+        self.skipped_ids: Set[str] = set()
+        self.tweet_filter = TweetFilter.from_options(options)
+        self.known: Optional[KnownRun] = None
+        self.count = 0
+        self.retries = 0
+        self.last_y = None
+        self.scrolled_at = 0.0
@@ -0,0 +1,100 @@
+# Javascript snippets executed in the browser through Driver.execute_script
+import json
+
+from . import const
+
+
+# XPath selectors from const, e.g. XPATH_CARD is available as XPATH.CARD
+XPATH = {
+    name[len("XPATH_"):]: value
+    for name, value in vars(const).items() if name.startswith("XPATH_")
+}
+
+# Extract every rendered tweet card in a single round trip.
+#
+# Uses the same XPath selectors as Scraper.__parse_tweet_from_card and
+# returns an array of plain records with the same fields as Tweet. Emojis
+# are returned as their image src, decoding is done on python side.
+EXTRACT_CARDS = """
+const XPATH = __XPATH__;
+
+function all(xpath, context) {
+    const result = document.evaluate(
+        xpath, context, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    const nodes = [];
+    for (let i = 0; i < result.snapshotLength; i++) {
+        nodes.push(result.snapshotItem(i));
+    }
+    return nodes;
+}
+
+function first(xpath, context) {
+    try {
+        return document.evaluate(
+            xpath, context, null,
+            XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    } catch (e) {
+        return null;
+    }
+}
+
+function text(xpath, context, fallback) {
+    const node = first(xpath, context);
+    return node ? node.innerText : fallback;
+}
+
+return all(XPATH.CARD, document).map(function (card) {
+    const url = first(XPATH.TWEET_URL, card);
+
+    return {
+        tweet_url: url ? url.href : null,
+        promoted: text(XPATH.PROMOTED, card, "") === "Promoted",
+        display_name: text(XPATH.DISPLAY_NAME, card, null),
+        username: text(XPATH.USERNAME, card, null),
+        created_date: (function () {
+            const time = first(XPATH.CREATED_DATE, card);
+            return time ? time.getAttribute('datetime') : null;
+        })(),
+        text: text(XPATH.TEXT, card, ""),
+        embedded: text(XPATH.EMBEDDED, card, ""),
+        reply_count: text(XPATH.REPLY_COUNT, card, 0),
+        retweet_count: text(XPATH.RETWEET_COUNT, card, 0),
+        like_count: text(XPATH.LIKE_COUNT, card, 0),
+        emojis: all(XPATH.EMOJIS, card)
+                    .map(function (img) { return img.src; }),
+        image_links: all(XPATH.IMAGE_LINKS, card)
+                    .map(function (img) { return img.src; })
+    };
+});
+""".replace("__XPATH__", json.dumps(XPATH))
+
+# Snapshot of the timeline loading state, used to detect when newly
+# requested tweets are rendered after scrolling. Rate limit and
+# "Something went wrong" pages are detected by their retry button.
+LOAD_STATE = """
+const cards = document.querySelectorAll('article[data-testid="tweet"]');
+const last = cards.length ? cards[cards.length - 1] : null;
+const url = last ? last.querySelector('a[href*="/status/"]') : null;
+const buttons = document.querySelectorAll('[role="button"]');
+
+return {
+    height: document.body.scrollHeight,
+    last_card: url ? url.href : null,
+    loading: document.querySelector('[role="progressbar"]') !== null,
+    empty: document.querySelector('[data-testid="emptyState"]') !== null,
+    error: Array.prototype.some.call(buttons, function (button) {
+        return /^(Retry|Try again)$/.test(button.textContent.trim());
+    })
+};
+"""
+
+# Timeline html and page url, parsed in-process by snapshot extraction.
+# Falls back to the whole document when timeline region is not found.
+PAGE_SNAPSHOT = """
+const timeline = document.querySelector('[aria-label^="Timeline"]');
+
+return {
+    source: (timeline || document.documentElement).outerHTML,
+    url: window.location.href
+};
+"""
@@ -0,0 +1,220 @@
+import os
+import math
+import struct
+import hashlib
+from array import array
+from typing import Iterable, Optional, Set, Tuple
+
+
+def id_key(tweet_id: str) -> int:
+    """64 bit key of tweet id, the id itself when numeric"""
+    try:
+        key = int(tweet_id)
+    except (TypeError, ValueError):
+        key = -1
+
+    if 0 <= key < 2 ** 64:
+        return key
+
+    return int.from_bytes(
+        hashlib.blake2b(str(tweet_id).encode("utf-8"), digest_size=8)
+            .digest(), "little")
+
+
+class SeenIdSet:
+    """Persistent set of tweet ids seen by previous scrapes
+
+    Ids are kept in memory as ints and stored as 8 bytes each in an
+    append only file, new ids are appended on `flush`. Exact, memory
+    grows with the number of ids."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+        self.__ids: Set[int] = set()
+        self.__new = array("Q")
+
+        if os.path.isfile(path):
+            ids = array("Q")
+
+            with open(path, "rb") as f:
+                data = f.read()
+
+            # Ignore a partially written last id
+            ids.frombytes(data[:len(data) - len(data) % ids.itemsize])
+            self.__ids.update(ids)
+
+    def __contains__(self, tweet_id: str) -> bool:
+        return id_key(tweet_id) in self.__ids
+
+    def __len__(self) -> int:
+        return len(self.__ids)
+
+    def add(self, tweet_id: str) -> None:
+        key = id_key(tweet_id)
+
+        if key not in self.__ids:
+            self.__ids.add(key)
+            self.__new.append(key)
+
+    def update(self, tweet_ids: Iterable[str]) -> None:
+        for tweet_id in tweet_ids:
+            self.add(tweet_id)
+
+    def flush(self) -> None:
+        if not self.__new:
+            return
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with open(self.path, "ab") as f:
+            self.__new.tofile(f)
+
+        self.__new = array("Q")
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "SeenIdSet":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class SeenBloomFilter:
+    """Persistent Bloom filter of tweet ids seen by previous scrapes
+
+    Sized for `capacity` ids at `error_rate` false positives, a tweet
+    seen for the first time is reported as seen, and suppressed, with
+    that probability. Memory and file size are fixed, about 1.8 bytes
+    per id at 0.1%. The error rate grows once more than `capacity` ids
+    are added. An existing file keeps the size it was created with."""
+
+    MAGIC = b"CRBF"
+    HEADER = struct.Struct("<4sQIQ")
+
+    def __init__(
+        self,
+        path: str,
+        capacity: int = 1000000,
+        error_rate: float = 0.001) -> None:
+        self.path = path
+
+        if os.path.isfile(path):
+            with open(path, "rb") as f:
+                magic, self.size, self.hashes, self.count = \
+                    self.HEADER.unpack(f.read(self.HEADER.size))
+
+                if magic != self.MAGIC:
+                    raise Exception(f"\'{path}\' is not a Bloom filter file")
+
+                self.__bits = bytearray(f.read())
+        else:
+            # Optimal number of bits and hash functions
+            self.size = max(8, int(math.ceil(
+                -capacity * math.log(error_rate) / math.log(2) ** 2)))
+            self.hashes = max(1, int(round(
+                self.size / capacity * math.log(2))))
+            self.count = 0
+            self.__bits = bytearray((self.size + 7) // 8)
+
+        self.__dirty = False
+
+    def __positions(self, tweet_id: str) -> Tuple[int, ...]:
+        digest = hashlib.blake2b(str(id_key(tweet_id)).encode("ascii"),
+                                 digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+
+        return tuple((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def __contains__(self, tweet_id: str) -> bool:
+        bits = self.__bits
+
+        return all(bits[p >> 3] & (1 << (p & 7))
+                   for p in self.__positions(tweet_id))
+
+    def __len__(self) -> int:
+        """Number of ids added, approximate"""
+        return self.count
+
+    def add(self, tweet_id: str) -> None:
+        bits = self.__bits
+        added = False
+
+        for p in self.__positions(tweet_id):
+            if not bits[p >> 3] & (1 << (p & 7)):
+                bits[p >> 3] |= 1 << (p & 7)
+                added = True
+
+        if added:
+            self.count += 1
+            self.__dirty = True
+
+    def update(self, tweet_ids: Iterable[str]) -> None:
+        for tweet_id in tweet_ids:
+            self.add(tweet_id)
+
+    def flush(self) -> None:
+        if not self.__dirty:
+            return
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Write to a temporary file first, an interrupted flush never
+        # corrupts the filter
+        tmp_path = self.path + ".tmp"
+
+        with open(tmp_path, "wb") as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.size, self.hashes,
+                                     self.count))
+            f.write(self.__bits)
+
+        os.replace(tmp_path, self.path)
+        self.__dirty = False
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "SeenBloomFilter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class KnownRun:
+    """Tracks consecutive known tweets of one scrape
+
+    Latest timeline is ordered by date, once `stop_after` tweets in a row
+    are known the rest was ingested by a previous scrape and `stop` is
+    set."""
+
+    def __init__(
+        self,
+        store,
+        stop_after: Optional[int],
+        monotone: bool) -> None:
+        self.store = store
+        self.stop_after = stop_after if monotone else None
+
+        self.run = 0
+        self.stop = False
+
+    def check(self, tweet_id: str) -> bool:
+        """Returns True if tweet_id is known"""
+        if tweet_id not in self.store:
+            self.run = 0
+            return False
+
+        self.run += 1
+
+        if self.stop_after and self.run >= self.stop_after:
+            self.stop = True
+
+        return True
@@ -0,0 +1,216 @@
+import os
+import csv
+import json
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .utils import Tweet
+
+
+class Sink(ABC):
+    """Incremental output of scraped tweets
+
+    Tweets are buffered and written in batches of `batch_size`, so a
+    crash loses at most one batch. A new file is started once the
+    current file holds `max_rows` rows or `max_bytes` bytes. `path` may
+    contain a `{part}` placeholder for the file number, otherwise the
+    number is inserted before the extension of rotated files."""
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 1000,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+
+        self.paths: List[str] = []
+
+        self.__buffer: List[Tweet] = []
+        self.__part = 0
+        self.__rows = 0
+        self.__current_path = None
+
+    def write(self, tweet: Tweet) -> None:
+        self.__buffer.append(tweet)
+
+        if len(self.__buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.__buffer:
+            return
+
+        if self.__current_path is None:
+            self.__current_path = self.__part_path()
+            self.paths.append(self.__current_path)
+            self._open(self.__current_path)
+
+        self._write_batch(self.__buffer)
+        self.__rows += len(self.__buffer)
+        self.__buffer = []
+
+        if self.__should_rotate():
+            self.__rotate()
+
+    def close(self) -> None:
+        self.flush()
+
+        if self.__current_path is not None:
+            self._close()
+            self.__current_path = None
+
+    @abstractmethod
+    def _open(self, path: str) -> None:
+        pass
+
+    @abstractmethod
+    def _write_batch(self, tweets: List[Tweet]) -> None:
+        pass
+
+    @abstractmethod
+    def _close(self) -> None:
+        pass
+
+    def __should_rotate(self) -> bool:
+        if self.max_rows and self.__rows >= self.max_rows:
+            return True
+
+        if self.max_bytes and \
+                os.path.getsize(self.__current_path) >= self.max_bytes:
+            return True
+
+        return False
+
+    def __rotate(self) -> None:
+        self._close()
+        self.__current_path = None
+        self.__rows = 0
+        self.__part += 1
+
+    def __part_path(self) -> str:
+        if "{part}" in self.path:
+            return self.path.format(part=self.__part)
+
+        if self.__part == 0:
+            return self.path
+
+        root, ext = os.path.splitext(self.path)
+
+        return f"{root}.{self.__part}{ext}"
+
+    def __enter__(self) -> "Sink":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class JSONLSink(Sink):
+    """Write one JSON object per line
+
+    Uses orjson when installed and `fast_json` is set"""
+
+    def __init__(self, path: str, fast_json: bool = True, **kwargs) -> None:
+        super().__init__(path, **kwargs)
+        self.fast_json = fast_json and orjson is not None
+        self.__file = None
+
+    def _open(self, path: str) -> None:
+        self.__file = open(path, "wb")
+
+    def _write_batch(self, tweets: List[Tweet]) -> None:
+        if self.fast_json:
+            lines = [orjson.dumps(tweet.to_dict()) for tweet in tweets]
+        else:
+            lines = [json.dumps(tweet.to_dict()).encode("utf-8")
+                     for tweet in tweets]
+
+        self.__file.write(b"\n".join(lines) + b"\n")
+        self.__file.flush()
+
+    def _close(self) -> None:
+        self.__file.close()
+
+
+class CSVSink(Sink):
+    """Write tweets as CSV rows with a header per file
+
+    List fields (emojis, image_links, media_paths) are written as JSON
+    arrays"""
+
+    def __init__(self, path: str, **kwargs) -> None:
+        super().__init__(path, **kwargs)
+        self.__file = None
+        self.__writer = None
+
+    def _open(self, path: str) -> None:
+        self.__file = open(path, "w", newline="", encoding="utf-8")
+        self.__writer = csv.writer(self.__file)
+        self.__writer.writerow(Tweet.__slots__)
+
+    def _write_batch(self, tweets: List[Tweet]) -> None:
+        self.__writer.writerows(
+            [json.dumps(value) if isinstance(value, list) else value
+             for value in (getattr(tweet, name) for name in Tweet.__slots__)]
+            for tweet in tweets)
+        self.__file.flush()
+
+    def _close(self) -> None:
+        self.__file.close()
+
+
+class ParquetSink(Sink):
+    """Write tweets to Parquet, one row group per batch
+
+    Requires pyarrow. Counts are written as displayed, e.g. 15.1K"""
+
+    def __init__(self, path: str, **kwargs) -> None:
+        # pyarrow is slow to import, only load it when Parquet is used
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("ParquetSink requires pyarrow, " + \
+                "install it with `pip install pyarrow`")
+
+        super().__init__(path, **kwargs)
+
+        self.__pyarrow = pyarrow
+        self.schema = pyarrow.schema([
+            (name, pyarrow.list_(pyarrow.string()))
+            if name in ("emojis", "image_links", "media_paths") else
+            (name, pyarrow.string())
+            for name in Tweet.__slots__
+        ])
+        self.__writer = None
+
+    def _open(self, path: str) -> None:
+        self.__writer = self.__pyarrow.parquet.ParquetWriter(path,
+                                                             self.schema)
+
+    def _write_batch(self, tweets: List[Tweet]) -> None:
+        columns = {
+            name: [self.__cast(getattr(tweet, name)) for tweet in tweets]
+            for name in Tweet.__slots__
+        }
+
+        self.__writer.write_table(
+            self.__pyarrow.Table.from_pydict(columns, schema=self.schema))
+
+    def _close(self) -> None:
+        self.__writer.close()
+
+    def __cast(self, value):
+        if value is None or isinstance(value, list):
+            return value
+
+        return str(value)
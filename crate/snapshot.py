@@ -0,0 +1,190 @@
+import os
+import json
+from time import time
+from typing import Iterator, List, Optional, Tuple
+from urllib.parse import urljoin
+
+try:
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+
+from . import const
+from .utils import Tweet, tweet_from_record, tweet_id_from_url
+
+
+MANIFEST_FILE = "manifest.jsonl"
+
+# Tags rendered as their own line by the browser
+BLOCK_TAGS = {"article", "br", "div", "footer", "header", "li", "p",
+              "section", "ul"}
+
+
+def inner_text(element) -> str:
+    """Approximate browser innerText of an lxml element
+
+    Block elements are separated by newline and whitespace is collapsed,
+    matching WebElement.text for the markup of a tweet card."""
+    parts = []
+
+    def walk(el):
+        block = isinstance(el.tag, str) and el.tag in BLOCK_TAGS
+
+        if block:
+            parts.append("\n")
+
+        if isinstance(el.tag, str) and el.text:
+            parts.append(el.text)
+
+        for child in el:
+            walk(child)
+
+            if child.tail:
+                parts.append(child.tail)
+
+        if block:
+            parts.append("\n")
+
+    walk(element)
+
+    lines = (" ".join(line.split()) for line in "".join(parts).splitlines())
+
+    return "\n".join(line for line in lines if line)
+
+
+def require_lxml() -> None:
+    """Raise ImportError when lxml is not installed"""
+    if lxml_html is None:
+        raise ImportError("Snapshot parsing requires lxml, " + \
+            "install it with `pip install lxml`")
+
+
+def parse_snapshot(source: str, base_url: str) -> List[dict]:
+    """Parse tweet card records from page source
+
+    Applies the same selectors as Scraper.__parse_tweet_from_card and
+    returns records with the same fields as the script extraction.
+    Relative links are resolved against `base_url`."""
+    require_lxml()
+
+    if not source:
+        return []
+
+    document = lxml_html.fromstring(source)
+
+    def first(xpath, card):
+        elements = card.xpath(xpath)
+        return elements[0] if elements else None
+
+    def text(xpath, card, default):
+        element = first(xpath, card)
+        return inner_text(element) if element is not None else default
+
+    records = []
+
+    for card in document.xpath(const.XPATH_CARD):
+        tweet_url_el = first(const.XPATH_TWEET_URL, card)
+        created_date_el = first(const.XPATH_CREATED_DATE, card)
+
+        records.append({
+            "tweet_url": urljoin(base_url, tweet_url_el.get("href")) \
+                            if tweet_url_el is not None else None,
+            "promoted": text(const.XPATH_PROMOTED, card, "") == "Promoted",
+            "display_name": text(const.XPATH_DISPLAY_NAME, card, None),
+            "username": text(const.XPATH_USERNAME, card, None),
+            "created_date": created_date_el.get("datetime") \
+                            if created_date_el is not None else None,
+            "text": text(const.XPATH_TEXT, card, ""),
+            "embedded": text(const.XPATH_EMBEDDED, card, ""),
+            "reply_count": text(const.XPATH_REPLY_COUNT, card, 0),
+            "retweet_count": text(const.XPATH_RETWEET_COUNT, card, 0),
+            "like_count": text(const.XPATH_LIKE_COUNT, card, 0),
+            "emojis": [urljoin(base_url, el.get("src"))
+                        for el in card.xpath(const.XPATH_EMOJIS)],
+            "image_links": [urljoin(base_url, el.get("src"))
+                        for el in card.xpath(const.XPATH_IMAGE_LINKS)]
+        })
+
+    return records
+
+
+class SnapshotRecorder:
+    """Record page snapshots to a directory
+
+    Each snapshot is written to its own html file, a manifest lists the
+    snapshots in order with the page url they were taken from."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+        os.makedirs(directory, exist_ok=True)
+
+        self.__count = len(list(load_manifest(directory)))
+
+    def record(self, source: str, url: str) -> str:
+        """Write snapshot, returns path of the written file"""
+        filename = "{:06d}.html".format(self.__count)
+
+        with open(os.path.join(self.directory, filename), "w",
+                  encoding="utf-8") as f:
+            f.write(source)
+
+        with open(os.path.join(self.directory, MANIFEST_FILE), "a",
+                  encoding="utf-8") as f:
+            f.write(json.dumps({
+                "file": filename,
+                "url": url,
+                "timestamp": time()
+            }) + "\n")
+
+        self.__count += 1
+
+        return os.path.join(self.directory, filename)
+
+
+def load_manifest(directory: str) -> Iterator[dict]:
+    path = os.path.join(directory, MANIFEST_FILE)
+
+    if not os.path.exists(path):
+        return
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def load_snapshots(directory: str) -> Iterator[Tuple[str, str]]:
+    """Yield (source, url) of recorded snapshots in recording order"""
+    for entry in load_manifest(directory):
+        with open(os.path.join(directory, entry["file"]),
+                  encoding="utf-8") as f:
+            yield f.read(), entry["url"]
+
+
+def replay(
+    directory: str,
+    limit: Optional[int] = float("inf")) -> Iterator[Tweet]:
+    """Re-parse recorded snapshots without a browser
+
+    Yields tweets in the order they were first seen, deduplicated by
+    tweet id."""
+    seen_ids = set()
+    count = 0
+
+    for source, url in load_snapshots(directory):
+        for record in parse_snapshot(source, url):
+            if count >= limit:
+                return
+
+            tweet_url = record.get("tweet_url")
+
+            if not tweet_url or tweet_id_from_url(tweet_url) in seen_ids:
+                continue
+
+            tweet = tweet_from_record(record)
+
+            if tweet:
+                seen_ids.add(tweet.tweet_id)
+                count += 1
+                yield tweet
@@ -1,7 +1,9 @@
+import re
 import json
 from typing import Any, Union, Optional, List
-from datetime import datetime
-from urllib.parse import urlparse, urlencode, quote_plus, urlunparse
+from datetime import datetime, time, timedelta, timezone
+from urllib.parse import urlparse, urlencode, quote_plus, urlunparse, \
+                        urlsplit
 
 from .const import TWITTER_SEARCH_URL
 
@@ -16,6 +18,21 @@ class TweetDisplayType:
         return t in allowed_type
 
 
+class ExtractionMode:
+    # Extract all rendered cards with one javascript call
+    SCRIPT = "script"
+    # Query each field of each card through WebElement
+    ELEMENT = "element"
+    # Grab timeline html once per scroll and parse it in-process
+    SNAPSHOT = "snapshot"
+    # Parse timeline API responses captured by the driver
+    NETWORK = "network"
+
+    def validate(m: str) -> bool:
+        allowed_mode = ["script", "element", "snapshot", "network"]
+        return m in allowed_mode
+
+
 DisplayTypeQuery = {
     TweetDisplayType.TOP: "top",
     TweetDisplayType.LATEST: "live",
@@ -24,6 +41,31 @@ DisplayTypeQuery = {
 
 
 class ScraperOptions:
+    __slots__ = (
+        "words",
+        "words_any",
+        "hashtag",
+        "since",
+        "until",
+        "to_account",
+        "from_account",
+        "mention_account",
+        "lang",
+        "display_type",
+        "filter_replies",
+        "min_replies",
+        "min_likes",
+        "min_retweets",
+        "geocode",
+        "limit",
+        "proximity",
+        "created_after",
+        "created_before",
+        "min_like_count",
+        "require_media",
+        "exclude_usernames"
+    )
+
     def __init__(
         self,
         words: Optional[Union[str, List[str]]] = None,
@@ -43,7 +85,12 @@ class ScraperOptions:
         min_retweets: Optional[int] = None,
         geocode: Optional[str] = None,
         limit: Optional[int] = float("inf"),
-        proximity: Optional[bool] = False):
+        proximity: Optional[bool] = False,
+        created_after: Optional[Union[datetime, str]] = None,
+        created_before: Optional[Union[datetime, str]] = None,
+        min_like_count: Optional[int] = None,
+        require_media: Optional[bool] = False,
+        exclude_usernames: Optional[Union[str, List[str]]] = None):
 
         try:
             assert TweetDisplayType.validate(display_type)
@@ -51,31 +98,40 @@ class ScraperOptions:
             raise Exception(f"\'{display_type}\'" + \
                 " is not recognized as valid TweetDisplayType")
 
-        self._options = {
-            "words": words,
-            "words_any": words_any,
-            "hashtag": hashtag,
-            "since": safe_cast_to_datetime(since),
-            "until": safe_cast_to_datetime(until),
-            "to_account": to_account,
-            "from_account": from_account,
-            "mention_account": mention_account,
-            "lang": lang,
-            "display_type": display_type,
-            "filter_replies": filter_replies,
-            "min_replies": min_replies,
-            "min_likes": min_likes,
-            "min_retweets": min_retweets,
-            "geocode": geocode,
-            "limit": limit,
-            "proximity": proximity
-        }
-    
-    def __getattribute__(self, __name: str) -> Any:
-        if __name in object.__getattribute__(self, '_options'):
-            return object.__getattribute__(self, '_options').get(__name)
-        else:
-            return object.__getattribute__(self, __name)
+        self.words = words
+        self.words_any = words_any
+        self.hashtag = hashtag
+        self.since = safe_cast_to_datetime(since)
+        self.until = safe_cast_to_datetime(until)
+        self.to_account = to_account
+        self.from_account = from_account
+        self.mention_account = mention_account
+        self.lang = lang
+        self.display_type = display_type
+        self.filter_replies = filter_replies
+        self.min_replies = min_replies
+        self.min_likes = min_likes
+        self.min_retweets = min_retweets
+        self.geocode = geocode
+        self.limit = limit
+        self.proximity = proximity
+        # Filters evaluated on rendered cards, not part of search query
+        self.created_after = safe_cast_to_datetime(created_after)
+        self.created_before = safe_cast_to_datetime(created_before)
+        self.min_like_count = min_like_count
+        self.require_media = require_media
+        self.exclude_usernames = exclude_usernames
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ScraperOptions":
+        return cls(**data)
+
+    def replace(self, **kwargs) -> "ScraperOptions":
+        """Returns a copy of these options with given fields replaced"""
+        return ScraperOptions(**{**self.to_dict(), **kwargs})
 
 
 def safe_cast_to_datetime(dt: Union[datetime, str]) -> datetime:
@@ -109,8 +165,95 @@ def try_except_default(to_try, exception, default_value):
     except exception:
         return default_value
 
-def construct_url(options: ScraperOptions):
-    url = urlparse(TWITTER_SEARCH_URL)
+def tweet_id_from_url(tweet_url: str) -> str:
+    """Returns tweet id from tweet status url"""
+    return urlsplit(tweet_url).path.split('/')[-1]
+
+def parse_count(count: Optional[Union[int, str]]) -> int:
+    """Normalize displayed count e.g. 15.1K, 1,234 or 2M to int"""
+    if not count:
+        return 0
+
+    if isinstance(count, int):
+        return count
+
+    count = count.strip().replace(",", "")
+    multiplier = {"K": 1000, "M": 1000000, "B": 1000000000}
+
+    try:
+        if count[-1:].upper() in multiplier:
+            return int(round(float(count[:-1]) * \
+                        multiplier[count[-1:].upper()]))
+
+        return int(float(count))
+    except ValueError:
+        return 0
+
+def parse_timestamp(dt: Optional[Union[datetime, str]]) -> int:
+    """Convert ISO 8601 date e.g. 2022-01-05T11:55:00.000Z to epoch
+
+    Naive datetime is treated as UTC, returns 0 when date is empty"""
+    if not dt:
+        return 0
+
+    if isinstance(dt, str):
+        for fmt in ("%Y-%m-%dT%H:%M:%S.%fZ", "%Y-%m-%dT%H:%M:%SZ",
+                    "%Y-%m-%d"):
+            try:
+                dt = datetime.strptime(dt, fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            return 0
+
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+
+    return int(dt.timestamp())
+
+def narrow_until(
+    options: ScraperOptions,
+    created_date: Union[datetime, str]) -> ScraperOptions:
+    """Returns options with until narrowed to just after created_date
+
+    until is exclusive, so tweets of the created_date second itself are
+    still searched and have to be skipped by their id"""
+    until = datetime.utcfromtimestamp(parse_timestamp(created_date)) + \
+                timedelta(seconds=1)
+
+    if options.until and options.until <= until:
+        return options
+
+    return options.replace(until=until)
+
+def emoji_from_src(src: str) -> Optional[str]:
+    """Returns emoji character from twemoji image src"""
+    match = re.search(r'svg\/([a-z0-9]+)\.svg', src or "")
+
+    if not match:
+        return None
+
+    return chr(int(match.group(1), base=16))
+
+def format_search_date(dt: datetime, operator: str) -> str:
+    """Format since/until search operator
+
+    Dates at midnight use the day operator e.g. since:2022-01-01,
+    otherwise the epoch based operator e.g. since_time:1641031200 is used.
+    Naive datetime is treated as UTC"""
+    if dt.time() == time():
+        return "{}:{}".format(operator, datetime.strftime(dt, "%Y-%m-%d"))
+
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+
+    return "{}_time:{}".format(operator, int(dt.timestamp()))
+
+def construct_url(
+    options: ScraperOptions,
+    base_url: str = TWITTER_SEARCH_URL) -> str:
+    url = urlparse(base_url)
     
     # Construct search query from ScraperOptions
     search_query = [
@@ -141,9 +284,9 @@ def construct_url(options: ScraperOptions):
             if options.mention_account else "",
         
         "lang:{}".format(options.lang) if options.lang else "",
-        "since:{}".format(datetime.strftime(options.since, "%Y-%m-%d")) \
+        format_search_date(options.since, "since") \
                     if options.since else "",
-        "until:{}".format(datetime.strftime(options.until, "%Y-%m-%d")) \
+        format_search_date(options.until, "until") \
                     if options.until else "",
         "min_replies:{}".format(options.min_replies) \
             if options.min_replies else "",
@@ -172,6 +315,22 @@ def construct_url(options: ScraperOptions):
     return urlunparse(url)
 
 class Tweet:
+    __slots__ = (
+        "tweet_id",
+        "tweet_url",
+        "display_name",
+        "username",
+        "created_date",
+        "text",
+        "embedded",
+        "reply_count",
+        "retweet_count",
+        "like_count",
+        "emojis",
+        "image_links",
+        "media_paths"
+    )
+
     def __init__(
         self,
         tweet_id: str,
@@ -185,35 +344,86 @@ class Tweet:
         retweet_count: int,
         like_count: int,
         emojis: List[str],
-        image_links: List[str]) -> None:
-        self._data = {
-            "tweet_id": tweet_id,
-            "tweet_url": tweet_url,
-            "display_name": display_name,
-            "username": username,
-            "created_date": created_date,
-            "text": text,
-            "embedded": embedded,
-            "reply_count": reply_count,
-            "retweet_count": retweet_count,
-            "like_count": like_count,
-            "emojis": emojis,
-            "image_links": image_links
-        }
-    
-    def __getattribute__(self, __name: str) -> Any:
-        if __name in object.__getattribute__(self, '_data'):
-            return object.__getattribute__(self, '_data').get(__name)
-        else:
-            return object.__getattribute__(self, __name)
+        image_links: List[str],
+        media_paths: Optional[List[Optional[str]]] = None) -> None:
+        self.tweet_id = tweet_id
+        self.tweet_url = tweet_url
+        self.display_name = display_name
+        self.username = username
+        self.created_date = created_date
+        self.text = text
+        self.embedded = embedded
+        self.reply_count = reply_count
+        self.retweet_count = retweet_count
+        self.like_count = like_count
+        self.emojis = emojis
+        self.image_links = image_links
+        # Local files of image_links, set by MediaDownloader
+        self.media_paths = media_paths
+
+    def to_dict(self) -> dict:
+        data = {name: getattr(self, name) for name in self.__slots__}
+
+        # Only serialized once media was downloaded
+        if data["media_paths"] is None:
+            del data["media_paths"]
+
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Tweet":
+        return cls(**data)
     
     def _is_valid_operand(self, other: object) -> bool:
         return hasattr(other, "tweet_id")
     
     def __repr__(self) -> str:
-        return json.dumps(self._data)
+        return json.dumps(self.to_dict())
 
     def __eq__(self, __o: object) -> bool:
         if not self._is_valid_operand(__o):
             return NotImplemented
-        return self.tweet_id == __o.tweet_id
\ No newline at end of file
+        return self.tweet_id == __o.tweet_id
+
+    def __hash__(self) -> int:
+        return hash(self.tweet_id)
+
+
+def tweet_from_record(record: dict) -> Optional[Tweet]:
+    """Build Tweet from a plain card record
+
+    Records have the same fields as Tweet plus `promoted`, emojis are
+    given as their image src. Returns None for promoted or incomplete
+    cards."""
+    if record.get('promoted'):
+        return
+
+    tweet_url = record.get('tweet_url')
+    display_name = record.get('display_name')
+    username = record.get('username')
+    created_date = record.get('created_date')
+
+    if not tweet_url or not display_name or not username or not created_date:
+        return
+
+    emojis = []
+    for src in record.get('emojis') or []:
+        emoji = emoji_from_src(src)
+
+        if emoji:
+            emojis.append(emoji)
+
+    return Tweet(
+        tweet_id_from_url(tweet_url),
+        tweet_url,
+        display_name,
+        username,
+        created_date,
+        record.get('text', ""),
+        record.get('embedded', ""),
+        record.get('reply_count', 0),
+        record.get('retweet_count', 0),
+        record.get('like_count', 0),
+        emojis,
+        record.get('image_links') or []
+    )
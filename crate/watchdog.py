@@ -0,0 +1,140 @@
+import os
+from collections import deque
+from typing import Dict, List, Optional
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def process_tree_rss(pid: int) -> Optional[int]:
+    """Returns resident memory in bytes of a process and its descendants
+
+    Uses psutil when installed, otherwise reads /proc. Returns None when
+    neither is available."""
+    if psutil is not None:
+        try:
+            process = psutil.Process(pid)
+            processes = [process] + process.children(recursive=True)
+        except psutil.Error:
+            return None
+
+        rss = 0
+        for p in processes:
+            try:
+                rss += p.memory_info().rss
+            except psutil.Error:
+                continue
+
+        return rss
+
+    if not os.path.isdir("/proc"):
+        return None
+
+    children: Dict[int, List[int]] = {}
+    rss_pages: Dict[int, int] = {}
+
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # Process name may contain spaces, fields follow the ')'
+                fields = f.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+
+        children.setdefault(int(fields[1]), []).append(int(entry))
+        rss_pages[int(entry)] = int(fields[21])
+
+    if pid not in rss_pages:
+        return None
+
+    rss = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        rss += rss_pages.get(current, 0)
+        stack.extend(children.get(current, []))
+
+    return rss * os.sysconf("SC_PAGE_SIZE")
+
+
+class Watchdog:
+    """Browser health thresholds checked after every scroll
+
+    The driver should be recycled once the page JS heap exceeds
+    `max_heap_bytes`, the chromedriver and Chrome process tree exceeds
+    `max_rss_bytes`, or the average latency of the last `latency_window`
+    scrolls exceeds `max_scroll_latency` seconds. Memory is checked every
+    `check_every` scrolls. Unset thresholds are not checked."""
+
+    def __init__(
+        self,
+        max_heap_bytes: Optional[int] = None,
+        max_rss_bytes: Optional[int] = None,
+        max_scroll_latency: Optional[float] = None,
+        latency_window: int = 5,
+        check_every: int = 10) -> None:
+        self.max_heap_bytes = max_heap_bytes
+        self.max_rss_bytes = max_rss_bytes
+        self.max_scroll_latency = max_scroll_latency
+        self.latency_window = latency_window
+        self.check_every = check_every
+
+        # Number of recycles and reason of the last one
+        self.recycles = 0
+        self.last_reason: Optional[str] = None
+
+        self.__latencies = deque(maxlen=latency_window)
+        self.__scrolls = 0
+
+    def check(self, driver, scroll_latency: float) -> Optional[str]:
+        """Returns reason to recycle the driver, None if it is healthy"""
+        self.__scrolls += 1
+        self.__latencies.append(scroll_latency)
+
+        reason = self.__check_latency()
+
+        if not reason and self.__scrolls % self.check_every == 0:
+            reason = self.__check_memory(driver)
+
+        if reason:
+            self.recycles += 1
+            self.last_reason = reason
+            self.reset()
+
+        return reason
+
+    def reset(self) -> None:
+        self.__latencies.clear()
+        self.__scrolls = 0
+
+    def __check_latency(self) -> Optional[str]:
+        if self.max_scroll_latency is None or \
+                len(self.__latencies) < self.latency_window:
+            return None
+
+        latency = sum(self.__latencies) / len(self.__latencies)
+
+        if latency > self.max_scroll_latency:
+            return f"scroll latency {latency:.2f}s"
+
+        return None
+
+    def __check_memory(self, driver) -> Optional[str]:
+        if self.max_heap_bytes is not None:
+            heap = driver.js_heap_size()
+
+            if heap is not None and heap > self.max_heap_bytes:
+                return f"js heap {heap} bytes"
+
+        if self.max_rss_bytes is not None:
+            rss = driver.process_rss()
+
+            if rss is not None and rss > self.max_rss_bytes:
+                return f"process rss {rss} bytes"
+
+        return None
@@ -0,0 +1,329 @@
+import os
+import re
+import json
+from base64 import b64encode
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional, Tuple
+from unittest import mock
+from urllib.parse import urlsplit, parse_qs
+
+from selenium.common.exceptions import WebDriverException
+
+from crate import driver, scripts
+from crate.utils import Tweet, parse_timestamp
+
+# Rendered height of one card in pixels
+CARD_HEIGHT = 100
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def load_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def make_tweet(tweet_id: str, **fields) -> Tweet:
+    """Tweet of the test account, fields are replaced by keyword"""
+    values = {
+        "tweet_id": tweet_id,
+        "tweet_url": f"https://twitter.com/whataweekhuh/status/{tweet_id}",
+        "display_name": "What a week, huh? all Wednesdays",
+        "username": "@whataweekhuh",
+        "created_date": "2022-01-05T11:55:00.000Z",
+        "text": "",
+        "embedded": "106\n15.1K\n69.4K",
+        "reply_count": "106",
+        "retweet_count": "15.1K",
+        "like_count": "69.4K",
+        "emojis": [],
+        "image_links": [
+            "https://pbs.twimg.com/media/ErAWtcNXcAIoD3N?format=jpg&name=small"
+        ]
+    }
+    values.update(fields)
+
+    return Tweet(**values)
+
+
+def make_record(
+    index: int,
+    created_date: Optional[datetime] = None,
+    promoted: bool = False) -> dict:
+    """Card record as returned by scripts.EXTRACT_CARDS"""
+    if created_date is None:
+        created_date = datetime(2022, 1, 7) - timedelta(minutes=7 * index)
+
+    return {
+        "tweet_url": f"https://twitter.com/user{index}/status/{1000 + index}",
+        "promoted": promoted,
+        "display_name": f"User {index}",
+        "username": f"@user{index}",
+        "created_date": created_date.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "text": f"Tweet number {index}",
+        "embedded": "",
+        "reply_count": "1",
+        "retweet_count": "2",
+        "like_count": "3",
+        "emojis": [],
+        "image_links": []
+    }
+
+
+class FakeTimeline:
+    """Search timeline served by FakeChrome
+
+    `records` are served in timeline order, `page_size` cards per load.
+    A load going past `error_at[0]` cards of a page shows an error page
+    instead, each entry is used once. `load_polls` load state polls pass
+    after a scroll before the new cards are rendered. Search urls with
+    an until_time operator only serve records created before it.
+
+    Each page load finishes the next of `responses`, (url, body) pairs
+    of timeline API responses shown to browsers capturing network
+    traffic. Bodies of base64 `encoded` responses are sent encoded."""
+
+    def __init__(
+        self,
+        records: List[dict],
+        page_size: int = 5,
+        error_at: List[int] = (),
+        load_polls: int = 0,
+        responses: List[Tuple[str, str]] = (),
+        encoded: bool = False) -> None:
+        self.records = records
+        self.page_size = page_size
+        self.error_at = list(error_at)
+        self.load_polls = load_polls
+        self.responses = list(responses)
+        self.encoded = encoded
+
+    def search(self, url: str) -> List[dict]:
+        query = parse_qs(urlsplit(url).query).get("q", [""])[0]
+        until = re.search(r"until_time:(\d+)", query)
+
+        if not until:
+            return list(self.records)
+
+        return [r for r in self.records
+                if parse_timestamp(r["created_date"]) < int(until.group(1))]
+
+
+class _Window:
+    """Page state of one FakeChrome window"""
+
+    def __init__(self, timeline: FakeTimeline, chrome: "FakeChrome") -> None:
+        self.timeline = timeline
+        self.chrome = chrome
+        self.url = "about:blank"
+        self.cards: List[dict] = []
+        self.rendered = 0
+        self.target = 0
+        self.polls = 0
+        self.error = False
+        self.y = 0
+
+    def load(self, url: str) -> None:
+        self.url = url
+        self.cards = self.timeline.search(url) \
+                        if url != "about:blank" else []
+        self.rendered = 0
+        self.target = 0
+        self.polls = 0
+        self.error = False
+        self.y = 0
+        self.__load_more()
+        self.__render()
+        self.polls = 0
+
+    def scroll(self) -> None:
+        self.y = self.rendered * CARD_HEIGHT
+
+        if self.target == self.rendered and not self.error:
+            self.__load_more()
+
+    def load_state(self) -> dict:
+        if self.polls:
+            self.polls -= 1
+        else:
+            self.__render()
+
+        last = self.cards[self.rendered - 1] if self.rendered else None
+
+        return {
+            "height": self.rendered * CARD_HEIGHT + 1000,
+            "last_card": last["tweet_url"] if last else None,
+            "loading": self.target > self.rendered,
+            "empty": self.url != "about:blank" and not self.cards,
+            "error": self.error
+        }
+
+    def __load_more(self) -> None:
+        target = min(self.rendered + self.timeline.page_size,
+                     len(self.cards))
+        error_at = self.timeline.error_at
+
+        if error_at and target > error_at[0]:
+            error_at.pop(0)
+            self.error = True
+            return
+
+        if target > self.target and self.timeline.responses:
+            self.chrome.respond(*self.timeline.responses.pop(0))
+
+        self.target = target
+        self.polls = self.timeline.load_polls
+
+    def __render(self) -> None:
+        self.rendered = self.target
+
+
+class _SwitchTo:
+    def __init__(self, chrome: "FakeChrome") -> None:
+        self.chrome = chrome
+
+    def window(self, handle: str) -> None:
+        if handle not in self.chrome.windows:
+            raise WebDriverException(f"no such window: {handle}")
+
+        self.chrome.current_window_handle = handle
+
+
+class FakeChrome:
+    """Stand-in for webdriver.Chrome serving a FakeTimeline in-process
+
+    Understands the scripts Driver and Scraper execute, every window
+    loads its own copy of the timeline. Urls, CDP commands and closed
+    windows are recorded for assertions. With performance logging
+    enabled, timeline responses are logged as DevTools Network events
+    and their bodies returned by Network.getResponseBody."""
+
+    def __init__(
+        self,
+        timeline: FakeTimeline,
+        executable_path: Optional[str] = None,
+        options=None,
+        desired_capabilities: Optional[dict] = None) -> None:
+        self.timeline = timeline
+        self.options = options
+        self.desired_capabilities = desired_capabilities
+        self.performance_log: List[dict] = []
+        self.bodies = {}
+        self.windows = {"window-0": _Window(timeline, self)}
+        self.current_window_handle = "window-0"
+        self.switch_to = _SwitchTo(self)
+        self.urls: List[str] = []
+        self.cdp_commands: List[tuple] = []
+        self.closed: List[str] = []
+        self.alive = True
+        self.js_heap_size = 50 * 2 ** 20
+        self.__opened = 0
+
+    @property
+    def window_handles(self) -> List[str]:
+        return list(self.windows)
+
+    @property
+    def window(self) -> _Window:
+        return self.windows[self.current_window_handle]
+
+    def get(self, url: str) -> None:
+        self.urls.append(url)
+        self.window.load(url)
+
+    def close(self) -> None:
+        self.closed.append(self.current_window_handle)
+        del self.windows[self.current_window_handle]
+
+    def quit(self) -> None:
+        self.alive = False
+
+    @property
+    def capture_network(self) -> bool:
+        prefs = (self.desired_capabilities or {}).get("goog:loggingPrefs")
+        return bool(prefs and prefs.get("performance"))
+
+    def respond(self, url: str, body: str) -> None:
+        """Log a finished response of url"""
+        if not self.capture_network:
+            return
+
+        request_id = str(len(self.bodies) + 1)
+        self.bodies[request_id] = body
+
+        for method, params in [
+                ("Network.responseReceived",
+                 {"requestId": request_id, "response": {"url": url}}),
+                ("Network.loadingFinished", {"requestId": request_id})]:
+            message = {"message": {"method": method, "params": params}}
+            self.performance_log.append({"message": json.dumps(message)})
+
+    def get_log(self, log_type: str) -> List[dict]:
+        if log_type != "performance":
+            return []
+
+        entries, self.performance_log = self.performance_log, []
+        return entries
+
+    def execute_cdp_cmd(self, cmd: str, params: dict) -> dict:
+        self.cdp_commands.append((cmd, params))
+
+        if cmd == "Network.getResponseBody":
+            body = self.bodies[params["requestId"]]
+
+            if self.timeline.encoded:
+                return {"body": b64encode(body.encode("utf-8")).decode(),
+                        "base64Encoded": True}
+
+            return {"body": body, "base64Encoded": False}
+
+        return {}
+
+    def execute_script(self, script: str, *args):
+        if not self.alive:
+            raise WebDriverException("chrome not reachable")
+
+        if script == scripts.LOAD_STATE:
+            return self.window.load_state()
+
+        if script == scripts.EXTRACT_CARDS:
+            return [dict(card) for card in
+                    self.window.cards[:self.window.rendered]]
+
+        if script.startswith("window.scrollTo"):
+            return self.window.scroll()
+
+        if script == "return window.pageYOffset;":
+            return self.window.y
+
+        if script == "window.open('about:blank');":
+            self.__opened += 1
+            self.windows[f"window-{self.__opened}"] = _Window(self.timeline,
+                                                              self)
+            return None
+
+        if "performance.memory" in script:
+            return self.js_heap_size
+
+        if script in ("window.stop();", "return 1;"):
+            return 1
+
+        raise WebDriverException("script not supported by FakeChrome")
+
+
+@contextmanager
+def fake_chrome(timeline: FakeTimeline) -> Iterator[List[FakeChrome]]:
+    """Make Driver start FakeChrome browsers on timeline
+
+    Yields the list of started browsers, restarts add a new one. Drivers
+    must be started and restarted inside the context."""
+    browsers = []
+
+    def start(**kwargs) -> FakeChrome:
+        browsers.append(FakeChrome(timeline, **kwargs))
+        return browsers[-1]
+
+    with mock.patch.object(driver.webdriver, "Chrome", start):
+        yield browsers
+
@@ -0,0 +1,96 @@
+import asyncio
+import unittest
+
+from crate.async_scraper import AsyncScraper
+from crate.driver import DriverOptions
+from crate.utils import ScraperOptions
+
+from helpers import FakeTimeline, fake_chrome, make_record
+
+OPTIONS = DriverOptions(driver_path="chromedriver")
+
+def run(coroutine):
+    """Run coroutine on a new event loop, asyncio.run needs Python 3.7"""
+    loop = asyncio.new_event_loop()
+
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+class TestAsyncScraper(unittest.TestCase):
+
+    def test_gather(self):
+        timeline = FakeTimeline([make_record(i) for i in range(10)],
+                                load_polls=1)
+        ticks = []
+
+        async def tick(done):
+            while not done.is_set():
+                ticks.append(1)
+                await asyncio.sleep(0.01)
+
+        async def main():
+            done = asyncio.Event()
+            ticker = asyncio.ensure_future(tick(done))
+
+            async with AsyncScraper(OPTIONS, max_browsers=2) as scraper:
+                results = await asyncio.gather(*[
+                    scraper.scrape(ScraperOptions(words=word, limit=limit))
+                    for word, limit in [("a", 10), ("b", 4), ("c", 7)]])
+
+            done.set()
+            await ticker
+
+            return results
+
+        with fake_chrome(timeline) as browsers:
+            results = run(main())
+
+        self.assertEqual([len(tweets) for tweets in results], [10, 4, 7])
+        # At most two browsers, reused by the third query
+        self.assertEqual(len(browsers), 2)
+        # Event loop kept running while browsers were waiting
+        self.assertGreater(len(ticks), 5)
+
+    def test_cancel(self):
+        timeline = FakeTimeline([make_record(i) for i in range(10)],
+                                load_polls=1)
+
+        async def consume(scraper, received):
+            count = 0
+
+            async for tweet in scraper.iter_scrape(
+                    ScraperOptions(words="crate")):
+                count += 1
+
+                if count == 10:
+                    received.set()
+
+        async def main():
+            async with AsyncScraper(OPTIONS, max_browsers=2,
+                                    sleep_duration=1) as scraper:
+                received = asyncio.Event()
+                task = asyncio.ensure_future(consume(scraper, received))
+
+                # Cancel while the browser waits for more tweets in a
+                # worker thread
+                await received.wait()
+                await asyncio.sleep(0.1)
+                task.cancel()
+
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+
+                # Browser of the cancelled scrape is returned and reused
+                return await scraper.scrape(
+                    ScraperOptions(words="crate", limit=3))
+
+        with fake_chrome(timeline) as browsers:
+            tweets = run(main())
+
+        self.assertEqual(len(tweets), 3)
+        self.assertEqual(len(browsers), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from array import array
+from unittest import mock
+
+from crate import batch
+from crate.batch import TweetBatch
+
+from helpers import make_tweet
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.tweets = [
+            make_tweet(tweet_id, created_date=created_date,
+                       like_count=like_count, retweet_count='1,024')
+            for tweet_id, created_date, like_count in [
+                ('1', '2022-01-05T11:55:00.000Z', '69.4K'),
+                ('2', '2022-01-04T16:00:03.000Z', '36.4K'),
+                ('3', '2022-01-06T08:00:00.000Z', 0),
+                ('4', '2022-01-03T08:00:00.000Z', '1.2M')
+            ]
+        ]
+        self.batch = TweetBatch.from_tweets(self.tweets)
+
+    def test_round_trip(self):
+        tweets = self.batch.to_tweets()
+
+        self.assertEqual(len(self.batch), 4)
+        self.assertEqual([t.to_dict() for t in tweets],
+                         [t.to_dict() for t in self.tweets])
+    
+    def test_normalized_columns(self):
+        self.assertEqual(self.batch.column('like_count'),
+                         array('q', [69400, 36400, 0, 1200000]))
+        self.assertEqual(self.batch.column('retweet_count'),
+                         array('q', [1024] * 4))
+        self.assertEqual(self.batch.column('created_at')[0], 1641383700)
+    
+    def test_filter_sort_top_k(self):
+        # Numpy views when installed, per row Python calls otherwise
+        for backend in [batch.numpy, None]:
+            with self.subTest(numpy=backend is not None), \
+                    mock.patch.object(batch, 'numpy', backend):
+                liked = self.batch.where('like_count', '>=', 36400)
+                self.assertEqual(liked.column('tweet_id'), ['1', '2', '4'])
+                self.assertEqual(liked.column('like_count'),
+                                 array('q', [69400, 36400, 1200000]))
+
+                latest = self.batch.sort('created_at', reverse=True)
+                self.assertEqual(latest.column('tweet_id'),
+                                 ['3', '1', '2', '4'])
+
+                top = self.batch.top_k('like_count', 2)
+                self.assertEqual(top.column('tweet_id'), ['4', '1'])
+                self.assertEqual(top.to_tweets()[0].like_count, '1.2M')
+
+                self.assertEqual(len(self.batch.top_k('like_count', 0)), 0)
+                self.assertEqual(len(TweetBatch().sort('like_count')), 0)
+
+    def test_ties(self):
+        tweets = [make_tweet(str(i), like_count=count)
+                  for i, count in enumerate([5, 7, 5, 7, 1, 7])]
+        tweet_batch = TweetBatch(tweets)
+
+        for backend in [batch.numpy, None]:
+            with self.subTest(numpy=backend is not None), \
+                    mock.patch.object(batch, 'numpy', backend):
+                # Rows of equal value keep their order, as with sorted
+                self.assertEqual(
+                    tweet_batch.sort('like_count').column('tweet_id'),
+                    ['4', '0', '2', '1', '3', '5'])
+                self.assertEqual(
+                    tweet_batch.sort('like_count', reverse=True)
+                        .column('tweet_id'),
+                    ['1', '3', '5', '0', '2', '4'])
+                self.assertEqual(
+                    tweet_batch.top_k('like_count', 2).column('tweet_id'),
+                    ['1', '3'])
+                self.assertEqual(
+                    tweet_batch.top_k('like_count', 4).column('tweet_id'),
+                    ['1', '3', '5', '0'])
+                self.assertEqual(
+                    tweet_batch.where('tweet_id', '==', '2')
+                        .column('like_count'), array('q', [5]))
@@ -0,0 +1,70 @@
+import unittest
+import tempfile
+from time import sleep
+
+from crate.cache import ResultCache, normalize_url
+from crate.utils import ScraperOptions
+
+from helpers import make_tweet
+
+class TestCache(unittest.TestCase):
+
+    def test_normalize_url(self):
+        self.assertEqual(
+            normalize_url("https://Twitter.com/search?src=typed_query&q=a"),
+            normalize_url("https://twitter.com/search?q=a&src=typed_query"))
+
+    def test_get_set(self):
+        options = ScraperOptions(from_account='year_progress', limit=10)
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ResultCache(directory)
+
+            self.assertIsNone(cache.get(options))
+
+            cache.set(options, [make_tweet('1'), make_tweet('2')])
+            tweets = cache.get(options)
+
+            self.assertEqual(tweets[0].to_dict(), make_tweet('1').to_dict())
+            self.assertEqual(len(tweets), 2)
+
+            # Limit is part of the key
+            self.assertIsNone(cache.get(options.replace(limit=20)))
+    
+    def test_ttl(self):
+        open_options = ScraperOptions(from_account='year_progress')
+        closed_options = ScraperOptions(
+            from_account='year_progress',
+            since='2022-01-01',
+            until='2022-01-07')
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ResultCache(directory, ttl=0.01)
+
+            cache.set(open_options, [make_tweet('1')])
+            cache.set(closed_options, [make_tweet('1')])
+            sleep(0.05)
+
+            self.assertIsNone(cache.get(open_options))
+            self.assertIsNotNone(cache.get(closed_options))
+    
+    def test_lru_eviction(self):
+        options = [ScraperOptions(from_account=account)
+                   for account in ['a', 'b', 'c']]
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ResultCache(directory, max_entries=2)
+
+            cache.set(options[0], [])
+            sleep(0.01)
+            cache.set(options[1], [])
+            sleep(0.01)
+
+            # Access a, so b is least recently used
+            cache.get(options[0])
+            sleep(0.01)
+            cache.set(options[2], [])
+
+            self.assertIsNotNone(cache.get(options[0]))
+            self.assertIsNone(cache.get(options[1]))
+            self.assertIsNotNone(cache.get(options[2]))
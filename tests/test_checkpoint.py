@@ -0,0 +1,126 @@
+import os
+import unittest
+import tempfile
+from datetime import datetime
+
+from crate.checkpoint import Checkpoint
+from crate.utils import ScraperOptions, construct_url
+
+from helpers import make_tweet
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.options = ScraperOptions(
+            from_account='year_progress',
+            since='2022-01-01',
+            until='2022-01-07',
+            display_type='Latest',
+            limit=10
+        )
+        self.query = construct_url(self.options)
+
+    def test_save_and_resume(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'checkpoint.json')
+
+            checkpoint = Checkpoint(path, interval=2)
+            self.assertFalse(checkpoint.start(self.query))
+
+            self.assertFalse(checkpoint.update(
+                make_tweet('2', created_date='2022-01-05T16:00:03.000Z')))
+            self.assertTrue(checkpoint.update(
+                make_tweet('1', created_date='2022-01-04T16:00:03.000Z')))
+            checkpoint.save()
+
+            resumed = Checkpoint(path, resume=True)
+            self.assertTrue(resumed.start(self.query))
+            self.assertEqual(resumed.seen_ids, {'1', '2'})
+
+            options = resumed.resume_options(self.options)
+
+        self.assertEqual(options.until, datetime(2022, 1, 4, 16, 0, 4))
+        self.assertEqual(options.since, datetime(2022, 1, 1))
+        self.assertEqual(options.limit, 8)
+    
+    def test_ids_appended(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'checkpoint.json')
+
+            checkpoint = Checkpoint(path)
+            checkpoint.start(self.query)
+            checkpoint.update(make_tweet('1'))
+            checkpoint.update(make_tweet('2'))
+            checkpoint.save()
+            checkpoint.update(make_tweet('3'))
+            checkpoint.save()
+
+            # State file does not grow with the ids, each save appends
+            # only the ids emitted since the previous one
+            with open(path) as f:
+                self.assertNotIn('"1"', f.read())
+
+            with open(checkpoint.ids_path) as f:
+                self.assertEqual(f.read().splitlines()[1:],
+                                 ['"1"', '"2"', '"3"'])
+
+            # Line cut short by a crash is dropped on resume
+            with open(checkpoint.ids_path, 'a') as f:
+                f.write('"4')
+
+            resumed = Checkpoint(path, resume=True)
+            self.assertTrue(resumed.start(self.query))
+            self.assertEqual(resumed.seen_ids, {'1', '2', '3'})
+
+            resumed.update(make_tweet('5'))
+            resumed.save()
+
+            resumed = Checkpoint(path, resume=True)
+            resumed.start(self.query)
+            self.assertEqual(resumed.seen_ids, {'1', '2', '3', '5'})
+
+            # A new query starts a new ids file
+            checkpoint = Checkpoint(path, resume=True)
+            query = construct_url(self.options.replace(lang='id'))
+            self.assertFalse(checkpoint.start(query))
+            checkpoint.save()
+
+            resumed = Checkpoint(path, resume=True)
+            self.assertTrue(resumed.start(query))
+            self.assertEqual(resumed.seen_ids, set())
+
+    def test_resume_top(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'checkpoint.json')
+            options = self.options.replace(display_type='Top')
+            query = construct_url(options)
+
+            checkpoint = Checkpoint(path)
+            checkpoint.start(query)
+            checkpoint.update(
+                make_tweet('1', created_date='2022-01-04T16:00:03.000Z'))
+            checkpoint.save()
+
+            resumed = Checkpoint(path, resume=True)
+            self.assertTrue(resumed.start(query))
+            options = resumed.resume_options(options)
+
+        # Top timeline is not ordered by date, it restarts from the top
+        self.assertEqual(options.until, datetime(2022, 1, 7))
+        self.assertEqual(options.limit, 9)
+
+    def test_other_query_not_resumed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'checkpoint.json')
+
+            checkpoint = Checkpoint(path)
+            checkpoint.start(self.query)
+            checkpoint.update(
+                make_tweet('1', created_date='2022-01-04T16:00:03.000Z'))
+            checkpoint.save()
+
+            resumed = Checkpoint(path, resume=True)
+            query = construct_url(self.options.replace(lang='id'))
+
+            self.assertFalse(resumed.start(query))
+            self.assertEqual(resumed.seen_ids, set())
@@ -0,0 +1,199 @@
+import unittest
+from time import monotonic
+
+from crate import const
+from crate.driver import Driver, DriverOptions, DriverPool
+
+from helpers import FakeTimeline, fake_chrome, make_record
+
+OPTIONS = DriverOptions(driver_path="chromedriver")
+
+URL = "https://twitter.com/search?q=crate"
+
+class TestDriverLoad(unittest.TestCase):
+
+    def test_poll_load(self):
+        timeline = FakeTimeline([make_record(i) for i in range(10)],
+                                load_polls=2)
+
+        with fake_chrome(timeline):
+            driver = Driver(OPTIONS)
+            driver.get(URL)
+            driver.scroll()
+
+            # Spinner is shown until the next page is rendered
+            self.assertEqual(driver.poll_load(), (False, False))
+            self.assertEqual(driver.poll_load(), (False, False))
+            self.assertEqual(driver.poll_load(), (True, True))
+
+    def test_wait_for_load(self):
+        timeline = FakeTimeline([make_record(i) for i in range(10)],
+                                load_polls=3)
+
+        with fake_chrome(timeline):
+            driver = Driver(OPTIONS)
+            driver.get(URL)
+
+            # Returns as soon as new cards are rendered
+            driver.scroll()
+            started = monotonic()
+            self.assertTrue(driver.wait_for_load(5, poll_frequency=0.01))
+            self.assertLess(monotonic() - started, 1)
+
+            # Nothing left to load, waits until timeout
+            driver.scroll()
+            started = monotonic()
+            self.assertFalse(driver.wait_for_load(0.1, poll_frequency=0.01))
+            self.assertGreaterEqual(monotonic() - started, 0.1)
+
+    def test_ready_on_error_and_empty(self):
+        timeline = FakeTimeline([make_record(i) for i in range(10)],
+                                error_at=[5])
+
+        with fake_chrome(timeline):
+            driver = Driver(OPTIONS)
+            driver.get(URL)
+            driver.scroll()
+
+            self.assertEqual(driver.poll_load(), (True, False))
+            self.assertTrue(driver.page_error())
+
+            timeline.records = []
+            driver.get(URL)
+            driver.scroll()
+
+            self.assertEqual(driver.poll_load(), (True, False))
+            self.assertFalse(driver.page_error())
+
+class TestDriverTabs(unittest.TestCase):
+
+    def test_tabs(self):
+        timeline = FakeTimeline([make_record(i) for i in range(5)])
+
+        with fake_chrome(timeline) as browsers:
+            driver = Driver(OPTIONS)
+            first = driver.tab
+
+            second = driver.open_tab()
+            self.assertEqual(driver.tab, second)
+            self.assertEqual(driver.tabs, [first, second])
+
+            driver.switch_tab(first)
+            self.assertEqual(browsers[0].current_window_handle, first)
+
+            # Closing a tab switches to the first remaining one
+            driver.close_tab(first)
+            self.assertEqual(driver.tab, second)
+
+            driver.open_tab()
+            driver.reset()
+            self.assertEqual(driver.tabs, [second])
+
+IMAGES_PREF = "profile.managed_default_content_settings.images"
+
+class TestResourceProfile(unittest.TestCase):
+
+    def chrome_prefs(self, **kwargs):
+        timeline = FakeTimeline([])
+
+        with fake_chrome(timeline) as browsers:
+            Driver(DriverOptions(driver_path="chromedriver", **kwargs))
+
+        return browsers[0].options.experimental_options.get("prefs", {})
+
+    def test_show_images(self):
+        # Images load by default, as before resource profiles
+        self.assertNotIn(IMAGES_PREF, self.chrome_prefs())
+        self.assertNotIn(IMAGES_PREF, self.chrome_prefs(show_images=True))
+        self.assertEqual(self.chrome_prefs(show_images=False)[IMAGES_PREF],
+                         2)
+        self.assertEqual(self.chrome_prefs(
+            show_images=True, resource_profile="minimal")[IMAGES_PREF], 2)
+
+    def start(self, resource_profile):
+        timeline = FakeTimeline([])
+
+        with fake_chrome(timeline) as browsers:
+            driver = Driver(DriverOptions(driver_path="chromedriver",
+                                          resource_profile=resource_profile))
+            driver.open_tab()
+
+        return browsers[0]
+
+    def blocked_urls(self, browser):
+        return [params["urls"] for cmd, params in browser.cdp_commands
+                if cmd == "Network.setBlockedURLs"]
+
+    def test_full_profile(self):
+        browser = self.start("full")
+
+        self.assertEqual(browser.cdp_commands, [])
+        self.assertNotIn("--autoplay-policy=user-gesture-required",
+                         browser.options.arguments)
+
+    def test_text_profile(self):
+        browser = self.start("text")
+        blocked = self.blocked_urls(browser)
+
+        self.assertIn("--autoplay-policy=user-gesture-required",
+                      browser.options.arguments)
+        # Blocking is applied to the first and to the opened tab
+        self.assertEqual(len(blocked), 2)
+        self.assertTrue(set(const.BLOCKED_MEDIA_URLS +
+                            const.BLOCKED_FONT_URLS +
+                            const.BLOCKED_TRACKER_URLS) <= set(blocked[0]))
+        self.assertFalse(set(const.BLOCKED_IMAGE_URLS) & set(blocked[0]))
+        self.assertIn("Page.addScriptToEvaluateOnNewDocument",
+                      [cmd for cmd, _ in browser.cdp_commands])
+
+    def test_minimal_profile(self):
+        browser = self.start("minimal")
+
+        self.assertTrue(set(const.BLOCKED_IMAGE_URLS) <=
+                        set(self.blocked_urls(browser)[0]))
+
+    def test_invalid_profile(self):
+        with self.assertRaises(Exception):
+            DriverOptions(resource_profile="tiny")
+
+class TestDriverPool(unittest.TestCase):
+
+    def test_acquire_release(self):
+        timeline = FakeTimeline([make_record(i) for i in range(5)])
+
+        with fake_chrome(timeline) as browsers:
+            with DriverPool(OPTIONS, size=2) as pool:
+                first = pool.acquire()
+                second = pool.acquire()
+                self.assertIsNot(first, second)
+
+                first.get("https://twitter.com/search?q=crate")
+                pool.release(first)
+
+                # Released driver is reset to a blank page and reused
+                self.assertIs(pool.acquire(timeout=1), first)
+                self.assertEqual(browsers[0].urls[-1], "about:blank")
+                self.assertEqual(len(browsers), 2)
+
+    def test_replace_dead_driver(self):
+        timeline = FakeTimeline([make_record(i) for i in range(5)])
+
+        with fake_chrome(timeline) as browsers:
+            with DriverPool(OPTIONS, size=1) as pool:
+                driver = pool.acquire()
+                browsers[0].alive = False
+                pool.release(driver)
+
+                # Crashed on release, replaced by a new browser
+                replaced = pool.acquire(timeout=1)
+                self.assertEqual(len(browsers), 2)
+                self.assertIs(replaced.driver, browsers[1])
+
+                pool.release(replaced)
+                browsers[1].alive = False
+
+                # Crashed while idle, replaced on acquire
+                self.assertIs(pool.acquire(timeout=1).driver, browsers[2])
+
+if __name__ == "__main__":
+    unittest.main()
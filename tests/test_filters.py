@@ -0,0 +1,83 @@
+import unittest
+
+from crate.cache import ResultCache
+from crate.filters import TweetFilter, normalize_username
+from crate.utils import ScraperOptions, TweetDisplayType
+
+def make_record(created_date, username='@user', like_count='0',
+                image_links=None):
+    return {
+        'tweet_url': 'https://twitter.com/user/status/1',
+        'display_name': 'User',
+        'username': username,
+        'created_date': created_date,
+        'like_count': like_count,
+        'image_links': image_links or []
+    }
+
+class TestFilters(unittest.TestCase):
+
+    def test_no_filter(self):
+        self.assertIsNone(TweetFilter.from_options(ScraperOptions()))
+
+    def test_normalize_username(self):
+        self.assertEqual(normalize_username(' @ElonMusk'), 'elonmusk')
+
+    def test_match_record(self):
+        tweet_filter = TweetFilter.from_options(ScraperOptions(
+            created_before="2022-01-05",
+            min_like_count=1000,
+            require_media=True,
+            exclude_usernames=['@Spam']
+        ))
+
+        self.assertTrue(tweet_filter.match_record(make_record(
+            '2022-01-04T10:00:00.000Z', like_count='1.2K',
+            image_links=['https://pbs.twimg.com/media/a'])))
+
+        # Each filter rejects on its own
+        self.assertFalse(tweet_filter.match_record(make_record(
+            '2022-01-05T00:00:00.000Z', like_count='1.2K',
+            image_links=['https://pbs.twimg.com/media/a'])))
+        self.assertFalse(tweet_filter.match_record(make_record(
+            '2022-01-04T10:00:00.000Z', like_count='999',
+            image_links=['https://pbs.twimg.com/media/a'])))
+        self.assertFalse(tweet_filter.match_record(make_record(
+            '2022-01-04T10:00:00.000Z', like_count='1.2K')))
+        self.assertFalse(tweet_filter.match_record(make_record(
+            '2022-01-04T10:00:00.000Z', username='@spam', like_count='1.2K',
+            image_links=['https://pbs.twimg.com/media/a'])))
+
+        self.assertFalse(tweet_filter.crossed)
+
+    def test_crossed(self):
+        options = ScraperOptions(created_after="2022-01-03",
+                                 display_type=TweetDisplayType.LATEST)
+        tweet_filter = TweetFilter.from_options(options)
+
+        self.assertTrue(tweet_filter.match_record(
+            make_record('2022-01-03T00:00:00.000Z')))
+        self.assertFalse(tweet_filter.crossed)
+
+        self.assertFalse(tweet_filter.match_record(
+            make_record('2022-01-02T23:59:59.000Z')))
+        self.assertTrue(tweet_filter.crossed)
+
+        # Top timeline is not ordered by date, scraping continues
+        tweet_filter = TweetFilter.from_options(
+            options.replace(display_type=TweetDisplayType.TOP))
+
+        self.assertFalse(tweet_filter.match_record(
+            make_record('2022-01-02T23:59:59.000Z')))
+        self.assertFalse(tweet_filter.crossed)
+
+    def test_cache_key(self):
+        cache = ResultCache.__new__(ResultCache)
+        options = ScraperOptions(words='python')
+
+        self.assertNotEqual(
+            cache.key(options),
+            cache.key(options.replace(min_like_count=100)))
+        self.assertEqual(
+            cache.key(options.replace(exclude_usernames=['a', 'B'])),
+            cache.key(options.replace(exclude_usernames=['@b', 'a'])))
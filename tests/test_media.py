@@ -0,0 +1,110 @@
+import tempfile
+import threading
+import unittest
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+from urllib.parse import urlsplit, parse_qs
+
+from crate.media import MediaDownloader, media_variant, media_extension
+
+from helpers import make_tweet
+
+class MediaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests = []
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        self.requests.append(self.path)
+
+        if url.path == "/missing":
+            body = b"not found"
+            self.send_response(404)
+        else:
+            name = parse_qs(url.query).get("name", ["small"])[0]
+            # Images b and c have the same content
+            image = "b" if url.path == "/media/c" else url.path[-1]
+            body = f"{image}:{name}".encode("utf-8")
+            self.send_response(200)
+
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class ThreadingServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+class TestMedia(unittest.TestCase):
+
+    def setUp(self):
+        MediaHandler.requests = []
+        self.server = ThreadingServer(("127.0.0.1", 0), MediaHandler)
+        threading.Thread(target=self.server.serve_forever,
+                         daemon=True).start()
+        self.url = "http://127.0.0.1:{}".format(self.server.server_port)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_media_variant(self):
+        self.assertEqual(
+            media_variant("https://pbs.twimg.com/media/A?format=jpg&name=small"),
+            "https://pbs.twimg.com/media/A?format=jpg&name=orig")
+        self.assertEqual(
+            media_extension("https://pbs.twimg.com/media/A?format=png"),
+            ".png")
+        self.assertEqual(
+            media_extension("https://pbs.twimg.com/media/A.jpg"), ".jpg")
+
+    def test_iter_download(self):
+        image = self.url + "/media/{}?format=jpg&name=small"
+
+        tweets = [
+            make_tweet('1',
+                       image_links=[image.format('a'), image.format('b')]),
+            make_tweet('2', image_links=[]),
+            make_tweet('3',
+                       image_links=[image.format('a'), image.format('c'),
+                                    self.url + "/missing"])
+        ]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            with MediaDownloader(tmp, workers=2, variant="orig") as media:
+                downloaded = list(media.iter_download(iter(tweets)))
+
+            self.assertEqual([t.tweet_id for t in downloaded],
+                             ['1', '2', '3'])
+            self.assertEqual(downloaded[1].media_paths, [])
+
+            a, b = downloaded[0].media_paths
+            a_again, c, missing = downloaded[2].media_paths
+
+            with open(a, "rb") as f:
+                self.assertEqual(f.read(), b"a:orig")
+
+            # Same url is fetched once, same content stored once
+            self.assertEqual(a, a_again)
+            self.assertEqual(b, c)
+            self.assertIsNone(missing)
+            self.assertTrue(a.endswith(".jpg"))
+            self.assertEqual(len([r for r in MediaHandler.requests
+                                  if r.startswith("/media/a")]), 1)
+            self.assertTrue(all("name=orig" in r
+                                for r in MediaHandler.requests
+                                if r.startswith("/media/")))
+
+            # Index is reused by the next run
+            MediaHandler.requests = []
+
+            with MediaDownloader(tmp, variant="orig") as media:
+                tweet = media.submit(
+                    make_tweet('4', image_links=[image.format('a')]))
+
+                self.assertEqual(tweet.result().media_paths, [a])
+
+            self.assertEqual(MediaHandler.requests, [])
+            self.assertIn('media_paths', tweet.result().to_dict())
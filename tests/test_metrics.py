@@ -0,0 +1,54 @@
+import unittest
+
+from crate.metrics import Metrics, NullMetrics
+
+class TestMetrics(unittest.TestCase):
+
+    def test_phases_and_hooks(self):
+        phases = []
+        scrolls = []
+
+        metrics = Metrics(
+            on_scroll=lambda n, y: scrolls.append((n, y)),
+            on_phase_end=lambda name, seconds: phases.append(name))
+        stats = metrics.start()
+
+        with metrics.phase("scroll"):
+            pass
+        metrics.scrolled(1080)
+
+        with metrics.phase("scroll"):
+            pass
+        metrics.scrolled(2160)
+
+        metrics.count("cards", 20)
+        metrics.count("duplicate", 3)
+
+        self.assertEqual(phases, ["scroll", "scroll"])
+        self.assertEqual(scrolls, [(1, 1080), (2, 2160)])
+        self.assertEqual(stats.calls["scroll"], 2)
+        self.assertGreaterEqual(stats.seconds["scroll"], 0)
+        self.assertEqual(stats.counters["cards"], 20)
+        self.assertEqual(stats.counters["scrolls"], 2)
+
+        # Every scrape starts fresh stats
+        self.assertEqual(metrics.start().counters["cards"], 0)
+    
+    def test_prometheus(self):
+        metrics = Metrics()
+        metrics.start()
+        metrics.count("promoted", 2)
+
+        text = metrics.stats.to_prometheus()
+
+        self.assertIn("# TYPE crate_promoted_total counter\n", text)
+        self.assertIn("crate_promoted_total 2\n", text)
+        self.assertIn('crate_phase_calls_total{phase="get"} 0\n', text)
+    
+    def test_null_metrics(self):
+        metrics = NullMetrics()
+
+        with metrics.phase("get"):
+            metrics.count("cards")
+
+        self.assertIsNone(metrics.start())
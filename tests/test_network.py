@@ -0,0 +1,71 @@
+import unittest
+
+from crate.network import parse_timeline_response, is_timeline_response, \
+                            format_created_at
+from crate.utils import tweet_from_record
+
+from helpers import load_fixture
+
+class TestNetwork(unittest.TestCase):
+
+    def test_is_timeline_response(self):
+        self.assertTrue(is_timeline_response(
+            "https://twitter.com/i/api/2/search/adaptive.json?q=a"))
+        self.assertTrue(is_timeline_response(
+            "https://twitter.com/i/api/graphql/nK1dw4/SearchTimeline?v=1"))
+        self.assertFalse(is_timeline_response(
+            "https://twitter.com/i/api/graphql/nK1dw4/UserByScreenName"))
+
+    def test_format_created_at(self):
+        self.assertEqual(
+            format_created_at("Wed Jan 05 11:55:00 +0000 2022"),
+            "2022-01-05T11:55:00.000Z")
+        # Other offsets are converted to UTC
+        self.assertEqual(
+            format_created_at("Wed Jan 05 18:55:00 +0700 2022"),
+            "2022-01-05T11:55:00.000Z")
+        self.assertIsNone(format_created_at("2022-01-05"))
+
+    def test_parse_adaptive(self):
+        records = parse_timeline_response(
+            load_fixture("adaptive_search.json"),
+            "https://twitter.com/i/api/2/search/adaptive.json")
+
+        self.assertEqual(len(records), 2)
+        self.assertTrue(records[1]["promoted"])
+
+        tweet = tweet_from_record(records[0])
+
+        self.assertEqual(tweet.tweet_url,
+            "https://twitter.com/NASA/status/1478696530051678209")
+        self.assertEqual(tweet.username, "@NASA")
+        self.assertEqual(tweet.created_date, "2022-01-05T11:55:00.000Z")
+        self.assertEqual(tweet.text,
+                         "Looking up tonight 🌕 & more example.com/moon")
+        self.assertEqual(tweet.embedded, "Full moon rises at 6pm")
+        self.assertEqual((tweet.reply_count, tweet.retweet_count,
+                          tweet.like_count), (178, 5712, 36412))
+        self.assertEqual(tweet.emojis, ["🌕"])
+        self.assertEqual(tweet.image_links, [
+            "https://pbs.twimg.com/media/FIQ1a2bXsAE?format=jpg&name=small",
+            "https://pbs.twimg.com/media/FIQ1a2cXoAI?format=png&name=small"])
+
+        self.assertIsNone(tweet_from_record(records[1]))
+
+    def test_parse_graphql(self):
+        adaptive = parse_timeline_response(
+            load_fixture("adaptive_search.json"), "https://twitter.com/")
+        records = parse_timeline_response(
+            load_fixture("graphql_search_timeline.json"),
+            "https://twitter.com/")
+
+        # Tombstones are skipped, tweets with visibility results unwrapped
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[:2], adaptive)
+        self.assertEqual(records[2]["tweet_url"],
+            "https://twitter.com/NASA/status/1478600000000000000")
+
+    def test_invalid_response(self):
+        self.assertEqual(parse_timeline_response("<html>", ""), [])
+        self.assertEqual(parse_timeline_response("[]", ""), [])
+        self.assertEqual(parse_timeline_response({"errors": []}, ""), [])
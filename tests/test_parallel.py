@@ -0,0 +1,76 @@
+import unittest
+import multiprocessing
+from unittest import mock
+
+from crate import parallel
+from crate.utils import ScraperOptions, Tweet
+
+class FakeDriver:
+    def __init__(self, options):
+        pass
+
+    def quit(self):
+        pass
+
+    def is_alive(self):
+        return True
+
+class BrokenDriver(FakeDriver):
+    def __init__(self, options):
+        raise Exception("chrome failed to start")
+
+class FakeScraper:
+    def __init__(self, driver, **kwargs):
+        self.attempts = {}
+
+    def scrape(self, options):
+        account = options.from_account
+        self.attempts[account] = self.attempts.get(account, 0) + 1
+
+        if account == 'broken':
+            raise Exception("page crashed")
+
+        # Flaky query succeeds on its second attempt
+        if account == 'flaky' and self.attempts[account] == 1:
+            raise Exception("timeout")
+
+        return [Tweet('1', '', '', '@' + account, '', '', '', 0, 0, 0,
+                      [], [])]
+
+@unittest.skipUnless(
+    multiprocessing.get_context().get_start_method() == 'fork',
+    "workers inherit fakes through fork")
+class TestParallel(unittest.TestCase):
+
+    @mock.patch.object(parallel, 'Scraper', FakeScraper)
+    @mock.patch.object(parallel, 'Driver', FakeDriver)
+    def test_scrape_many(self):
+        options_list = [ScraperOptions(from_account=account)
+                        for account in ['a', 'broken', 'flaky', 'b']]
+
+        results = sorted(parallel.scrape_many(options_list, workers=1),
+                         key=lambda r: r.index)
+
+        self.assertEqual([r.options.from_account for r in results],
+                         ['a', 'broken', 'flaky', 'b'])
+        self.assertEqual([r.ok for r in results], [True, False, True, True])
+        self.assertEqual(results[1].error, "Exception: page crashed")
+        self.assertEqual(results[1].attempts, 2)
+        self.assertEqual(results[2].attempts, 2)
+        self.assertEqual(results[3].tweets[0].username, '@b')
+
+    @mock.patch.object(parallel, 'Scraper', FakeScraper)
+    @mock.patch.object(parallel, 'Driver', BrokenDriver)
+    def test_driver_start_failure(self):
+        options_list = [ScraperOptions(from_account=account)
+                        for account in ['a', 'b']]
+
+        # Workers do not start browsers, a start failure fails each query
+        # instead of respawning workers forever
+        results = sorted(parallel.scrape_many(options_list, workers=2),
+                         key=lambda r: r.index)
+
+        self.assertEqual([r.ok for r in results], [False, False])
+        self.assertEqual(results[0].error,
+                         "Exception: chrome failed to start")
+        self.assertEqual(results[0].attempts, 2)
@@ -0,0 +1,125 @@
+import threading
+import unittest
+from datetime import datetime, timedelta
+from time import sleep
+from unittest import mock
+
+from crate.planner import DateWindowPlanner, scrape_parallel
+from crate.utils import ScraperOptions
+
+from helpers import make_tweet
+
+class TestPlanner(unittest.TestCase):
+
+    def test_windows_cover_range(self):
+        since = datetime(2022, 1, 1)
+        until = datetime(2022, 1, 4)
+
+        planner = DateWindowPlanner(since, until)
+
+        windows = []
+        while True:
+            window = planner.acquire()
+
+            if window is None:
+                break
+
+            windows.append(window)
+            planner.report(window, 0)
+
+        self.assertEqual(windows[0], (datetime(2022, 1, 3), until))
+        self.assertEqual(windows[-1][0], since)
+
+        for newer, older in zip(windows, windows[1:]):
+            self.assertEqual(newer[0], older[1])
+    
+    def test_adaptive_window_size(self):
+        planner = DateWindowPlanner(
+            datetime(2022, 1, 1),
+            datetime(2022, 3, 1),
+            target_per_window=100,
+            window_limit=1000)
+
+        window = planner.acquire()
+        self.assertEqual(window[1] - window[0], timedelta(days=1))
+
+        # 400 tweets a day, window shrinks to a quarter of a day
+        planner.report(window, 400)
+        window = planner.acquire()
+        self.assertEqual(window[1] - window[0], timedelta(hours=6))
+
+        # Sparse windows, next window is merged up to max window
+        for _ in range(3):
+            planner.report(window, 0)
+            window = planner.acquire()
+        self.assertGreater(window[1] - window[0], timedelta(days=1))
+
+    def test_report_unacquired_window(self):
+        since = datetime(2022, 1, 1)
+        until = datetime(2022, 1, 3)
+
+        planner = DateWindowPlanner(since, until)
+
+        window = planner.acquire()
+        planner.report(window, 0)
+
+        with self.assertRaises(Exception):
+            planner.report(window, 0)
+
+        with self.assertRaises(Exception):
+            planner.report((since, until), 0)
+
+        # Remaining window is still handed out, then the range is done
+        planner.report(planner.acquire(), 0)
+        self.assertIsNone(planner.acquire())
+    
+    def test_split_stalled_window(self):
+        since = datetime(2022, 1, 1)
+        until = datetime(2022, 1, 2)
+
+        planner = DateWindowPlanner(since, until, window_limit=10)
+
+        window = planner.acquire()
+        planner.report(window, 10)
+
+        self.assertEqual(planner.acquire(), (datetime(2022, 1, 1, 12), until))
+        self.assertEqual(planner.acquire(), (since, datetime(2022, 1, 1, 12)))
+
+    def test_parallel_failure_stops_workers(self):
+        day = timedelta(days=1)
+        planner = DateWindowPlanner(
+            datetime(2022, 1, 1), datetime(2022, 1, 21),
+            initial_window=day, min_window=day, max_window=day)
+        started = []
+        lock = threading.Lock()
+
+        class WindowScraper:
+            def __init__(self, **kwargs):
+                pass
+
+            def iter_scrape(self, options):
+                with lock:
+                    started.append(options.until)
+                    first = len(started) == 1
+
+                if first:
+                    sleep(0.05)
+                    raise Exception("window failed")
+
+                for i in range(3):
+                    sleep(0.02)
+                    yield make_tweet(f"{options.until:%m%d}{i}")
+
+            def close(self):
+                pass
+
+        options = ScraperOptions(words="crate", since="2022-01-01",
+                                 until="2022-01-21")
+
+        with mock.patch("crate.planner.Scraper", WindowScraper):
+            with self.assertRaisesRegex(Exception, "window failed"):
+                scrape_parallel(options, workers=2, planner=planner)
+
+        # Second worker stops on its next tweet instead of scraping the
+        # remaining windows
+        self.assertLess(len(started), 5)
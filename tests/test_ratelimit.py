@@ -0,0 +1,57 @@
+import os
+import pickle
+import tempfile
+import unittest
+from time import monotonic
+
+from crate.ratelimit import RateLimiter, fcntl
+
+class TestRateLimit(unittest.TestCase):
+
+    def test_token_bucket(self):
+        limiter = RateLimiter(rate=20, burst=2)
+
+        started = monotonic()
+        for _ in range(2):
+            limiter.acquire()
+        self.assertLess(monotonic() - started, 0.05)
+
+        # Bucket is empty, further tokens come at rate
+        for _ in range(4):
+            limiter.acquire()
+        self.assertGreater(monotonic() - started, 0.15)
+
+    def test_backoff(self):
+        limiter = RateLimiter(rate=100, backoff_base=0.1, backoff_max=0.15)
+
+        self.assertAlmostEqual(limiter.penalize(), 0.1, places=2)
+        # Already paused, drivers hitting the limit together back off once
+        self.assertLessEqual(limiter.penalize(), 0.1)
+        self.assertEqual(limiter.failures, 1)
+
+        started = monotonic()
+        limiter.acquire()
+        self.assertGreater(monotonic() - started, 0.05)
+
+        self.assertAlmostEqual(limiter.penalize(), 0.15, places=2)
+        limiter.acquire()
+        limiter.succeeded()
+        self.assertEqual(limiter.failures, 0)
+
+    @unittest.skipIf(fcntl is None, "fcntl is not available")
+    def test_state_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            state_file = os.path.join(tmp, "ratelimit.json")
+            limiter = RateLimiter(rate=20, burst=2, state_file=state_file)
+            # Same bucket as seen by another worker process
+            other = pickle.loads(pickle.dumps(limiter))
+
+            started = monotonic()
+            limiter.acquire()
+            other.acquire()
+            limiter.acquire()
+            other.acquire()
+            self.assertGreater(monotonic() - started, 0.05)
+
+            other.penalize()
+            self.assertEqual(limiter.failures, 1)
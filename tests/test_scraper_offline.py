@@ -0,0 +1,299 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from crate.cache import ResultCache
+from crate.checkpoint import Checkpoint
+from crate.driver import Driver, DriverOptions, DriverPool
+from crate.metrics import Metrics
+from crate.scraper import Scraper
+from crate.seen import SeenIdSet
+from crate.sinks import JSONLSink
+from crate.utils import ExtractionMode, ScraperOptions, TweetDisplayType
+from crate.watchdog import Watchdog
+
+from helpers import FakeTimeline, fake_chrome, load_fixture, make_record
+
+# Top timeline is ordered by relevance, dates are shuffled
+TOP_DATES = [datetime(2022, 1, 7) - timedelta(hours=(i * 7) % 20)
+             for i in range(20)]
+
+class TestScraperOffline(unittest.TestCase):
+
+    def scraper(self, **kwargs):
+        """Scraper on a driver started inside fake_chrome"""
+        driver = Driver(DriverOptions(driver_path="chromedriver"))
+
+        return Scraper(driver, sleep_duration=0, **kwargs)
+
+    def test_scrape(self):
+        timeline = FakeTimeline([make_record(i) for i in range(12)])
+
+        with fake_chrome(timeline):
+            tweets = self.scraper().scrape(
+                ScraperOptions(words="crate"))
+
+        self.assertEqual([t.tweet_id for t in tweets],
+                         [str(1000 + i) for i in range(12)])
+
+    def test_skipped_cards(self):
+        records = [make_record(i, promoted=i == 1) for i in range(12)]
+        records[3]["username"] = ""
+        timeline = FakeTimeline(records)
+        metrics = Metrics()
+
+        with fake_chrome(timeline):
+            tweets = self.scraper(metrics=metrics).scrape(
+                ScraperOptions(words="crate"))
+
+        self.assertEqual(len(tweets), 10)
+        self.assertNotIn("1001", [t.tweet_id for t in tweets])
+        # Promoted and unparseable cards are parsed once, not on every
+        # scroll they stay rendered
+        self.assertEqual(metrics.stats.counters["promoted"], 1)
+        self.assertEqual(metrics.stats.counters["invalid"], 1)
+
+    def test_snapshot_without_lxml(self):
+        timeline = FakeTimeline([make_record(i) for i in range(12)])
+
+        with fake_chrome(timeline) as browsers, \
+                mock.patch("crate.snapshot.lxml_html", None):
+            with self.assertRaises(ImportError):
+                Scraper(DriverOptions(driver_path="chromedriver"),
+                        extraction_mode=ExtractionMode.SNAPSHOT)
+
+        # Missing lxml is reported before a browser is started
+        self.assertEqual(browsers, [])
+
+    def test_iter_scrape_limit(self):
+        timeline = FakeTimeline([make_record(i) for i in range(20)])
+
+        with fake_chrome(timeline):
+            tweets = list(self.scraper().iter_scrape(
+                ScraperOptions(words="crate", limit=7)))
+
+        self.assertEqual([t.tweet_id for t in tweets],
+                         [str(1000 + i) for i in range(7)])
+
+    def test_iter_scrape_close_early(self):
+        timeline = FakeTimeline([make_record(i) for i in range(20)])
+
+        with fake_chrome(timeline) as browsers:
+            scraper = self.scraper()
+            tweets = scraper.iter_scrape(ScraperOptions(words="crate"))
+
+            self.assertEqual(next(tweets).tweet_id, "1000")
+            self.assertEqual(next(tweets).tweet_id, "1001")
+            tweets.close()
+
+            # Closing stops loading and leaves a blank page
+            self.assertEqual(browsers[0].urls[-1], "about:blank")
+
+            # Next scrape starts over with a fresh limit and seen ids
+            tweets = scraper.scrape(ScraperOptions(words="crate", limit=3))
+
+        self.assertEqual([t.tweet_id for t in tweets],
+                         ["1000", "1001", "1002"])
+
+    def test_cache(self):
+        timeline = FakeTimeline([make_record(i) for i in range(12)])
+        options = ScraperOptions(words="crate")
+
+        with tempfile.TemporaryDirectory() as directory, \
+                fake_chrome(timeline) as browsers:
+            cache = ResultCache(directory)
+            scraped = self.scraper(cache=cache).scrape(options)
+            loads = len(browsers[0].urls)
+
+            # Cache hits go through the sink, checkpoint and seen store
+            seen = SeenIdSet(os.devnull)
+            sink = JSONLSink(os.path.join(directory, "tweets.jsonl"))
+            checkpoint = Checkpoint(os.path.join(directory, "state.json"))
+            scraper = self.scraper(cache=cache, seen_store=seen)
+            cached = scraper.scrape(options, sink=sink,
+                                    checkpoint=checkpoint)
+            sink.close()
+
+            self.assertEqual(len(browsers[0].urls), loads)
+            self.assertEqual([t.to_dict() for t in cached],
+                             [t.to_dict() for t in scraped])
+            self.assertEqual(len(seen), 12)
+            self.assertEqual(len(checkpoint.seen_ids), 12)
+            self.assertEqual(len(sink.paths), 1)
+
+            # Cached tweets already in the seen store are skipped
+            self.assertEqual(scraper.scrape(options), [])
+
+    def test_cache_truncated(self):
+        timeline = FakeTimeline([make_record(i) for i in range(20)],
+                                error_at=[10])
+        options = ScraperOptions(words="crate")
+
+        with tempfile.TemporaryDirectory() as directory, \
+                fake_chrome(timeline):
+            cache = ResultCache(directory)
+            tweets = self.scraper(cache=cache, max_retries=0).scrape(options)
+
+            # Scrape gave up on the error page, results are not complete
+            self.assertEqual(len(tweets), 10)
+            self.assertIsNone(cache.get(options))
+
+    def test_network(self):
+        responses = [
+            ("https://twitter.com/i/api/2/search/adaptive.json?q=crate",
+             load_fixture("adaptive_search.json")),
+            ("https://twitter.com/i/api/graphql/nK1dw4/SearchTimeline",
+             load_fixture("graphql_search_timeline.json"))
+        ]
+
+        for encoded in [False, True]:
+            with self.subTest(encoded=encoded):
+                timeline = FakeTimeline([make_record(i) for i in range(10)],
+                                        responses=responses, encoded=encoded)
+
+                with fake_chrome(timeline) as browsers:
+                    driver = Driver(DriverOptions(driver_path="chromedriver",
+                                                  capture_network=True))
+                    tweets = Scraper(driver, sleep_duration=0,
+                                     extraction_mode=ExtractionMode.NETWORK) \
+                                .scrape(ScraperOptions(words="crate"))
+
+                # Tweets come from the API responses, not the rendered
+                # cards. Promoted and repeated tweets are skipped
+                self.assertEqual([t.tweet_id for t in tweets],
+                                 ["1478696530051678209",
+                                  "1478600000000000000"])
+                self.assertEqual((tweets[0].reply_count,
+                                  tweets[0].retweet_count,
+                                  tweets[0].like_count), (178, 5712, 36412))
+                self.assertEqual(
+                    [cmd for cmd, _ in browsers[0].cdp_commands].count(
+                        "Network.getResponseBody"), 2)
+
+    def test_error_retry_top(self):
+        records = [make_record(i, date) for i, date in enumerate(TOP_DATES)]
+        timeline = FakeTimeline(records, error_at=[10])
+
+        with fake_chrome(timeline) as browsers:
+            tweets = self.scraper().scrape(
+                ScraperOptions(words="crate"))
+
+        # Top timeline is reloaded from the start, not from the oldest
+        # tweet reached, which would drop newer unseen tweets
+        urls = browsers[0].urls
+        self.assertEqual(urls[0], urls[1])
+        self.assertEqual(len(tweets), 20)
+        self.assertEqual(len({t.tweet_id for t in tweets}), 20)
+
+    def test_error_retry_latest(self):
+        timeline = FakeTimeline([make_record(i) for i in range(20)],
+                                error_at=[10])
+
+        with fake_chrome(timeline) as browsers:
+            tweets = self.scraper().scrape(
+                ScraperOptions(words="crate",
+                               display_type=TweetDisplayType.LATEST))
+
+        # Latest timeline is reloaded from the oldest tweet reached
+        self.assertIn("until_time", browsers[0].urls[1])
+        self.assertEqual([t.tweet_id for t in tweets],
+                         [str(1000 + i) for i in range(20)])
+
+    def test_recycle_top(self):
+        records = [make_record(i, date) for i, date in enumerate(TOP_DATES)]
+        timeline = FakeTimeline(records)
+        watchdog = Watchdog(max_heap_bytes=2 ** 20, check_every=1)
+
+        with fake_chrome(timeline) as browsers:
+            tweets = self.scraper(watchdog=watchdog).scrape(
+                ScraperOptions(words="crate"))
+
+        # New browsers reload Top timeline from the start and are not
+        # recycled again before getting past the tweets reached before
+        self.assertGreater(watchdog.recycles, 0)
+        self.assertEqual(len(browsers), watchdog.recycles + 1)
+        self.assertEqual({b.urls[0] for b in browsers},
+                         {browsers[0].urls[0]})
+        self.assertEqual(len({t.tweet_id for t in tweets}), 20)
+        self.assertEqual(len(tweets), 20)
+
+    def test_recycle_latest(self):
+        timeline = FakeTimeline([make_record(i) for i in range(20)])
+        watchdog = Watchdog(max_heap_bytes=2 ** 20, check_every=2)
+
+        with fake_chrome(timeline) as browsers:
+            tweets = self.scraper(watchdog=watchdog).scrape(
+                ScraperOptions(words="crate",
+                               display_type=TweetDisplayType.LATEST))
+
+        # New browsers continue from the oldest tweet reached
+        self.assertGreater(len(browsers), 1)
+        for browser in browsers[1:]:
+            self.assertIn("until_time", browser.urls[0])
+        self.assertEqual([t.tweet_id for t in tweets],
+                         [str(1000 + i) for i in range(20)])
+
+    def test_shared_pooled_scraper(self):
+        timeline = FakeTimeline([make_record(i) for i in range(30)],
+                                load_polls=2)
+
+        with fake_chrome(timeline) as browsers:
+            with DriverPool(DriverOptions(driver_path="chromedriver"),
+                            size=2) as pool:
+                scraper = Scraper(pool, sleep_duration=1)
+
+                # Each thread scrapes on its own borrowed driver
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    results = list(executor.map(
+                        lambda limit: scraper.scrape(
+                            ScraperOptions(words="crate", limit=limit)),
+                        [30, 12]))
+
+                self.assertIsNotNone(pool.acquire(timeout=1))
+                self.assertIsNotNone(pool.acquire(timeout=1))
+
+        self.assertEqual([len(tweets) for tweets in results], [30, 12])
+        self.assertEqual(len(browsers), 2)
+
+    def test_tabs_round_robin(self):
+        timeline = FakeTimeline([make_record(i) for i in range(20)],
+                                load_polls=1)
+        options_list = [ScraperOptions(words=word, limit=limit)
+                        for word, limit in [("a", 20), ("b", 8), ("c", 12)]]
+
+        with fake_chrome(timeline) as browsers:
+            scraper = self.scraper()
+            yielded = list(scraper.iter_scrape_tabs(options_list, tabs=2))
+
+        indexes = [index for index, _ in yielded]
+        self.assertEqual([indexes.count(i) for i in range(3)], [20, 8, 12])
+        # Loading of open tabs overlaps, their tweets are interleaved
+        self.assertLess(indexes.index(1),
+                        len(indexes) - indexes[::-1].index(0))
+        # Finished tabs are closed, the last one is kept for the next scrape
+        self.assertEqual(len(browsers[0].closed), 2)
+        self.assertEqual(len(browsers[0].window_handles), 1)
+        self.assertEqual(browsers[0].urls[-1], "about:blank")
+
+        tweets = [tweet for index, tweet in yielded if index == 2]
+        self.assertEqual([t.tweet_id for t in tweets],
+                         [str(1000 + i) for i in range(12)])
+
+    def test_tabs_error_retry(self):
+        timeline = FakeTimeline([make_record(i) for i in range(20)],
+                                error_at=[10])
+        options_list = [ScraperOptions(words=word) for word in ["a", "b"]]
+
+        with fake_chrome(timeline) as browsers:
+            results = self.scraper().scrape_tabs(options_list, tabs=2)
+
+        # Tab showing the error page is reloaded and completes
+        self.assertEqual([len(tweets) for tweets in results], [20, 20])
+        loads = [url for url in browsers[0].urls if url != "about:blank"]
+        self.assertEqual(len(loads), 3)
+
+if __name__ == "__main__":
+    unittest.main()
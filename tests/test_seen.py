@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+
+from crate.seen import id_key, SeenIdSet, SeenBloomFilter, KnownRun
+
+class TestSeen(unittest.TestCase):
+
+    def test_id_key(self):
+        self.assertEqual(id_key("1478694512245628928"), 1478694512245628928)
+        # Non numeric ids are hashed to 64 bits
+        self.assertLess(id_key("abc"), 2 ** 64)
+        self.assertEqual(id_key("abc"), id_key("abc"))
+
+    def test_id_set(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "seen", "ids.bin")
+
+            with SeenIdSet(path) as seen:
+                seen.update(["1", "2", "2"])
+                self.assertIn("1", seen)
+                self.assertNotIn("3", seen)
+                self.assertEqual(len(seen), 2)
+
+            # New ids are appended on flush
+            with SeenIdSet(path) as seen:
+                self.assertEqual(len(seen), 2)
+                seen.add("3")
+
+            self.assertEqual(os.path.getsize(path), 3 * 8)
+
+            # Partially written last id is ignored
+            with open(path, "ab") as f:
+                f.write(b"\x01\x02")
+
+            seen = SeenIdSet(path)
+            self.assertEqual(len(seen), 3)
+            self.assertIn("3", seen)
+
+    def test_bloom_filter(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "seen.bloom")
+
+            with SeenBloomFilter(path, capacity=10000,
+                                 error_rate=0.01) as seen:
+                seen.update(str(i) for i in range(10000))
+
+            seen = SeenBloomFilter(path, capacity=10)
+            # Existing file keeps its size
+            self.assertGreater(seen.size, 10000)
+            # Adds colliding with every bit set are not counted
+            self.assertAlmostEqual(len(seen), 10000, delta=100)
+            self.assertTrue(all(str(i) in seen for i in range(10000)))
+
+            false_positives = sum(str(i) in seen
+                                  for i in range(10000, 30000))
+            self.assertLess(false_positives / 20000, 0.02)
+
+    def test_bloom_filter_magic(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "ids.bin")
+
+            with open(path, "wb") as f:
+                f.write(b"\x00" * 64)
+
+            with self.assertRaises(Exception):
+                SeenBloomFilter(path)
+
+    def test_known_run(self):
+        seen = SeenIdSet(os.devnull)
+        seen.update(["1", "2", "3"])
+
+        known = KnownRun(seen, stop_after=2, monotone=True)
+        self.assertTrue(known.check("1"))
+        # A new tweet resets the run
+        self.assertFalse(known.check("4"))
+        self.assertTrue(known.check("2"))
+        self.assertFalse(known.stop)
+        self.assertTrue(known.check("3"))
+        self.assertTrue(known.stop)
+
+        # Top timeline is not ordered by date, never stops
+        known = KnownRun(seen, stop_after=2, monotone=False)
+        for tweet_id in ["1", "2", "3"]:
+            self.assertTrue(known.check(tweet_id))
+        self.assertFalse(known.stop)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import csv
+import json
+import unittest
+import tempfile
+
+from crate.sinks import Sink, JSONLSink, CSVSink, ParquetSink
+from crate.utils import Tweet
+
+try:
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+from helpers import make_tweet
+
+class TestSinks(unittest.TestCase):
+
+    def test_jsonl_batches(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tweets.jsonl')
+
+            sink = JSONLSink(path, batch_size=2, fast_json=False)
+            sink.write(make_tweet('1'))
+            self.assertFalse(os.path.exists(path))
+
+            sink.write(make_tweet('2'))
+            sink.write(make_tweet('3'))
+
+            # Only full batches are written before flush
+            with open(path) as f:
+                self.assertEqual(len(f.readlines()), 2)
+
+            sink.close()
+
+            with open(path) as f:
+                tweets = [Tweet(**json.loads(line)) for line in f]
+
+        self.assertEqual([t.tweet_id for t in tweets], ['1', '2', '3'])
+        self.assertEqual(tweets[0].to_dict(), make_tweet('1').to_dict())
+    
+    def test_csv_rotation(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tweets-{part}.csv')
+
+            with CSVSink(path, batch_size=2, max_rows=2) as sink:
+                for tweet_id in ['1', '2', '3']:
+                    sink.write(make_tweet(tweet_id))
+
+            self.assertEqual(sink.paths, [
+                os.path.join(directory, 'tweets-0.csv'),
+                os.path.join(directory, 'tweets-1.csv')
+            ])
+
+            with open(sink.paths[0], newline='') as f:
+                rows = list(csv.DictReader(f))
+
+        self.assertEqual([r['tweet_id'] for r in rows], ['1', '2'])
+        self.assertEqual(json.loads(rows[0]['image_links']),
+                         make_tweet('1').image_links)
+
+    @unittest.skipIf(pyarrow is None, "requires pyarrow")
+    def test_parquet_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tweets.parquet')
+
+            with ParquetSink(path, batch_size=2) as sink:
+                for tweet_id in ['1', '2', '3']:
+                    sink.write(make_tweet(tweet_id))
+
+            parquet = pyarrow.parquet.ParquetFile(path)
+            rows = parquet.read().to_pylist()
+
+        # One row group per batch
+        self.assertEqual(parquet.num_row_groups, 2)
+        self.assertEqual([r['tweet_id'] for r in rows], ['1', '2', '3'])
+        self.assertEqual(rows[0]['image_links'], make_tweet('1').image_links)
+        self.assertEqual(rows[0]['like_count'], '69.4K')
+        self.assertIsNone(rows[0]['media_paths'])
+
+    def test_incomplete_sink(self):
+        class BatchOnlySink(Sink):
+            def _write_batch(self, tweets):
+                pass
+
+        # Missing _open and _close fail on creation, not on first flush
+        with self.assertRaises(TypeError):
+            BatchOnlySink('tweets.jsonl')
@@ -0,0 +1,74 @@
+import unittest
+import tempfile
+
+from crate.snapshot import SnapshotRecorder, parse_snapshot, replay, \
+                            lxml_html
+from crate.utils import tweet_from_record
+
+CARD = """
+<article data-testid="tweet">
+  <div>
+    <div><img src="https://pbs.twimg.com/profile_images/1/avatar.jpg"></div>
+    <div>
+      <div></div>
+      <div>
+        <div>
+          <a href="/year_progress"><span>Year Progress</span></a>
+          <span>@year_progress</span>
+          <a href="/year_progress/status/{tweet_id}">
+            <time datetime="2022-01-04T16:00:03.000Z">Jan 4</time>
+          </a>
+        </div>
+        <div>
+          <div><span>&#9617;&#9617;&#9617; 1%</span>
+            <img src="https://abs-0.twimg.com/emoji/v2/svg/1f602.svg"></div>
+          <div><img src="https://pbs.twimg.com/media/ErAWtcNXcAIoD3N?format=jpg&amp;name=small"></div>
+        </div>
+        <div>
+          <div data-testid="reply">178</div>
+          <div data-testid="retweet">5.7K</div>
+          <div data-testid="like">36.4K</div>
+        </div>
+      </div>
+    </div>
+  </div>
+</article>
+"""
+
+PAGE = "<div aria-label=\"Timeline: Search timeline\">{}</div>"
+
+@unittest.skipIf(lxml_html is None, "lxml is not installed")
+class TestSnapshot(unittest.TestCase):
+
+    def test_parse_snapshot(self):
+        source = PAGE.format(CARD.format(tweet_id="1478395814053568512"))
+
+        records = parse_snapshot(source, "https://twitter.com/search?q=x")
+        tweet = tweet_from_record(records[0])
+
+        self.assertEqual(len(records), 1)
+        self.assertEqual(tweet.tweet_id, "1478395814053568512")
+        self.assertEqual(tweet.tweet_url,
+            "https://twitter.com/year_progress/status/1478395814053568512")
+        self.assertEqual(tweet.display_name, "Year Progress")
+        self.assertEqual(tweet.username, "@year_progress")
+        self.assertEqual(tweet.created_date, "2022-01-04T16:00:03.000Z")
+        self.assertEqual(tweet.text, "░░░ 1%")
+        self.assertEqual(tweet.like_count, "36.4K")
+        self.assertEqual(tweet.emojis, ["\U0001f602"])
+        self.assertEqual(tweet.image_links, [
+            "https://pbs.twimg.com/media/ErAWtcNXcAIoD3N?format=jpg&name=small"
+        ])
+    
+    def test_record_replay(self):
+        url = "https://twitter.com/search?q=x"
+
+        with tempfile.TemporaryDirectory() as directory:
+            recorder = SnapshotRecorder(directory)
+            recorder.record(PAGE.format(CARD.format(tweet_id="1")), url)
+            recorder.record(PAGE.format(
+                CARD.format(tweet_id="1") + CARD.format(tweet_id="2")), url)
+
+            tweets = list(replay(directory))
+
+        self.assertEqual([t.tweet_id for t in tweets], ["1", "2"])
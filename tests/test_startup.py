@@ -0,0 +1,105 @@
+import os
+import sys
+import json
+import tempfile
+import unittest
+import subprocess
+from unittest import mock
+
+from crate import chromedriver
+
+class TestStartup(unittest.TestCase):
+
+    def test_lazy_import(self):
+        code = "import sys, crate; " + \
+            "crate.ScraperOptions; crate.const; " + \
+            "print('selenium' in sys.modules)"
+        output = subprocess.check_output([sys.executable, "-c", code],
+                                         cwd=os.path.dirname(
+                                             os.path.dirname(__file__)))
+
+        self.assertEqual(output.strip(), b"False")
+
+    def test_lazy_scraper_import(self):
+        # Output, cache and snapshot modules load only when used
+        code = "import sys; from crate import Scraper; " + \
+            "print(sorted(m for m in ['crate.sinks', 'crate.cache', " + \
+            "'crate.media', 'crate.snapshot', 'pyarrow', 'lxml', " + \
+            "'sqlite3'] if m in sys.modules))"
+        output = subprocess.check_output([sys.executable, "-c", code],
+                                         cwd=os.path.dirname(
+                                             os.path.dirname(__file__)))
+
+        self.assertEqual(output.strip(), b"[]")
+
+    def test_resolve_chromedriver(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_file = os.path.join(tmp, "cache", "chromedriver.json")
+            binary = os.path.join(tmp, "chromedriver")
+            open(binary, "w").close()
+
+            with mock.patch("chromedriver_autoinstaller.get_chrome_version",
+                            return_value="100.0.4896.60"), \
+                    mock.patch("chromedriver_autoinstaller.install",
+                               return_value=binary) as install:
+                chromedriver._resolved.clear()
+                self.assertEqual(
+                    chromedriver.resolve_chromedriver(cache_file), binary)
+
+                # Resolved from disk by a new process
+                chromedriver._resolved.clear()
+                self.assertEqual(
+                    chromedriver.resolve_chromedriver(cache_file), binary)
+                self.assertEqual(install.call_count, 1)
+
+                with open(cache_file) as f:
+                    self.assertEqual(json.load(f),
+                                     {"100.0.4896.60": binary})
+
+                # Removed binary is installed again
+                os.remove(binary)
+                chromedriver._resolved.clear()
+                chromedriver.resolve_chromedriver(cache_file)
+                self.assertEqual(install.call_count, 2)
+
+            chromedriver._resolved.clear()
+
+    def test_resolve_chromedriver_upgrade(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            binaries = {}
+
+            for version in ["100.0.4896.60", "101.0.4951.41"]:
+                binaries[version] = os.path.join(tmp, version)
+                open(binaries[version], "w").close()
+
+            version = mock.patch(
+                "chromedriver_autoinstaller.get_chrome_version",
+                return_value="100.0.4896.60")
+
+            with version as get_version, \
+                    mock.patch("chromedriver_autoinstaller.install",
+                               side_effect=lambda: binaries[
+                                   get_version.return_value]) as install:
+                chromedriver._resolved.clear()
+                self.assertEqual(chromedriver.resolve_chromedriver(None),
+                                 binaries["100.0.4896.60"])
+
+                # Chrome upgraded while the process runs
+                get_version.return_value = "101.0.4951.41"
+                self.assertEqual(chromedriver.resolve_chromedriver(None),
+                                 binaries["101.0.4951.41"])
+
+                # Another cache file is not answered from memory
+                cache_file = os.path.join(tmp, "chromedriver.json")
+                chromedriver.resolve_chromedriver(cache_file)
+                self.assertEqual(install.call_count, 3)
+
+                with open(cache_file) as f:
+                    self.assertEqual(json.load(f), {
+                        "101.0.4951.41": binaries["101.0.4951.41"]})
+
+                # Same version and cache file is resolved from memory
+                chromedriver.resolve_chromedriver(cache_file)
+                self.assertEqual(install.call_count, 3)
+
+            chromedriver._resolved.clear()
@@ -0,0 +1,96 @@
+import json
+import unittest
+import urllib.error
+import urllib.request
+
+from benchmarks.timeline_server import TimelineConfig, TimelineServer, \
+                                        render_page
+from crate.network import parse_timeline_response
+from crate.snapshot import parse_snapshot, lxml_html
+from crate.utils import tweet_from_record, parse_count
+
+class TestTimelineServer(unittest.TestCase):
+
+    def test_serve_pages(self):
+        config = TimelineConfig(cards=30, page_size=20, load_delay=0)
+
+        with TimelineServer(config) as server:
+            with urllib.request.urlopen(server.search_url + "?q=x") as r:
+                self.assertIn(b'aria-label="Timeline', r.read())
+
+            url = server.url + "/i/api/2/search/adaptive.json?offset=20"
+
+            with urllib.request.urlopen(url) as r:
+                page = json.loads(r.read())
+
+        self.assertEqual(page["offset"], 30)
+        self.assertTrue(page["done"])
+        # Same page in the format of the search API
+        self.assertEqual(len(parse_timeline_response(page, url)), 10)
+    
+    def test_rate_limit(self):
+        config = TimelineConfig(cards=30, page_size=10, load_delay=0,
+                                max_rate=2)
+
+        with TimelineServer(config) as server:
+            url = server.url + "/i/api/2/search/adaptive.json?offset=0"
+            statuses = []
+
+            for _ in range(3):
+                try:
+                    with urllib.request.urlopen(url) as r:
+                        statuses.append(r.status)
+                except urllib.error.HTTPError as e:
+                    statuses.append(e.code)
+
+        self.assertEqual(statuses, [200, 200, 429])
+
+    @unittest.skipIf(lxml_html is None, "lxml is not installed")
+    def test_markup_matches_selectors(self):
+        config = TimelineConfig(cards=100, page_size=100, promoted_ratio=0.1,
+                                emoji_ratio=0.5, image_ratio=0.5)
+
+        records = parse_snapshot(render_page(0, config)["html"],
+                                 "http://127.0.0.1/search")
+        tweets = [tweet_from_record(r) for r in records]
+        promoted = [r for r in records if r["promoted"]]
+
+        self.assertEqual(len(records), 100)
+        self.assertGreater(len(promoted), 0)
+        self.assertEqual(sum(t is not None for t in tweets),
+                         100 - len(promoted))
+        self.assertTrue(any(t.emojis for t in tweets if t))
+        self.assertTrue(any(t.image_links for t in tweets if t))
+        self.assertEqual(tweets[0].tweet_url,
+            "http://127.0.0.1/user0/status/1478696530051678209")
+
+    @unittest.skipIf(lxml_html is None, "lxml is not installed")
+    def test_api_matches_markup(self):
+        config = TimelineConfig(cards=50, page_size=50, load_delay=0,
+                                promoted_ratio=0.1, emoji_ratio=0.5,
+                                image_ratio=0.5)
+
+        with TimelineServer(config) as server:
+            url = server.url + "/i/api/2/search/adaptive.json?offset=0"
+
+            with urllib.request.urlopen(url) as r:
+                body = r.read()
+
+        page = json.loads(body)
+        network = parse_timeline_response(body, url)
+        snapshot = parse_snapshot(page["html"], server.search_url)
+
+        self.assertEqual(len(network), len(snapshot))
+
+        for api, card in zip(network, snapshot):
+            for field in ("tweet_url", "promoted", "display_name",
+                          "username", "created_date", "emojis",
+                          "image_links"):
+                self.assertEqual(api[field], card[field])
+
+            # Cards show rounded counts, the API exact ones
+            self.assertEqual(api["reply_count"],
+                             parse_count(card["reply_count"]))
+            self.assertAlmostEqual(api["like_count"],
+                                   parse_count(card["like_count"]), delta=50)
+            self.assertTrue(api["text"].startswith(card["text"]))
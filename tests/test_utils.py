@@ -3,7 +3,8 @@ import unittest
 from datetime import datetime
 
 from crate.utils import safe_cast_to_datetime, coalesce, join_if_list, prepend, \
-                        ScraperOptions, construct_url, Tweet
+                        ScraperOptions, construct_url, Tweet, tweet_id_from_url, \
+                        emoji_from_src
 
 class TestUtils(unittest.TestCase):
     def test_safe_cast_datetime(self):
@@ -90,4 +91,65 @@ class TestUtils(unittest.TestCase):
             'image_links': []
         }
 
-        self.assertEqual(json.loads(repr(tweet)), compare)
\ No newline at end of file
+        self.assertEqual(json.loads(repr(tweet)), compare)
+    
+    def test_tweet_id_from_url(self):
+        url = 'https://twitter.com/whataweekhuh/status/1478696530051678209'
+
+        self.assertEqual(tweet_id_from_url(url), '1478696530051678209')
+
+    
+    def test_emoji_from_src(self):
+        src = 'https://abs-0.twimg.com/emoji/v2/svg/1f602.svg'
+
+        self.assertEqual(emoji_from_src(src), '\U0001f602')
+        self.assertIsNone(emoji_from_src('https://pbs.twimg.com/media/x.jpg'))
+    
+    def test_construct_url_since_until_time(self):
+        scraper_options = ScraperOptions(
+            from_account='whataweekhuh',
+            since=datetime(2022, 1, 1, 12),
+            until="2022-01-07"
+        )
+
+        compare = "https://twitter.com/search?q=%28from%3Awhataweekhuh%29+since_time%3A1641038400+until%3A2022-01-07&src=typed_query&f=top"
+
+        self.assertEqual(construct_url(scraper_options), compare)
+    
+    def test_tweet_dict_round_trip(self):
+        tweet = Tweet(
+            '1478696530051678209',
+            'https://twitter.com/whataweekhuh/status/1478696530051678209',
+            'What a week, huh? all Wednesdays',
+            '@whataweekhuh',
+            '2022-01-05',
+            '',
+            '',
+            0,
+            14300,
+            69400,
+            [],
+            []
+        )
+
+        compare = Tweet.from_dict(tweet.to_dict())
+
+        self.assertEqual(compare, tweet)
+        self.assertEqual(compare.to_dict(), tweet.to_dict())
+        self.assertEqual(len({tweet, compare}), 1)
+        self.assertFalse(hasattr(tweet, '__dict__'))
+    
+    def test_scraper_options_replace(self):
+        scraper_options = ScraperOptions(
+            from_account='whataweekhuh',
+            since="2022-01-01",
+            until="2022-01-07"
+        )
+
+        replaced = scraper_options.replace(until="2022-01-03", limit=10)
+
+        self.assertEqual(replaced.from_account, 'whataweekhuh')
+        self.assertEqual(replaced.since, datetime(2022, 1, 1))
+        self.assertEqual(replaced.until, datetime(2022, 1, 3))
+        self.assertEqual(replaced.limit, 10)
+        self.assertEqual(scraper_options.until, datetime(2022, 1, 7))
@@ -0,0 +1,49 @@
+import os
+import unittest
+
+from crate.watchdog import Watchdog, process_tree_rss
+
+class FakeDriver:
+    def __init__(self, heap, rss):
+        self.heap = heap
+        self.rss = rss
+    
+    def js_heap_size(self):
+        return self.heap
+    
+    def process_rss(self):
+        return self.rss
+
+class TestWatchdog(unittest.TestCase):
+
+    def test_process_tree_rss(self):
+        self.assertGreater(process_tree_rss(os.getpid()), 0)
+
+    def test_healthy(self):
+        watchdog = Watchdog(max_heap_bytes=100, max_rss_bytes=100,
+                            max_scroll_latency=1, check_every=1)
+
+        for _ in range(10):
+            self.assertIsNone(watchdog.check(FakeDriver(50, 50), 0.5))
+        
+        self.assertEqual(watchdog.recycles, 0)
+    
+    def test_memory_threshold(self):
+        watchdog = Watchdog(max_rss_bytes=100, check_every=2)
+        driver = FakeDriver(None, 200)
+
+        # Memory is only checked every check_every scrolls
+        self.assertIsNone(watchdog.check(driver, 0.5))
+        self.assertIsNotNone(watchdog.check(driver, 0.5))
+        self.assertEqual(watchdog.recycles, 1)
+    
+    def test_latency_threshold(self):
+        watchdog = Watchdog(max_scroll_latency=1, latency_window=3)
+        driver = FakeDriver(None, None)
+
+        self.assertIsNone(watchdog.check(driver, 2))
+        self.assertIsNone(watchdog.check(driver, 2))
+        self.assertIsNotNone(watchdog.check(driver, 2))
+
+        # Latencies are cleared after recycle
+        self.assertIsNone(watchdog.check(driver, 2))